@@ -5,6 +5,8 @@ import path from 'path';
 
 // https://astro.build/config
 export default defineConfig({
+  // scripts/build-clients.js points this at a tree holding only the [client] route
+  srcDir: process.env.ASTRO_SRC_DIR || './src',
   // Enable Tailwind CSS integration
   integrations: [tailwind()],
   // Configure site metadata
@@ -47,10 +47,18 @@ else
 fi
 echo ""
 
-# Test 2: Theme Generation (only if API key is available)
-if [ -n "$ANTHROPIC_API_KEY" ]; then
+# Test 2: Theme Generation (needs an API key, or a cassette to replay: CASSETTE=path)
+# RECORD_CASSETTE=path records the live run's API calls for later replays
+CASSETTE_ARGS=()
+if [ -n "$CASSETTE" ]; then
+  CASSETTE_ARGS=(--replay-cassette "$CASSETTE")
+elif [ -n "$RECORD_CASSETTE" ]; then
+  CASSETTE_ARGS=(--record-cassette "$RECORD_CASSETTE")
+fi
+
+if [ -n "$ANTHROPIC_API_KEY" ] || [ -n "$CASSETTE" ]; then
   echo "🤖 Testing AI theme generation..."
-  python scripts/generate-theme.py \
+  python scripts/generate-theme.py "${CASSETTE_ARGS[@]}" \
     --business-name "$BUSINESS_NAME" \
     --business-description "A leading technology consulting firm" \
     --industry "$INDUSTRY" \
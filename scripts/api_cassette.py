@@ -0,0 +1,168 @@
+"""
+API Cassettes
+Records every Claude API request/response pair of a run to a cassette file, and
+replays them without network access so a full generation runs deterministically
+in CI. Requests are matched on a normalized form (model, temperature, system
+prompt and messages, ignoring runs of spaces and blank lines); sizing and transport
+options such as max_tokens and timeout are recorded but not matched.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Any
+
+CASSETTE_VERSION = 1
+
+# Request options that change how a response is produced or sized, not which response it is
+UNMATCHED_OPTIONS = ('max_tokens', 'timeout', 'metadata', 'stream')
+
+
+class CassetteError(RuntimeError):
+    pass
+
+
+def _collapse(value: Any) -> Any:
+    if isinstance(value, str):
+        # Runs of spaces and blank lines don't matter; line breaks are kept for readable diffs
+        lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in value.splitlines())
+        return '\n'.join(line for line in lines if line)
+    if isinstance(value, list):
+        return [_collapse(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _collapse(item) for key, item in value.items()}
+    return value
+
+
+def normalize_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a messages.create request that decide which recorded response it gets"""
+    return _collapse({key: value for key, value in request.items() if key not in UNMATCHED_OPTIONS})
+
+
+def _render(value: Any, path: str = '') -> List[str]:
+    """One line per line of text, prefixed with its path in the request, for diffing"""
+    if isinstance(value, dict):
+        return [line for key in sorted(value) for line in _render(value[key], f'{path}.{key}' if path else key)]
+    if isinstance(value, list):
+        return [line for i, item in enumerate(value) for line in _render(item, f'{path}[{i}]')]
+    if isinstance(value, str):
+        return [f'{path}| {line}' for line in value.split('\n')]
+    return [f'{path}: {json.dumps(value)}']
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    encoded = json.dumps(normalize_request(request), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def _response_to_dict(message) -> Dict[str, Any]:
+    return {
+        'content': [{'type': 'text', 'text': block.text} for block in message.content if hasattr(block, 'text')],
+        'stop_reason': message.stop_reason,
+        'model': getattr(message, 'model', None),
+        'usage': {'input_tokens': message.usage.input_tokens, 'output_tokens': message.usage.output_tokens},
+    }
+
+
+def _response_from_dict(response: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(**block) for block in response['content']],
+        stop_reason=response['stop_reason'],
+        model=response.get('model'),
+        usage=SimpleNamespace(**response['usage']),
+    )
+
+
+class _Messages:
+    def __init__(self, create):
+        self.create = create
+
+
+class RecordingClient:
+    """Wraps an Anthropic client and records each successful messages.create call"""
+
+    def __init__(self, client, path: str):
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self._client = client
+        self._lock = threading.Lock()  # calls arrive from asyncio.to_thread workers
+        self.messages = _Messages(self._create)
+
+    def _create(self, **request):
+        message = self._client.messages.create(**request)
+        interaction = {
+            'key': request_key(request),
+            'request': normalize_request(request),
+            'options': {key: request[key] for key in ('max_tokens',) if key in request},
+            'response': _response_to_dict(message),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+        return message
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        cassette = {
+            'version': CASSETTE_VERSION,
+            'recorded_at': datetime.now().isoformat(),
+            'interactions': self.interactions,
+        }
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cassette, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        os.replace(temp_path, self.path)
+
+
+class ReplayClient:
+    """Serves recorded responses; identical requests get their recordings in recorded order"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as f:
+            cassette = json.load(f)
+        if cassette.get('version') != CASSETTE_VERSION:
+            raise CassetteError(f"Unsupported cassette version {cassette.get('version')} in {path}")
+        self.interactions: List[Dict[str, Any]] = cassette['interactions']
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        for interaction in self.interactions:
+            self._queues[interaction['key']].append(interaction)
+        self._lock = threading.Lock()
+        self.served = 0
+        self.messages = _Messages(self._create)
+
+    def _create(self, **request):
+        key = request_key(request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self.served += 1
+                return _response_from_dict(queue.popleft()['response'])
+        raise CassetteError(self.mismatch_report(request))
+
+    def mismatch_report(self, request: Dict[str, Any]) -> str:
+        """Describe an unmatched request with a diff against the closest recorded one"""
+        lines = _render(normalize_request(request))
+        recorded = {interaction['key']: _render(interaction['request']) for interaction in self.interactions}
+        if not recorded:
+            return f"No recorded request matches (cassette {self.path} is empty)"
+
+        closest_lines = max(recorded.values(), key=lambda candidate: difflib.SequenceMatcher(None, lines, candidate).ratio())
+        diff = list(difflib.unified_diff(closest_lines, lines, 'recorded (closest)', 'requested', n=1, lineterm=''))
+        if not diff:
+            return (f"No recorded response left for request {request_key(request)} in {self.path} "
+                    f"(it was recorded fewer times than it was made)")
+        shown = '\n'.join(line if len(line) <= 200 else line[:200] + '...' for line in diff[:60])
+        more = f"\n... {len(diff) - 60} more diff lines" if len(diff) > 60 else ''
+        return f"No recorded request in {self.path} matches request {request_key(request)}:\n{shown}{more}"
+
+    def unused(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
@@ -0,0 +1,143 @@
+"""
+API Scheduler
+Decides which waiting client makes the next Claude API call when more clients are
+in flight than there are API slots. Requests are ordered by priority class, then by
+weighted fair queuing across tenants (agencies), with aging so low-priority work is
+never starved. A slot is held for one API request, so a higher-priority client takes
+over at the next request boundary (between stages or attempts), never mid-request.
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional
+
+from token_budget import percentile
+
+# Lower rank is served first
+PRIORITY_CLASSES = {
+    'interactive': 0,  # first-time onboarding someone is waiting for
+    'standard': 1,
+    'bulk': 2,         # re-themes and backfills
+}
+DEFAULT_PRIORITY = 'standard'
+
+DEFAULT_API_CONCURRENCY = 4
+
+# A waiting request moves up one priority class for every AGING_S seconds it has waited
+AGING_S = 60.0
+
+
+class _Waiter:
+    __slots__ = ('priority', 'tenant', 'finish_tag', 'seq', 'enqueued', 'future')
+
+    def __init__(self, priority: str, tenant: str, finish_tag: float, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.tenant = tenant
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.future = future
+
+
+class ApiScheduler:
+    def __init__(self, max_concurrent: int = DEFAULT_API_CONCURRENCY,
+                 tenant_weights: Optional[Dict[str, float]] = None, aging_s: float = AGING_S):
+        if max_concurrent < 1:
+            raise ValueError("API concurrency must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.tenant_weights = dict(tenant_weights or {})
+        self.aging_s = aging_s
+        self._active = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        # Weighted fair queuing: virtual time and each tenant's last finish tag
+        self._virtual_time = 0.0
+        self._tenant_finish: Dict[str, float] = {}
+        self._stats = {
+            name: {'dispatched': 0, 'max_depth': 0, 'waits_ms': []}
+            for name in PRIORITY_CLASSES
+        }
+
+    def weight(self, tenant: str) -> float:
+        return max(self.tenant_weights.get(tenant, 1.0), 1e-6)
+
+    def _rank(self, waiter: _Waiter, now: float) -> float:
+        rank = PRIORITY_CLASSES[waiter.priority]
+        if self.aging_s > 0:
+            rank -= int((now - waiter.enqueued) / self.aging_s)
+        return max(rank, 0)
+
+    def _depth(self, priority: str) -> int:
+        return sum(1 for waiter in self._waiting if waiter.priority == priority)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._active < self.max_concurrent and self._waiting:
+            waiter = min(self._waiting, key=lambda w: (self._rank(w, now), w.finish_tag, w.seq))
+            self._waiting.remove(waiter)
+            if waiter.future.done():  # cancelled while waiting
+                continue
+            self._active += 1
+            self._virtual_time = max(self._virtual_time, waiter.finish_tag - 1 / self.weight(waiter.tenant))
+            stats = self._stats[waiter.priority]
+            stats['dispatched'] += 1
+            stats['waits_ms'].append((now - waiter.enqueued) * 1000)
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: str = DEFAULT_PRIORITY, tenant: str = '') -> float:
+        """Wait for an API slot; returns the time spent queued in milliseconds"""
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority} (expected one of {', '.join(PRIORITY_CLASSES)})")
+        start = time.monotonic()
+        finish_tag = max(self._virtual_time, self._tenant_finish.get(tenant, 0.0)) + 1 / self.weight(tenant)
+        self._tenant_finish[tenant] = finish_tag
+        waiter = _Waiter(priority, tenant, finish_tag, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiting.append(waiter)
+        stats = self._stats[priority]
+        stats['max_depth'] = max(stats['max_depth'], self._depth(priority))
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+            elif not waiter.future.cancelled():
+                # The slot was granted just as we were cancelled; hand it on
+                self.release()
+            raise
+        return (time.monotonic() - start) * 1000
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = DEFAULT_PRIORITY, tenant: str = ''):
+        """Hold one API slot for the enclosed request; yields the queued time in milliseconds"""
+        waited_ms = await self.acquire(priority, tenant)
+        try:
+            yield waited_ms
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait times per priority class"""
+        classes = {}
+        for name, stats in self._stats.items():
+            waits = stats['waits_ms']
+            classes[name] = {
+                'queue_depth': self._depth(name),
+                'max_queue_depth': stats['max_depth'],
+                'dispatched': stats['dispatched'],
+                'wait_ms_p50': round(percentile(waits, 0.5), 1) if waits else 0.0,
+                'wait_ms_p95': round(percentile(waits, 0.95), 1) if waits else 0.0,
+                'wait_ms_max': round(max(waits), 1) if waits else 0.0,
+            }
+        return {
+            'max_concurrent': self.max_concurrent,
+            'active': self._active,
+            'aging_s': self.aging_s,
+            'classes': classes,
+        }
@@ -0,0 +1,233 @@
+#!/usr/bin/env node
+
+/**
+ * Incremental Client Build Script
+ * Rebuilds only the dynamic client pages whose config or theme hash changed since
+ * the last build, and copies them into the existing dist/. The partial astro build
+ * renders the [client] route alone (no other pages), for the changed clients only.
+ * Falls back to a full astro build when there is no previous build, a shared
+ * input (components, layouts, styles, the [client] route, build config) changed,
+ * or the client registry changed (the listing pages render every client).
+ */
+
+import { spawn } from 'child_process';
+import { createHash } from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+
+const CLIENTS_MANIFEST = 'src/config/clients/manifest.json';
+// Listing pages (/clients/, /theme-demo) render every client from the registry index
+const CLIENTS_REGISTRY = 'src/config/clients/registry.js';
+const BUILD_STATE = '.cache/client-builds.json';
+const DIST_DIR = 'dist';
+const PARTIAL_DIR = '.cache/astro-partial';
+// srcDir of the partial build: a pages tree holding only the [client] route.
+// Its pages import through the @ aliases, which still resolve to src/.
+const PARTIAL_SRC_DIR = '.cache/astro-partial-src';
+const CLIENT_ROUTE = 'src/pages/clients/[client]';
+
+// Inputs every client page depends on; a change to any of them needs a full build.
+// Per-client theme bundles (src/styles/themes) are tracked through each client's theme hash instead.
+const SHARED_INPUTS = [
+  'src/components',
+  'src/layouts',
+  'src/utils',
+  'src/styles',
+  'src/pages/clients/[client]',
+  'astro.config.mjs',
+  'tailwind.config.js',
+  'package.json',
+  'yarn.lock'
+];
+const SHARED_EXCLUDES = ['src/styles/themes'];
+
+// Simple argument parser (flags without a value are booleans)
+function parseArgs() {
+  const args = process.argv.slice(2);
+  const parsed = {};
+
+  for (let i = 0; i < args.length; i++) {
+    if (args[i].startsWith('--')) {
+      const key = args[i].slice(2).replace(/-/g, '_');
+      if (args[i + 1] === undefined || args[i + 1].startsWith('--')) {
+        parsed[key] = true;
+      } else {
+        parsed[key] = args[++i];
+      }
+    }
+  }
+
+  return parsed;
+}
+
+async function readJson(filePath, fallback) {
+  try {
+    return JSON.parse(await fs.readFile(filePath, 'utf-8'));
+  } catch (error) {
+    if (error.code !== 'ENOENT') {
+      console.warn(`Warning: Could not read ${filePath}, ignoring it: ${error.message}`);
+    }
+    return fallback;
+  }
+}
+
+async function exists(filePath) {
+  try {
+    await fs.access(filePath);
+    return true;
+  } catch {
+    return false;
+  }
+}
+
+async function listFiles(entry) {
+  if (SHARED_EXCLUDES.includes(entry)) {
+    return [];
+  }
+  let stats;
+  try {
+    stats = await fs.stat(entry);
+  } catch {
+    return [];
+  }
+  if (!stats.isDirectory()) {
+    return [entry];
+  }
+  const children = await fs.readdir(entry);
+  const nested = await Promise.all(children.map(child => listFiles(path.join(entry, child))));
+  return nested.flat();
+}
+
+// Hash of every shared input file's path and content
+async function sharedInputsHash() {
+  const files = (await Promise.all(SHARED_INPUTS.map(listFiles))).flat().sort();
+  const hash = createHash('sha256');
+  for (const file of files) {
+    hash.update(file);
+    hash.update(await fs.readFile(file));
+  }
+  return hash.digest('hex').slice(0, 16);
+}
+
+function runAstroBuild(extraArgs, env) {
+  return new Promise((resolve, reject) => {
+    const child = spawn('npx', ['astro', 'build', ...extraArgs], {
+      stdio: 'inherit',
+      env: { ...process.env, ...env }
+    });
+    child.on('error', reject);
+    child.on('exit', (code) => {
+      code === 0 ? resolve() : reject(new Error(`astro build exited with code ${code}`));
+    });
+  });
+}
+
+// Main function: decide between a full, partial or no-op build
+async function buildClients(options = {}) {
+  const manifest = await readJson(CLIENTS_MANIFEST, { clients: {} });
+  const state = await readJson(BUILD_STATE, null);
+  const dynamicClients = Object.fromEntries(
+    Object.entries(manifest.clients).filter(([, entry]) => entry.dynamicPage)
+  );
+  const sharedHash = await sharedInputsHash();
+  const registryHash = createHash('sha256').update(await fs.readFile(CLIENTS_REGISTRY).catch(() => '')).digest('hex').slice(0, 16);
+
+  let fullReason = null;
+  if (options.full) {
+    fullReason = 'requested with --full';
+  } else if (!state) {
+    fullReason = 'no previous build state';
+  } else if (!(await exists(path.join(DIST_DIR, 'index.html')))) {
+    fullReason = `no previous build in ${DIST_DIR}/`;
+  } else if (state.sharedHash !== sharedHash) {
+    fullReason = 'shared components, layouts, styles or build config changed';
+  } else if (state.registryHash !== registryHash) {
+    // A client was added, removed or renamed, or its listed colors changed
+    fullReason = 'client registry changed (listing pages show every client)';
+  }
+
+  const changed = [];
+  if (!fullReason) {
+    for (const [name, entry] of Object.entries(dynamicClients)) {
+      const built = state.clients[name];
+      const stale = !built || built.configHash !== entry.configHash || built.themeHash !== entry.themeHash;
+      if (stale || !(await exists(path.join(DIST_DIR, 'clients', name, 'index.html')))) {
+        changed.push(name);
+      }
+    }
+  }
+  const removed = state ? Object.keys(state.clients).filter(name => !dynamicClients[name]) : [];
+
+  const start = Date.now();
+  if (fullReason) {
+    console.log(`Full build: ${fullReason}`);
+    await runAstroBuild([], {});
+  } else if (changed.length) {
+    console.log(`Incremental build of ${changed.length} of ${Object.keys(dynamicClients).length} client(s): ${changed.join(', ')}`);
+    await fs.rm(PARTIAL_DIR, { recursive: true, force: true });
+    await fs.rm(PARTIAL_SRC_DIR, { recursive: true, force: true });
+    await fs.cp(CLIENT_ROUTE, path.join(PARTIAL_SRC_DIR, 'pages', 'clients', '[client]'), { recursive: true });
+    try {
+      await runAstroBuild(['--outDir', PARTIAL_DIR], { ASTRO_SRC_DIR: PARTIAL_SRC_DIR, BUILD_CLIENTS: changed.join(',') });
+    } finally {
+      await fs.rm(PARTIAL_SRC_DIR, { recursive: true, force: true });
+    }
+
+    // Content-hashed assets never collide, so the new ones are simply added
+    if (await exists(path.join(PARTIAL_DIR, '_astro'))) {
+      await fs.cp(path.join(PARTIAL_DIR, '_astro'), path.join(DIST_DIR, '_astro'), { recursive: true });
+    }
+    for (const name of changed) {
+      const target = path.join(DIST_DIR, 'clients', name);
+      await fs.rm(target, { recursive: true, force: true });
+      await fs.cp(path.join(PARTIAL_DIR, 'clients', name), target, { recursive: true });
+      console.log(`✅ Rebuilt: ${target}`);
+    }
+    await fs.rm(PARTIAL_DIR, { recursive: true, force: true });
+  } else {
+    console.log('✅ All client pages are up to date');
+  }
+
+  if (!fullReason) {
+    for (const name of removed) {
+      await fs.rm(path.join(DIST_DIR, 'clients', name), { recursive: true, force: true });
+      console.log(`Removed client no longer registered: ${name}`);
+    }
+  }
+
+  const newState = {
+    sharedHash,
+    registryHash,
+    built_at: new Date().toISOString(),
+    clients: Object.fromEntries(Object.entries(dynamicClients).map(([name, entry]) => [
+      name, { configHash: entry.configHash, themeHash: entry.themeHash }
+    ]))
+  };
+  await fs.mkdir(path.dirname(BUILD_STATE), { recursive: true });
+  await fs.writeFile(BUILD_STATE, JSON.stringify(newState, null, 2) + '\n');
+
+  return {
+    mode: fullReason ? 'full' : changed.length ? 'incremental' : 'none',
+    reason: fullReason,
+    rebuilt: fullReason ? Object.keys(dynamicClients) : changed,
+    removed: fullReason ? [] : removed,
+    durationMs: Date.now() - start
+  };
+}
+
+// CLI execution
+if (import.meta.url === `file://${process.argv[1]}`) {
+  const args = parseArgs();
+
+  buildClients({ full: Boolean(args.full) })
+    .then((result) => {
+      console.log('Client build result:', result);
+      process.exit(0);
+    })
+    .catch((error) => {
+      console.error('Client build failed:', error.message);
+      process.exit(1);
+    });
+}
+
+export { buildClients, sharedInputsHash };
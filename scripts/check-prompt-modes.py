@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Prompt Mode Check
+Generates full configs (no skeletons) for fixture businesses with both the verbose
+and the compact prompts, and compares input tokens and output structure. Fails when
+the compact prompts produce a worse structure score than the verbose ones.
+Estimated sizes are characters / 4; actual input tokens come from the API usage. Use
+--record-cassette once and --replay-cassette afterwards to run it without the API.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, List, Any
+
+from config_structure import load_config, structure_report
+
+# generate-theme.py is a script (hyphenated name), so load it by path
+_spec = importlib.util.spec_from_file_location(
+    'generate_theme', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate-theme.py')
+)
+generate_theme = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(generate_theme)
+
+MODES = ('verbose', 'compact')
+DEFAULT_FIXTURES = 'examples/prompt-fixtures.ndjson'
+
+
+def load_fixtures(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [generate_theme.build_business_data(json.loads(line)) for line in f if line.strip()]
+
+
+async def run_fixture(generator, business_data: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    client_generator = generator.for_client(business_data['client_name'])
+    client_generator.compact_prompts = mode == 'compact'
+    result = await generate_theme.generate_client(client_generator, dict(business_data))
+    metadata = result['metadata']
+
+    config = load_config(result['config'])
+    structure = structure_report(config) if config is not None else {'score': 0.0, 'error': 'config did not evaluate'}
+    merge = metadata['content_merge']
+    return {
+        'client_name': business_data['client_name'],
+        'mode': mode,
+        'input_tokens': {stage: metadata['token_usage'].get(stage, {}).get('input_tokens')
+                         for stage in generate_theme.PROMPT_STAGES},
+        'estimated_input_tokens': {stage: metadata['prompts'][stage]['estimated_input_tokens'][mode]
+                                   for stage in generate_theme.PROMPT_STAGES},
+        'structure': structure,
+        'sections_merged': len(merge.get('merged_sections', [])),
+        'sections_repaired': len(merge.get('repairs', [])),
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    for mode in MODES:
+        rows = [row for row in results if row['mode'] == mode]
+        summary[mode] = {
+            'mean_structure_score': round(sum(row['structure']['score'] for row in rows) / len(rows), 4),
+            'input_tokens': sum(sum(filter(None, row['input_tokens'].values())) for row in rows),
+            'estimated_input_tokens': sum(sum(row['estimated_input_tokens'].values()) for row in rows),
+            'sections_repaired': sum(row['sections_repaired'] for row in rows),
+        }
+    return summary
+
+
+async def main():
+    parser = generate_theme.build_arg_parser('Compare verbose and compact prompts on fixture businesses')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help=f'NDJSON business records (default: {DEFAULT_FIXTURES})')
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help='Allowed drop of the compact mean structure score below the verbose one (default: 0)')
+    parser.add_argument('--estimate-only', action='store_true',
+                        help='Only compare estimated prompt sizes, characters / 4 (no API calls)')
+    parser.add_argument('--report', default='', help='Write per-fixture results and the summary to this JSON file')
+    args = parser.parse_args()
+    # The full config prompt is what the modes differ in, so skeletons are always off here
+    args.no_skeleton = True
+    args.no_index = True
+
+    fixtures = load_fixtures(args.fixtures)
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if args.estimate_only:
+        generator = generate_theme.ThemeGenerator(api_key or 'unused', use_skeletons=False, compare_prompts=True)
+        for business_data in fixtures:
+            client_generator = generator.for_client(business_data['client_name'])
+            sizes = {}
+            for stage in generate_theme.PROMPT_STAGES:
+                with generate_theme.contextlib.redirect_stdout(sys.stderr):
+                    client_generator.build_prompts(stage, dict(business_data))
+                sizes[stage] = client_generator.prompt_report[stage]
+            print(json.dumps({'client_name': business_data['client_name'], 'prompts': sizes}))
+        return
+
+    if not api_key and not args.replay_cassette:
+        print("Error: ANTHROPIC_API_KEY environment variable not set (or use --replay-cassette)")
+        sys.exit(1)
+
+    generator = generate_theme.create_generator(args, api_key, generate_theme.Tracer(enabled=False))
+    results = []
+    for business_data in fixtures:
+        for mode in MODES:
+            print(f"=== {business_data['client_name']} ({mode}) ===")
+            results.append(await run_fixture(generator, business_data, mode))
+    generate_theme.save_run_history(generator)
+
+    summary = summarize(results)
+    print("\nFixture                         mode     score   input tokens (actual / estimated)")
+    for row in results:
+        actual = sum(filter(None, row['input_tokens'].values()))
+        estimated = sum(row['estimated_input_tokens'].values())
+        print(f"{row['client_name']:<31} {row['mode']:<8} {row['structure']['score']:<7} {actual} / {estimated}")
+    print(json.dumps(summary, indent=2))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'summary': summary}, f, indent=2)
+            f.write('\n')
+        print(f"Report written to: {args.report}")
+
+    drop = summary['verbose']['mean_structure_score'] - summary['compact']['mean_structure_score']
+    if drop > args.tolerance:
+        print(f"❌ Compact prompts regress structure by {drop:.4f} (tolerance {args.tolerance})")
+        sys.exit(1)
+    print("✅ Compact prompts keep the output structure")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
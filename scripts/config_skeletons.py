@@ -0,0 +1,146 @@
+"""
+Config Skeleton Pool
+Stores one validated client config skeleton per industry. The skeleton holds the
+industry-generic structure (hours, icons, placeholder services, SEO shell) with
+"{{field}}" placeholders; each client only fills the personalized fields.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Bump when the skeleton format or its prompt changes; older entries are regenerated
+SKELETON_VERSION = 1
+
+DEFAULT_POOL_DIR = '.cache/config-skeletons'
+
+# Skeletons older than this are regenerated the next time their industry is used
+MAX_AGE_DAYS = 30
+
+# Fields filled locally from business data and the resolved colors
+LOCAL_FIELDS = (
+    'business.name',
+    'business.industry',
+    'contact.email',
+    'contact.phone',
+    'contact.website',
+    'branding.colors.primary',
+    'branding.colors.secondary',
+    'branding.colors.accent',
+    'branding.colors.neutral',
+    'seo.og.url',
+)
+
+# Fields the model writes for each client
+PERSONALIZED_FIELDS = (
+    'business.legalName',
+    'business.tagline',
+    'business.shortDescription',
+    'business.longDescription',
+    'business.yearFounded',
+    'contact.address.street',
+    'contact.address.city',
+    'contact.address.state',
+    'contact.address.country',
+    'contact.address.zip',
+    'social.linkedin',
+    'social.twitter',
+    'social.facebook',
+    'social.instagram',
+    'branding.fonts.heading',
+    'branding.fonts.body',
+    'seo.title',
+    'seo.description',
+    'seo.keywords',
+    'seo.og.title',
+    'seo.og.description',
+)
+
+SKELETON_FIELDS = LOCAL_FIELDS + PERSONALIZED_FIELDS
+
+_PLACEHOLDER = re.compile(r'"\{\{([\w.]+)\}\}"')
+
+
+def placeholder(field: str) -> str:
+    return f'"{{{{{field}}}}}"'
+
+
+def missing_placeholders(skeleton: str) -> List[str]:
+    """Fields whose placeholder does not appear in the skeleton"""
+    found = set(_PLACEHOLDER.findall(skeleton))
+    return [field for field in SKELETON_FIELDS if field not in found]
+
+
+def flatten_fields(values: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """{'seo': {'og': {'title': x}}} -> {'seo.og.title': x}"""
+    flat = {}
+    for key, value in values.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten_fields(value, f'{path}.'))
+        else:
+            flat[path] = value
+    return flat
+
+
+def fill_skeleton(skeleton: str, values: Dict[str, Any]) -> str:
+    """Replace every placeholder with its value as a JS literal (JSON is valid JS here)"""
+    def replace(match):
+        value = values.get(match.group(1), '')
+        if value is None:
+            value = ''
+        return json.dumps(value, ensure_ascii=False)
+    return _PLACEHOLDER.sub(replace, skeleton)
+
+
+class SkeletonPool:
+    def __init__(self, pool_dir: str = DEFAULT_POOL_DIR, max_age_days: float = MAX_AGE_DAYS):
+        self.pool_dir = pool_dir
+        self.max_age_days = max_age_days
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def lock(self, industry: str) -> asyncio.Lock:
+        """Held while an industry's skeleton is generated, so concurrent clients wait for one copy"""
+        return self._locks.setdefault(industry, asyncio.Lock())
+
+    def _path(self, industry: str) -> str:
+        return os.path.join(self.pool_dir, f"{re.sub(r'[^a-z0-9]+', '-', industry.lower())}.json")
+
+    def get(self, industry: str, prompt_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry if it is current, or None when it must be (re)generated"""
+        try:
+            with open(self._path(industry), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get('version') != SKELETON_VERSION or entry.get('prompt_hash') != prompt_hash:
+            return None
+        if time.time() - entry.get('created_ts', 0) > self.max_age_days * 86400:
+            return None
+        if missing_placeholders(entry.get('skeleton', '')):
+            return None
+        return entry
+
+    def put(self, industry: str, prompt_hash: str, skeleton: str, generation: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a validated skeleton along with what generating it cost"""
+        entry = {
+            'version': SKELETON_VERSION,
+            'industry': industry,
+            'prompt_hash': prompt_hash,
+            'created_at': datetime.now().isoformat(),
+            'created_ts': time.time(),
+            'generation': generation,
+            'skeleton': skeleton,
+        }
+        os.makedirs(self.pool_dir, exist_ok=True)
+        path = self._path(industry)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp_path, path)
+        return entry
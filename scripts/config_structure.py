@@ -0,0 +1,144 @@
+"""
+Config Structure
+The client config shape as one schema, used both to describe the target structure
+in compact prompts and to score how well a generated config follows it (so a
+shorter prompt can be checked for structure regressions against fixtures).
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+from typing import Dict, List, Any, Optional
+
+NODE_LOAD_TIMEOUT_S = 10
+
+# Leaves are the expected type; a one-item list means "list of" that item
+CONFIG_SCHEMA: Dict[str, Any] = {
+    'business': {
+        'name': str, 'legalName': str, 'tagline': str, 'shortDescription': str,
+        'longDescription': str, 'yearFounded': int, 'industry': str, 'license': str,
+    },
+    'contact': {
+        'email': str, 'phone': str,
+        'address': {'street': str, 'city': str, 'state': str, 'country': str, 'zip': str},
+        'hours': {day: str for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')},
+        'website': str,
+    },
+    'social': {'linkedin': str, 'twitter': str, 'facebook': str, 'instagram': str},
+    'branding': {
+        'logo': {'main': str, 'dark': str, 'light': str},
+        'colors': {'primary': str, 'secondary': str, 'accent': str, 'neutral': str},
+        'fonts': {'heading': str, 'body': str},
+    },
+    'content': {
+        'hero': {'headline': str, 'subheadline': str, 'cta': str, 'secondaryCta': str},
+        'features': [{'title': str, 'description': str, 'icon': str, 'image': str}],
+        'services': [{'name': str, 'description': str, 'features': [str], 'price': str, 'cta': str}],
+        'testimonials': [{'quote': str, 'author': str, 'title': str, 'company': str}],
+        'about': {
+            'story': str, 'mission': str, 'values': [str],
+            'team': [{'name': str, 'title': str, 'image': str}],
+        },
+    },
+    'seo': {
+        'title': str, 'description': str, 'keywords': [str],
+        'og': {'title': str, 'description': str, 'image': str, 'url': str},
+    },
+}
+
+# Item counts the prompts ask for (min, max)
+CONTENT_COUNTS = {
+    'content.features': (4, 6),
+    'content.services': (3, 3),
+    'content.testimonials': (4, 4),
+    'content.about.values': (4, 4),
+}
+
+_TYPE_NAMES = {str: '', int: ':int'}
+
+
+def render_schema(schema: Any = CONFIG_SCHEMA) -> str:
+    """Compact notation, e.g. `hero{headline,cta}`, `features[{title}]`, `yearFounded:int`"""
+    if isinstance(schema, dict):
+        return '{' + ','.join(f'{key}{render_schema(value)}' for key, value in schema.items()) + '}'
+    if isinstance(schema, list):
+        return '[' + render_schema(schema[0]).lstrip(':') + ']'
+    return _TYPE_NAMES.get(schema, '')
+
+
+def _check(value: Any, schema: Any, path: str, report: Dict[str, List[str]]) -> None:
+    report['checked'].append(path)
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            report['wrong_type'].append(path)
+            return
+        for key, child in schema.items():
+            child_path = f'{path}.{key}' if path else key
+            if key not in value:
+                report['missing'].append(child_path)
+            else:
+                _check(value[key], child, child_path, report)
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            report['wrong_type'].append(path)
+            return
+        if not value:
+            report['empty'].append(path)
+        for i, item in enumerate(value):
+            _check(item, schema[0], f'{path}[{i}]', report)
+    elif schema is int:
+        if not isinstance(value, int) or isinstance(value, bool):
+            report['wrong_type'].append(path)
+    elif not isinstance(value, str) or not value.strip():
+        # Empty strings are fine where the business has no value (e.g. phone), but they count as gaps
+        (report['wrong_type'] if not isinstance(value, str) else report['empty']).append(path)
+
+
+def structure_report(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Score a parsed config against CONFIG_SCHEMA: 1.0 means every path is present, typed and non-empty"""
+    report = {'checked': [], 'missing': [], 'wrong_type': [], 'empty': []}
+    _check(config, CONFIG_SCHEMA, '', report)
+
+    counts = {}
+    for path, (low, high) in CONTENT_COUNTS.items():
+        value = config
+        for key in path.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        count = len(value) if isinstance(value, list) else 0
+        if not low <= count <= high:
+            counts[path] = count
+
+    failures = len(report['missing']) + len(report['wrong_type'])
+    total = len(report['checked']) + len(report['missing'])
+    return {
+        'score': round(1 - (failures + 0.5 * len(report['empty'])) / max(total, 1), 4),
+        'paths_checked': total,
+        'missing': report['missing'],
+        'wrong_type': report['wrong_type'],
+        'empty': report['empty'],
+        'counts_out_of_range': counts,
+    }
+
+
+def load_config(config_js: str) -> Optional[Dict[str, Any]]:
+    """Evaluate a generated config module with Node and return `clientConfig` as a dict (None if it fails)"""
+    with tempfile.TemporaryDirectory() as directory:
+        module_path = os.path.join(directory, 'config.mjs')
+        with open(module_path, 'w', encoding='utf-8') as f:
+            f.write(config_js)
+        script = ("import(process.argv[1]).then(m => process.stdout.write("
+                  "JSON.stringify(m.clientConfig ?? m.default ?? null)))")
+        try:
+            result = subprocess.run(['node', '--input-type=module', '-e', script, module_path],
+                                    capture_output=True, text=True, timeout=NODE_LOAD_TIMEOUT_S)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Warning: Could not evaluate config with node: {e}")
+            return None
+    if result.returncode != 0:
+        return None
+    try:
+        config = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return None
+    return config if isinstance(config, dict) else None
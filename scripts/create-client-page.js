@@ -219,6 +219,13 @@ const logoBasePath = '/images/clients/${clientName}';
 `;
 }
 
+// Write through a temp file and rename, so an interrupted run never leaves a partial page
+async function writeFileAtomic(filePath, content) {
+  const tempPath = `${filePath}.${process.pid}.tmp`;
+  await fs.writeFile(tempPath, content);
+  await fs.rename(tempPath, filePath);
+}
+
 // Main function to create client page
 async function createClientPage(clientName) {
   console.log(`Creating client page for: ${clientName}`);
@@ -230,13 +237,13 @@ async function createClientPage(clientName) {
   // Generate main page
   const mainPageContent = generateClientPageTemplate(clientName);
   const mainPagePath = path.join(clientPageDir, 'index.astro');
-  await fs.writeFile(mainPagePath, mainPageContent);
+  await writeFileAtomic(mainPagePath, mainPageContent);
   console.log(`✅ Main page created: ${mainPagePath}`);
   
   // Generate assets page
   const assetsPageContent = generateAssetsPageTemplate(clientName);
   const assetsPagePath = path.join(clientPageDir, 'assets.astro');
-  await fs.writeFile(assetsPagePath, assetsPageContent);
+  await writeFileAtomic(assetsPagePath, assetsPageContent);
   console.log(`✅ Assets page created: ${assetsPagePath}`);
   
   // Create README for the client directory
@@ -248,7 +255,7 @@ This directory contains the generated client site files for ${clientName}.
 - \`index.astro\` - Main client page
 - \`assets.astro\` - Brand assets showcase
 - Configuration: \`src/config/clients/${clientName}.js\`
-- Theme: \`theme-${clientName}\` class in \`src/styles/client-themes.css\`
+- Theme: \`theme-${clientName}\` class in \`src/styles/themes/${clientName}.css\`
 - Assets: \`public/images/clients/${clientName}/\`
 
 ## Generated by:
@@ -258,7 +265,7 @@ Generated on: ${new Date().toISOString()}
 `;
   
   const readmePath = path.join(clientPageDir, 'README.md');
-  await fs.writeFile(readmePath, readmeContent);
+  await writeFileAtomic(readmePath, readmeContent);
   console.log(`✅ README created: ${readmePath}`);
   
   return {
@@ -7,14 +7,24 @@ Uses Claude API to generate personalized website content and themes
 
 import json
 import argparse
+import atexit
 import os
+import re
+import shutil
+import subprocess
+import tempfile
 import sys
+import traceback
 from datetime import datetime
 import asyncio
 import aiohttp
 import time
 import random
-from typing import Dict, List, Optional, Any
+import hashlib
+import sqlite3
+import copy
+import contextlib
+from typing import Awaitable, Dict, List, Optional, Any
 
 try:
     import anthropic
@@ -22,28 +32,331 @@ except ImportError:
     print("Error: anthropic package not found. Install with: pip install anthropic")
     sys.exit(1)
 
+from token_budget import TokenBudget
+import config_skeletons
+from model_routing import DEFAULT_MODEL, FAST_MODEL, ModelRouter
+from trace_events import Tracer
+from memory_profile import MemoryProfiler
+from status_events import StatusReporter
+from api_scheduler import AGING_S, DEFAULT_API_CONCURRENCY, DEFAULT_PRIORITY, PRIORITY_CLASSES, ApiScheduler
+from api_cassette import RecordingClient, ReplayClient
+from request_coalescing import RequestCoalescer, coalescing_key
+from generation_index import DEFAULT_INDEX_PATH, GenerationIndex, input_hash
+from palette_snap import get_palette_index, snap_theme
+from config_structure import CONFIG_SCHEMA, render_schema
+from theme_accessibility import CONTRAST_LEVELS, WHITE, relative_luminance, contrast_ratio, enforce_theme_contrast
+
+# Palette optimization needs numpy; without it colors are picked by strict priority only
+try:
+    import palette_optimizer
+except ImportError:
+    palette_optimizer = None
+
+PALETTE_BUDGET_MS = palette_optimizer.DEFAULT_BUDGET_MS if palette_optimizer else 25.0
+
+# In-process logo color extraction needs numpy and Pillow; otherwise colors come from process-logo.js
+try:
+    import logo_colors
+except ImportError:
+    logo_colors = None
+
+# Output budget for a single API response, and how many times a truncated response is resumed
+MAX_OUTPUT_TOKENS = 4000
+MAX_CONTINUATIONS = 3
+
+# Per-client deadline, and the time assumed for an API attempt before any latency is recorded
+DEFAULT_DEADLINE_S = 300.0
+MIN_ATTEMPT_S = 10.0
+NODE_CHECK_TIMEOUT_S = 10
+
+# Custom content sections, the field each must carry, and how they are re-requested when broken
+CONTENT_SECTIONS = ('hero', 'features', 'services', 'testimonials', 'about')
+CONTENT_SECTION_KEYS = {
+    'hero': 'headline',
+    'features': 'title',
+    'services': 'name',
+    'testimonials': 'quote',
+    'about': 'story',
+}
+CONTENT_SECTION_SHAPES = {
+    'hero': '{"headline": "...", "subheadline": "...", "cta": "...", "secondaryCta": "..."}',
+    'features': '[{"title": "...", "description": "..."}] (4-6 items)',
+    'services': '[{"name": "...", "description": "...", "features": ["..."], "price": "...", "cta": "..."}] (3 items)',
+    'testimonials': '[{"quote": "...", "author": "...", "title": "...", "company": "..."}] (4 items)',
+    'about': '{"story": "...", "mission": "...", "values": ["...", "...", "...", "..."]}',
+}
+REPAIR_MAX_TOKENS = {
+    'hero': 300,
+    'features': 900,
+    'services': 1200,
+    'testimonials': 900,
+    'about': 600,
+}
+MAX_SECTION_REPAIRS = 3
+
+# --variants: word-count limits per field and the weights of the local ranking score
+MAX_VARIANTS = 10
+VARIANT_WORD_LIMITS = {
+    'headline': (4, 10),
+    'subheadline': (12, 25),
+    'tagline': (2, 10),
+    'cta': (1, 4),
+}
+VARIANT_SCORE_WEIGHTS = {'readability': 0.35, 'length': 0.35, 'harmony': 0.3}
+VARIANTS_DIR = 'variants'
+
+# Rough prompt size estimate used to compare prompt modes before sending (actual counts come from the API)
+CHARS_PER_TOKEN = 4
+PROMPT_STAGES = ('base_config', 'custom_content')
+
+# Industry-based color mappings; the keys also name the industries that share a config skeleton
+INDUSTRY_COLORS = {
+    # Technology & Software
+    'technology': {'primary': '#2563eb', 'secondary': '#475569', 'accent': '#06b6d4'},
+    'software': {'primary': '#1d4ed8', 'secondary': '#64748b', 'accent': '#0ea5e9'},
+    'ai': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#a855f7'},
+    'cybersecurity': {'primary': '#dc2626', 'secondary': '#374151', 'accent': '#f59e0b'},
+
+    # Finance & Legal
+    'finance': {'primary': '#065f46', 'secondary': '#374151', 'accent': '#d97706'},
+    'banking': {'primary': '#1e40af', 'secondary': '#475569', 'accent': '#059669'},
+    'legal': {'primary': '#1f2937', 'secondary': '#6b7280', 'accent': '#b45309'},
+    'consulting': {'primary': '#374151', 'secondary': '#6b7280', 'accent': '#0891b2'},
+
+    # Healthcare
+    'health': {'primary': '#059669', 'secondary': '#6b7280', 'accent': '#0284c7'},
+    'medical': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#059669'},
+    'wellness': {'primary': '#16a34a', 'secondary': '#64748b', 'accent': '#0ea5e9'},
+
+    # Creative & Marketing
+    'creative': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
+    'design': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#f59e0b'},
+    'marketing': {'primary': '#dc2626', 'secondary': '#6b7280', 'accent': '#ea580c'},
+    'advertising': {'primary': '#c2410c', 'secondary': '#64748b', 'accent': '#7c3aed'},
+
+    # Real Estate & Construction
+    'real estate': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#d97706'},
+    'construction': {'primary': '#b45309', 'secondary': '#6b7280', 'accent': '#dc2626'},
+
+    # Education
+    'education': {'primary': '#1d4ed8', 'secondary': '#64748b', 'accent': '#059669'},
+    'training': {'primary': '#0369a1', 'secondary': '#6b7280', 'accent': '#16a34a'},
+
+    # Retail & E-commerce
+    'retail': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
+    'ecommerce': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#dc2626'},
+
+    # Food & Hospitality
+    'food': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
+    'restaurant': {'primary': '#b45309', 'secondary': '#6b7280', 'accent': '#dc2626'},
+    'hospitality': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#d97706'},
+}
+
+# Per-client theme bundles: one CSS file per client plus a manifest read by Layout.astro
+THEMES_DIR = 'src/styles/themes'
+THEMES_MANIFEST = 'manifest.json'
+
+# Client registry read by the dynamic src/pages/clients/[client] route and build-clients.js
+CLIENTS_DIR = 'src/config/clients'
+CLIENTS_MANIFEST = 'manifest.json'
+# Lazy-import registry and lightweight index generated from the client manifest
+CLIENTS_REGISTRY = 'registry.js'
+
+CONTENT_SYSTEM_PROMPT = "You are a professional copywriter and marketing expert. Create compelling, industry-specific marketing content that converts visitors into customers. Always provide content in valid JSON format without markdown code blocks."
+COMPACT_CONTENT_SYSTEM_PROMPT = "You are a conversion copywriter. Answer with valid JSON only, no markdown."
+
+class DeadlineExceeded(TimeoutError):
+    """A client's generation deadline passed (or the remaining time cannot fit the next step)"""
+
+
 class ThemeGenerator:
-    def __init__(self, api_key: str):
-        if not api_key:
+    def __init__(self, api_key: str, contrast_level: Optional[str] = 'AA',
+                 optimize_palette: bool = False, palette_budget_ms: float = PALETTE_BUDGET_MS,
+                 use_skeletons: bool = True, skeleton_dir: Optional[str] = None, router: Optional[ModelRouter] = None,
+                 tracer: Optional[Tracer] = None, memory: Optional[MemoryProfiler] = None,
+                 status: Optional[StatusReporter] = None,
+                 index: Optional[GenerationIndex] = None,
+                 scheduler: Optional[ApiScheduler] = None, priority: str = DEFAULT_PRIORITY, tenant: str = '',
+                 coalescer: Optional[RequestCoalescer] = None,
+                 deadline_s: Optional[float] = None, snap_palette: Optional[str] = None, client=None,
+                 variants: int = 0, dynamic_pages: bool = False, compact_prompts: bool = False,
+                 compare_prompts: bool = False):
+        if not api_key and client is None:
             raise ValueError("Anthropic API key is required")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        if contrast_level and contrast_level not in CONTRAST_LEVELS:
+            raise ValueError(f"Unknown contrast level: {contrast_level}")
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        if not 0 <= variants <= MAX_VARIANTS:
+            raise ValueError(f"Variants must be between 0 and {MAX_VARIANTS}")
+        if optimize_palette and palette_optimizer is None:
+            raise ValueError("Palette optimization requires numpy. Install with: pip install numpy")
+        # `client` replaces the SDK client, e.g. with a cassette recorder or player
+        self.client = client or anthropic.Anthropic(api_key=api_key)
+        self.contrast_level = contrast_level
+        self.contrast_report: Dict[str, Any] = {}
+        self.optimize_palette = optimize_palette
+        self.palette_budget_ms = palette_budget_ms
+        self.palette_report: Dict[str, Any] = {}
+        self._palette_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.token_budget = TokenBudget(default_budget=MAX_OUTPUT_TOKENS)
+        self.usage: Dict[str, Dict[str, Any]] = {}
+        self.merge_report: Dict[str, Any] = {}
+        self.skeleton_pool = (config_skeletons.SkeletonPool(skeleton_dir or config_skeletons.DEFAULT_POOL_DIR)
+                              if use_skeletons else None)
+        self.skeleton_report: Dict[str, Any] = {}
+        self.router = router or ModelRouter()
+        self.tracer = tracer or Tracer(enabled=False)
+        self.memory = memory or MemoryProfiler(enabled=False)
+        self.status = status or StatusReporter()
+        self.index = index
+        self.scheduler = scheduler or ApiScheduler()
+        # Shared by every client, so concurrent identical requests make one API call
+        self.coalescer = coalescer or RequestCoalescer(private_errors=(DeadlineExceeded,))
+        self.priority = priority
+        self.tenant = tenant
+        self.schedule_report: Dict[str, Any] = {}
+        self.deadline_s = deadline_s
+        self.deadline: Optional[float] = None
+        # Palettes are indexed once per process and shared by every client
+        self.palette_index = get_palette_index(snap_palette) if snap_palette else None
+        self.snap_report: Dict[str, Any] = {}
+        self.theme_colors: Dict[str, str] = {}
+        self.variants = variants
+        self.dynamic_pages = dynamic_pages
+        self.compact_prompts = compact_prompts
+        self.compare_prompts = compare_prompts
+        self.prompt_report: Dict[str, Any] = {}
+        self._validated: Dict[str, bool] = {}
     
-    async def call_claude_with_retry(self, **kwargs):
+    def for_client(self, client_name: str, priority: Optional[str] = None, tenant: Optional[str] = None) -> 'ThemeGenerator':
+        """A generator for one client that shares the API client, router, budgets, scheduler, request
+        coalescer and skeleton pool but keeps its own per-client reports (used when clients are generated concurrently).
+        Its API calls are scheduled under `priority` and `tenant` (default: this generator's, and
+        the client itself as tenant)."""
+        priority = priority or self.priority
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        generator = copy.copy(self)
+        generator.priority = priority
+        generator.tenant = tenant or self.tenant or client_name
+        generator.schedule_report = {'priority': generator.priority, 'tenant': generator.tenant,
+                                     'api_calls': 0, 'queued_ms': 0.0, 'coalesced_calls': 0}
+        # The client's deadline starts now and covers every stage, API attempt and subprocess
+        generator.deadline = time.monotonic() + self.deadline_s if self.deadline_s else None
+        generator.contrast_report = {}
+        generator.palette_report = {}
+        generator._palette_cache = {}
+        generator.usage = {}
+        generator.merge_report = {}
+        generator.skeleton_report = {}
+        generator.theme_colors = {}
+        generator.snap_report = {}
+        generator.prompt_report = {}
+        generator._validated = {}
+        generator.tracer = self.tracer.for_client(client_name)
+        generator.memory = self.memory.for_client(client_name)
+        generator.status = self.status.for_client(client_name)
+        return generator
+    
+    def remaining_s(self, before: str = 'next step') -> Optional[float]:
+        """Seconds left before the client's deadline (None without one); raises DeadlineExceeded once it has passed"""
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.deadline_s:g}s exceeded before {before}")
+        return remaining
+    
+    async def within_deadline(self, awaitable, during: str):
+        """Await with the client's remaining time as timeout; the awaited task is cancelled when it runs out"""
+        remaining = self.remaining_s(during)
+        if remaining is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f"Deadline of {self.deadline_s:g}s exceeded during {during}") from None
+    
+    def retry_fits(self, stage: str, model: Optional[str], delay: float) -> bool:
+        """Whether a backoff of `delay` seconds plus a typical attempt still fits before the deadline"""
+        if self.deadline is None:
+            return True
+        expected_ms = self.router.expected_latency_ms(model, stage)
+        attempt_s = expected_ms / 1000 if expected_ms is not None else MIN_ATTEMPT_S
+        return time.monotonic() + delay + attempt_s < self.deadline
+    
+    async def backoff(self, stage: str, model: Optional[str], delay: float, error: Exception, reason: str) -> None:
+        """Sleep before a retry, or raise DeadlineExceeded when the retry could not finish in time"""
+        if not self.retry_fits(stage, model, delay):
+            raise DeadlineExceeded(
+                f"Skipping retry of {stage}: {delay:.1f}s backoff plus an attempt does not fit in the remaining "
+                f"{max(self.deadline - time.monotonic(), 0):.1f}s"
+            ) from error
+        print(f"{reason}. Retrying in {delay:.1f} seconds...")
+        self.status.emit('api_retry', stage, reason, delay_s=round(delay, 1))
+        with self.tracer.span('backoff', 'sleep', stage=stage, delay_s=round(delay, 2)):
+            await asyncio.sleep(delay)
+    
+    async def call_claude_with_retry(self, stage: str = 'unspecified', **kwargs):
+        """Call Claude API with retries; an identical request already in flight is waited for and shared"""
+        message, shared = await self.coalescer.run(
+            coalescing_key(kwargs),
+            lambda: self._call_claude_with_retry(stage, **kwargs),
+            wait=lambda in_flight: self.within_deadline(in_flight, f'{stage} shared API call'),
+        )
+        if shared:
+            self.tracer.instant('coalesced', 'api', stage=stage, model=kwargs.get('model'))
+            if self.schedule_report:
+                self.schedule_report['coalesced_calls'] += 1
+        return message
+    
+    async def _call_claude_with_retry(self, stage: str, **kwargs):
         """Call Claude API with exponential backoff retry for overload errors"""
         max_retries = 5
         base_delay = 2  # Start with 2 seconds
+        model = kwargs.get('model')
         
         for attempt in range(max_retries):
             try:
-                return self.client.messages.create(**kwargs)
+                # Wait for an API slot; higher-priority clients take over between requests
+                with self.tracer.span('queued', 'scheduler', stage=stage, priority=self.priority, tenant=self.tenant):
+                    queued_ms = await self.within_deadline(self.scheduler.acquire(self.priority, self.tenant), f'{stage} API slot')
+                if self.schedule_report:
+                    self.schedule_report['api_calls'] += 1
+                    self.schedule_report['queued_ms'] = round(self.schedule_report['queued_ms'] + queued_ms, 1)
+                try:
+                    # The SDK timeout aborts the HTTP request itself when the deadline is reached
+                    remaining = self.remaining_s(f'{stage} attempt {attempt + 1}')
+                    request = dict(kwargs, timeout=remaining) if remaining is not None else kwargs
+                    self.status.emit('api_attempt', stage, f'{stage} API attempt {attempt + 1}',
+                                     attempt=attempt + 1, model=model)
+                    start = time.perf_counter()
+                    with self.tracer.span('messages.create', 'api', stage=stage, model=model,
+                                          attempt=attempt + 1) as span:
+                        # Run the blocking SDK call in a worker thread so concurrent clients overlap
+                        message = await self.within_deadline(
+                            asyncio.to_thread(self.client.messages.create, **request), f'{stage} attempt {attempt + 1}'
+                        )
+                        span.update(stop_reason=message.stop_reason, output_tokens=message.usage.output_tokens)
+                finally:
+                    self.scheduler.release()
+                self.router.record_call(model, stage, (time.perf_counter() - start) * 1000,
+                                        message.usage.input_tokens, message.usage.output_tokens)
+                return message
+            except anthropic.APITimeoutError as e:
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    raise DeadlineExceeded(f"Deadline of {self.deadline_s:g}s exceeded during {stage} attempt {attempt + 1}") from e
+                raise e
             except anthropic.RateLimitError as e:
                 if attempt == max_retries - 1:  # Last attempt
                     raise e
                 
                 # Calculate delay with exponential backoff + jitter
                 delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"API rate limited (attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f} seconds...")
-                time.sleep(delay)
+                await self.backoff(stage, model, delay, e, f"API rate limited (attempt {attempt + 1}/{max_retries})")
             except anthropic.APIStatusError as e:
                 # Check if it's a 529 overload error or similar retryable error
                 if hasattr(e, 'status_code') and e.status_code in [429, 529]:
@@ -52,8 +365,8 @@ class ThemeGenerator:
                     
                     # Calculate delay with exponential backoff + jitter
                     delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                    print(f"API overloaded (status {e.status_code}, attempt {attempt + 1}/{max_retries}). Retrying in {delay:.1f} seconds...")
-                    time.sleep(delay)
+                    await self.backoff(stage, model, delay, e,
+                                       f"API overloaded (status {e.status_code}, attempt {attempt + 1}/{max_retries})")
                 else:
                     # For other API errors, don't retry
                     raise e
@@ -61,6 +374,67 @@ class ThemeGenerator:
                 # For other errors, don't retry
                 raise e
     
+    async def create_with_continuation(self, stage: str, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Call Claude and resume from the partial output whenever a response hits max_tokens"""
+        max_tokens = self.token_budget.budget_for(stage, kwargs.pop('max_tokens', None))
+        text = ''
+        usage = {'model': kwargs.get('model'), 'max_tokens': max_tokens, 'input_tokens': 0, 'output_tokens': 0, 'continuations': 0}
+        
+        for attempt in range(MAX_CONTINUATIONS + 1):
+            request_messages = list(messages)
+            if text:
+                # Prefill the partial output so the model continues exactly where it stopped
+                # (the API rejects assistant prefill that ends in whitespace)
+                text = text.rstrip()
+                request_messages.append({"role": "assistant", "content": text})
+            
+            message = await self.call_claude_with_retry(stage, max_tokens=max_tokens, messages=request_messages, **kwargs)
+            text += message.content[0].text
+            usage['input_tokens'] += message.usage.input_tokens
+            usage['output_tokens'] += message.usage.output_tokens
+            
+            if message.stop_reason != 'max_tokens':
+                break
+            if attempt == MAX_CONTINUATIONS:
+                print(f"Warning: {stage} still truncated after {MAX_CONTINUATIONS} continuations")
+                break
+            usage['continuations'] += 1
+            print(f"{stage} hit max_tokens ({max_tokens}) after {len(text)} characters, continuing...")
+        
+        self.token_budget.record(stage, usage['output_tokens'])
+        usage['distribution'] = self.token_budget.distribution(stage)
+        self.usage[stage] = usage
+        return text
+    
+    async def generate_stage(self, stage: str, system: str, messages: List[Dict[str, str]], validate=None) -> str:
+        """Run a stage on its routed model, retrying on the default model if the output fails validation"""
+        settings = self.router.settings_for(stage)
+        text = await self.create_with_continuation(stage, messages, system=system, **settings)
+        
+        # Validators may run node --check, so they run in a worker thread to keep other clients moving
+        if validate and not await asyncio.to_thread(validate, text):
+            self.router.record_rejection(settings['model'], stage)
+            fallback = self.router.fallback_for(stage)
+            if fallback:
+                print(f"{stage} output from {settings['model']} failed validation, retrying with {fallback['model']}...")
+                text = await self.create_with_continuation(stage, messages, system=system, **fallback)
+                self.usage[stage]['fallback_from'] = settings['model']
+        
+        return text
+    
+    def clean_json_response(self, content: str) -> str:
+        """Strip whitespace and markdown code fences around a JSON response"""
+        content = content.strip()
+        if content.startswith('```'):
+            lines = content.split('\n')
+            content = '\n'.join(lines[1:-1] if lines[-1].strip().startswith('```') else lines[1:])
+        return content.strip()
+    
+    def parse_json_object(self, content: str) -> Dict[str, Any]:
+        """Parse the outermost JSON object in a response (raises ValueError)"""
+        content = self.clean_json_response(content)
+        return json.loads(content[content.index('{'):content.rindex('}') + 1])
+    
     def create_system_prompt(self) -> str:
         return """You are an expert web developer and brand designer specializing in creating personalized website configurations. Given business information and brand colors, you generate complete website configurations that include:
 
@@ -86,57 +460,14 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
     def generate_business_based_colors(self, business_data: Dict[str, Any]) -> Dict[str, str]:
         """Generate color palette based on business information"""
         business_name = business_data.get('business_name', '').lower()
-        industry = business_data.get('industry', '').lower()
         description = business_data.get('business_description', '').lower()
         target_audience = business_data.get('target_audience', '').lower()
         
-        # Industry-based color mappings
-        industry_colors = {
-            # Technology & Software
-            'technology': {'primary': '#2563eb', 'secondary': '#475569', 'accent': '#06b6d4'},
-            'software': {'primary': '#1d4ed8', 'secondary': '#64748b', 'accent': '#0ea5e9'},
-            'ai': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#a855f7'},
-            'cybersecurity': {'primary': '#dc2626', 'secondary': '#374151', 'accent': '#f59e0b'},
-            
-            # Finance & Legal
-            'finance': {'primary': '#065f46', 'secondary': '#374151', 'accent': '#d97706'},
-            'banking': {'primary': '#1e40af', 'secondary': '#475569', 'accent': '#059669'},
-            'legal': {'primary': '#1f2937', 'secondary': '#6b7280', 'accent': '#b45309'},
-            'consulting': {'primary': '#374151', 'secondary': '#6b7280', 'accent': '#0891b2'},
-            
-            # Healthcare
-            'health': {'primary': '#059669', 'secondary': '#6b7280', 'accent': '#0284c7'},
-            'medical': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#059669'},
-            'wellness': {'primary': '#16a34a', 'secondary': '#64748b', 'accent': '#0ea5e9'},
-            
-            # Creative & Marketing
-            'creative': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
-            'design': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#f59e0b'},
-            'marketing': {'primary': '#dc2626', 'secondary': '#6b7280', 'accent': '#ea580c'},
-            'advertising': {'primary': '#c2410c', 'secondary': '#64748b', 'accent': '#7c3aed'},
-            
-            # Real Estate & Construction
-            'real estate': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#d97706'},
-            'construction': {'primary': '#b45309', 'secondary': '#6b7280', 'accent': '#dc2626'},
-            
-            # Education
-            'education': {'primary': '#1d4ed8', 'secondary': '#64748b', 'accent': '#059669'},
-            'training': {'primary': '#0369a1', 'secondary': '#6b7280', 'accent': '#16a34a'},
-            
-            # Retail & E-commerce
-            'retail': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
-            'ecommerce': {'primary': '#7c3aed', 'secondary': '#64748b', 'accent': '#dc2626'},
-            
-            # Food & Hospitality
-            'food': {'primary': '#dc2626', 'secondary': '#64748b', 'accent': '#f59e0b'},
-            'restaurant': {'primary': '#b45309', 'secondary': '#6b7280', 'accent': '#dc2626'},
-            'hospitality': {'primary': '#0369a1', 'secondary': '#64748b', 'accent': '#d97706'},
-        }
-        
         # Name-based color heuristics (simple hash-based approach)
         def name_to_color(name: str) -> str:
             """Generate a color based on business name characteristics"""
-            name_hash = abs(hash(name)) % 12
+            # hash() is salted per process; a digest gives every run the same color for a name
+            name_hash = int(hashlib.sha256(name.encode('utf-8')).hexdigest(), 16) % 12
             name_colors = [
                 '#2563eb', '#dc2626', '#059669', '#d97706', '#7c3aed', '#0369a1',
                 '#b45309', '#0891b2', '#16a34a', '#c2410c', '#1d4ed8', '#065f46'
@@ -145,10 +476,9 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
         
         # Find matching industry colors
         colors = None
-        for industry_key, industry_palette in industry_colors.items():
-            if industry_key in industry:
-                colors = industry_palette.copy()
-                break
+        industry_key = self.industry_key(business_data)
+        if industry_key in INDUSTRY_COLORS:
+            colors = INDUSTRY_COLORS[industry_key].copy()
         
         # If no industry match, generate from business characteristics
         if not colors:
@@ -266,7 +596,7 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
             g = hue_to_rgb(p, q, h)
             b = hue_to_rgb(p, q, h - 1/3)
         
-        return f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
+        return f"#{round(r * 255):02x}{round(g * 255):02x}{round(b * 255):02x}"
 
     def generate_color_scale(self, hex_color: str) -> Dict[str, str]:
         """Generate Tailwind-compatible color scale (50-950) from base color"""
@@ -340,10 +670,11 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
                 a_h, a_s, a_l = self.hex_to_hsl(accent)
                 warnings.append("Invalid accent color, generated complementary color")
             
-            # Check contrast ratios (simplified)
-            if p_l < 20:
-                warnings.append("Primary color may be too dark for accessibility")
-                suggestions.append("Consider using a lighter shade for better contrast")
+            # Check real WCAG contrast of the primary color against white button text
+            primary_contrast = contrast_ratio(relative_luminance(primary), relative_luminance(WHITE))
+            if primary_contrast < CONTRAST_LEVELS['AA']:
+                warnings.append(f"Primary color has {primary_contrast:.2f}:1 contrast with white text, below WCAG AA for accessibility")
+                suggestions.append("Use a darker primary, or rely on the adjusted 600-700 shades for buttons with white text")
             
             if abs(p_l - s_l) < 15:
                 warnings.append("Primary and secondary colors have similar lightness")
@@ -376,8 +707,91 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
                 "accessible": False
             }
 
-    def get_user_colors_with_priority(self, business_data: Dict[str, Any]) -> Dict[str, str]:
-        """Get colors with priority: user-specified > logo-extracted > business-based"""
+    def resolve_logo_colors(self, business_data: Dict[str, Any]) -> str:
+        """Return logo colors JSON, extracting them from the logo file when none were passed in"""
+        provided = (business_data.get('logo_colors') or '').strip()
+        logo_path = business_data.get('logo_path', '')
+        if provided not in ('', '{}') or not logo_path or not os.path.exists(logo_path):
+            return provided or '{}'
+        
+        if logo_colors is None:
+            print("Warning: numpy/Pillow not installed, cannot extract logo colors in Python")
+            return '{}'
+        
+        try:
+            colors = logo_colors.extract_colors_cached(logo_path)
+            print(f"Extracted logo colors from {logo_path}: {', '.join(colors['dominantColors'])}")
+            return json.dumps(colors, indent=2)
+        except Exception as e:
+            print(f"Warning: Could not extract colors from {logo_path}, using business-based colors: {e}")
+            return '{}'
+    
+    def collect_palette_candidates(self, business_data: Dict[str, Any]) -> List[tuple]:
+        """Collect (color, source) candidates from logo colors, industry palette and harmonies"""
+        candidates = []
+        harmony_bases = []
+        
+        def add(color, source):
+            if isinstance(color, str) and self.validate_hex_color(color):
+                candidates.append((color if color.startswith('#') else f'#{color}', source))
+        
+        try:
+            logo_data = json.loads(business_data.get('logo_colors') or '{}')
+        except (TypeError, json.JSONDecodeError):
+            logo_data = {}
+        
+        if not logo_data.get('businessBased'):
+            palette = logo_data.get('palette', {})
+            for slot in ('primary', 'secondary', 'accent'):
+                add(palette.get(slot), 'logo-palette')
+            add(palette.get('neutral'), 'logo-dominant')
+            for color in logo_data.get('dominantColors', []):
+                add(color, 'logo-dominant')
+            if palette.get('primary'):
+                harmony_bases.append(palette['primary'])
+        
+        business_colors = self.generate_business_based_colors(business_data)
+        for slot in ('primary', 'secondary', 'accent'):
+            add(business_colors[slot], 'industry')
+        harmony_bases.append(business_colors['primary'])
+        
+        user_primary = business_data.get('primary_color', '').strip()
+        if user_primary and self.validate_hex_color(user_primary):
+            harmony_bases.append(user_primary if user_primary.startswith('#') else f'#{user_primary}')
+        
+        valid_bases = [c for c in harmony_bases if self.validate_hex_color(c) and c.startswith('#')]
+        for color in palette_optimizer.harmony_candidates(valid_bases):
+            add(color, 'harmony')
+        
+        return candidates
+    
+    def optimize_brand_palette(self, business_data: Dict[str, Any], fixed: Dict[str, str],
+                               quiet: bool = False) -> Optional[Dict[str, Any]]:
+        """Search logo, industry and harmony candidates for the best-balanced palette"""
+        cache_key = json.dumps([
+            business_data.get('logo_colors'), business_data.get('industry'),
+            business_data.get('business_name'), business_data.get('business_description'),
+            business_data.get('target_audience'), fixed
+        ], sort_keys=True)
+        if cache_key not in self._palette_cache:
+            result = palette_optimizer.optimize_palette(
+                self.collect_palette_candidates(business_data),
+                fixed=fixed,
+                budget_ms=self.palette_budget_ms
+            )
+            self._palette_cache[cache_key] = result
+            if result:
+                self.palette_report = result
+            if result and not quiet:
+                print(f"🎯 Palette optimizer: score {result['score']} "
+                      f"({result['evaluated']} combinations, {result['elapsed_ms']}ms"
+                      f"{', budget reached' if result['timed_out'] else ''})")
+        return self._palette_cache[cache_key]
+
+    def get_user_colors_with_priority(self, business_data: Dict[str, Any], quiet: bool = False) -> Dict[str, str]:
+        """Get colors with priority: user-specified > logo-extracted > business-based.
+        `quiet` skips the log lines, for repeat resolutions (other prompt mode, variants)."""
+        log = (lambda *args, **kwargs: None) if quiet else print
         colors = {'primary': '', 'secondary': '', 'accent': ''}
         
         # Priority 1: User-specified colors (highest priority)
@@ -388,39 +802,48 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
         # Validate and use user colors if provided
         if user_primary and self.validate_hex_color(user_primary):
             colors['primary'] = user_primary if user_primary.startswith('#') else f'#{user_primary}'
-            print(f"Using user-specified primary color: {colors['primary']}")
+            log(f"Using user-specified primary color: {colors['primary']}")
         
         if user_secondary and self.validate_hex_color(user_secondary):
             colors['secondary'] = user_secondary if user_secondary.startswith('#') else f'#{user_secondary}'
-            print(f"Using user-specified secondary color: {colors['secondary']}")
+            log(f"Using user-specified secondary color: {colors['secondary']}")
             
         if user_accent and self.validate_hex_color(user_accent):
             colors['accent'] = user_accent if user_accent.startswith('#') else f'#{user_accent}'
-            print(f"Using user-specified accent color: {colors['accent']}")
+            log(f"Using user-specified accent color: {colors['accent']}")
+        
+        # Optional: search logo/industry/harmony candidates for the best palette around user colors
+        if self.optimize_palette and not all(colors.values()):
+            optimized = self.optimize_brand_palette(business_data, dict(colors), quiet=quiet)
+            if optimized:
+                for slot in ('primary', 'secondary', 'accent'):
+                    if not colors[slot]:
+                        colors[slot] = optimized[slot]
+                        log(f"Using optimized {slot} color: {colors[slot]} (from {optimized['sources'][slot]})")
         
         # Priority 2: Logo-extracted colors (for missing user colors)
         if business_data.get('logo_colors'):
             try:
-                logo_colors = json.loads(business_data['logo_colors'])
+                logo_data = json.loads(business_data['logo_colors'])
                 
-                if not logo_colors.get('businessBased'):  # Only use if not business-based
-                    if not colors['primary'] and 'palette' in logo_colors:
-                        palette = logo_colors['palette']
+                if not logo_data.get('businessBased'):  # Only use if not business-based
+                    if not colors['primary'] and 'palette' in logo_data:
+                        palette = logo_data['palette']
                         if palette.get('primary'):
                             colors['primary'] = palette['primary']
-                            print(f"Using logo-extracted primary color: {colors['primary']}")
+                            log(f"Using logo-extracted primary color: {colors['primary']}")
                     
-                    if not colors['secondary'] and 'palette' in logo_colors:
-                        palette = logo_colors['palette']
+                    if not colors['secondary'] and 'palette' in logo_data:
+                        palette = logo_data['palette']
                         if palette.get('secondary'):
                             colors['secondary'] = palette['secondary']
-                            print(f"Using logo-extracted secondary color: {colors['secondary']}")
+                            log(f"Using logo-extracted secondary color: {colors['secondary']}")
                     
-                    if not colors['accent'] and 'palette' in logo_colors:
-                        palette = logo_colors['palette']
+                    if not colors['accent'] and 'palette' in logo_data:
+                        palette = logo_data['palette']
                         if palette.get('accent'):
                             colors['accent'] = palette['accent']
-                            print(f"Using logo-extracted accent color: {colors['accent']}")
+                            log(f"Using logo-extracted accent color: {colors['accent']}")
             except:
                 pass
         
@@ -429,34 +852,120 @@ CRITICAL: Always respond with ONLY valid JavaScript code that can be directly sa
         
         if not colors['primary']:
             colors['primary'] = business_colors['primary']
-            print(f"Using business-based primary color: {colors['primary']}")
+            log(f"Using business-based primary color: {colors['primary']}")
             
         if not colors['secondary']:
             colors['secondary'] = business_colors['secondary']
-            print(f"Using business-based secondary color: {colors['secondary']}")
+            log(f"Using business-based secondary color: {colors['secondary']}")
             
         if not colors['accent']:
             colors['accent'] = business_colors['accent']
-            print(f"Using business-based accent color: {colors['accent']}")
+            log(f"Using business-based accent color: {colors['accent']}")
         
         # Validate color harmony if user provided colors
         if any([user_primary, user_secondary, user_accent]):
             harmony = self.validate_color_harmony(colors['primary'], colors['secondary'], colors['accent'])
             if harmony['warnings']:
-                print("🎨 Color Harmony Analysis:")
+                log("🎨 Color Harmony Analysis:")
                 for warning in harmony['warnings']:
-                    print(f"  ⚠️  {warning}")
+                    log(f"  ⚠️  {warning}")
                 if harmony['suggestions']:
-                    print("💡 Suggestions:")
+                    log("💡 Suggestions:")
                     for suggestion in harmony['suggestions']:
-                        print(f"  💡 {suggestion}")
-                print(f"📊 Harmony Score: {harmony['harmony_score']}/10")
+                        log(f"  💡 {suggestion}")
+                log(f"📊 Harmony Score: {harmony['harmony_score']}/10")
         
         return colors
 
-    def create_user_prompt(self, business_data: Dict[str, Any]) -> str:
+    def services_list(self, business_data: Dict[str, Any]) -> List[str]:
+        services = business_data.get('services', '').split(',') if business_data.get('services') else []
+        return [service.strip() for service in services if service.strip()]
+    
+    def business_context(self, business_data: Dict[str, Any]) -> str:
+        """The business block shared by the compact config and content prompts"""
+        lines = [
+            f"Business: {business_data['business_name']} ({business_data['industry']})",
+            f"Description: {business_data.get('business_description') or 'Professional services business'}",
+            f"Audience: {business_data.get('target_audience') or 'Business professionals'}",
+            f"Services: {'; '.join(self.services_list(business_data)) or 'Professional consulting services'}",
+        ]
+        return '\n'.join(lines)
+    
+    def build_prompts(self, stage: str, business_data: Dict[str, Any]) -> tuple:
+        """System and user prompt of a stage in the active mode. Its estimated size goes into prompt_report,
+        with the other mode's when compare_prompts is set."""
+        builders = {
+            'base_config': {
+                'verbose': lambda quiet: (self.create_system_prompt(), self.create_user_prompt(business_data, quiet)),
+                'compact': lambda quiet: (self.create_compact_system_prompt(),
+                                          self.create_compact_user_prompt(business_data, quiet)),
+            },
+            'custom_content': {
+                'verbose': lambda quiet: (CONTENT_SYSTEM_PROMPT, self.create_content_generation_prompt(business_data)),
+                'compact': lambda quiet: (COMPACT_CONTENT_SYSTEM_PROMPT, self.create_compact_content_prompt(business_data)),
+            },
+        }[stage]
+        mode = 'compact' if self.compact_prompts else 'verbose'
+        prompts = {mode: builders[mode](False)}
+        if self.compare_prompts:
+            other = 'verbose' if self.compact_prompts else 'compact'
+            prompts[other] = builders[other](True)  # color resolution logs once, for the active mode
+        
+        estimates = {name: -(-len(system + user) // CHARS_PER_TOKEN) for name, (system, user) in prompts.items()}
+        report = {
+            'mode': mode,
+            # Character counts / CHARS_PER_TOKEN, not tokenizer counts (those are in token_usage)
+            'estimated_input_tokens': estimates,
+            'estimate': f'chars/{CHARS_PER_TOKEN}',
+        }
+        if self.compare_prompts:
+            report['estimated_compact_saving_pct'] = round(100 * (1 - estimates['compact'] / estimates['verbose']), 1)
+        self.prompt_report[stage] = report
+        return prompts[mode]
+    
+    def create_compact_system_prompt(self) -> str:
+        return """You write complete, personalized website configurations for an Astro site: marketing copy, services and pricing, testimonials and SEO, using the given brand colors. Content is specific to the business and conversion-focused.
+
+Respond with ONLY a JavaScript module (no markdown fences): `export const clientConfig = {...};`"""
+    
+    def create_compact_user_prompt(self, business_data: Dict[str, Any], quiet: bool = False) -> str:
+        """Config prompt that gives the structure as a minimal schema instead of an annotated template"""
+        colors = self.get_user_colors_with_priority(business_data, quiet=quiet)
+        fixed = {
+            'contact.email': business_data['contact_email'],
+            'contact.phone': business_data.get('contact_phone', ''),
+            'contact.website': business_data.get('website_domain', ''),
+            'branding.colors': {'primary': colors['primary'], 'secondary': colors['secondary'],
+                                'accent': colors['accent'], 'neutral': colors['secondary']},
+            'branding.logo': {'main': '/images/logo.svg', 'dark': '/images/logo-dark.svg', 'light': '/images/logo-light.svg'},
+        }
+        return f"""{self.business_context(business_data)}
+
+clientConfig schema (exact nesting; every key required; values are strings unless :int; x[] is a list of strings; hours like "9:00 AM - 5:00 PM" or "Closed"):
+{render_schema(CONFIG_SCHEMA)}
+
+Fixed values: {json.dumps(fixed, ensure_ascii=False)}
+Counts: 4-6 features, 3 services with 4-6 features each, 4 testimonials, 4 values."""
+    
+    def create_compact_content_prompt(self, business_data: Dict[str, Any]) -> str:
+        """Content prompt with the shared business block and the JSON shape as a minimal schema"""
+        content_schema = {section: CONFIG_SCHEMA['content'][section] for section in CONTENT_SECTIONS}
+        content_schema['features'] = [{'title': str, 'description': str}]
+        content_schema['about'] = {key: CONFIG_SCHEMA['content']['about'][key] for key in ('story', 'mission', 'values')}
+        return f"""{self.business_context(business_data)}
+
+Return ONLY JSON with this schema (x[] is a list of strings):
+{render_schema(content_schema)}
+
+- hero: headline 6-10 words, subheadline 15-25 words stating the value proposition, primary and secondary CTA
+- features: 4-6, benefit-focused, industry-specific
+- services: 3 tiers, 4-6 features each, realistic pricing, action-oriented CTAs
+- testimonials: 4, with concrete results and believable people
+- about: trust-building story, mission, 4 values"""
+    
+    def create_user_prompt(self, business_data: Dict[str, Any], quiet: bool = False) -> str:
         # Get colors using priority system: user-specified > logo-extracted > business-based
-        colors = self.get_user_colors_with_priority(business_data)
+        colors = self.get_user_colors_with_priority(business_data, quiet=quiet)
         extracted_colors = {
             'primary': colors['primary'],
             'secondary': colors['secondary'], 
@@ -479,8 +988,8 @@ User-Specified Theme Colors (High Priority):
         else:
             # Determine source based on what was actually used
             try:
-                logo_colors = json.loads(business_data.get('logo_colors', '{}'))
-                if logo_colors.get('businessBased'):
+                logo_data = json.loads(business_data.get('logo_colors', '{}'))
+                if logo_data.get('businessBased'):
                     colors_info = f"""
 Business-Based Theme Colors (No Logo Provided):
 - Primary: {extracted_colors['primary']} (derived from: {business_data.get('industry', 'business characteristics')})
@@ -488,7 +997,7 @@ Business-Based Theme Colors (No Logo Provided):
 - Accent: {extracted_colors['accent']}
 - Neutral: {extracted_colors['neutral']}
 - Generation method: Industry + business name analysis"""
-                elif 'palette' in logo_colors or 'dominantColors' in logo_colors:
+                elif 'palette' in logo_data or 'dominantColors' in logo_data:
                     colors_info = f"""
 Brand Colors Extracted from Logo:
 - Primary: {extracted_colors['primary']}
@@ -511,8 +1020,7 @@ Theme Colors:
 - Accent: {extracted_colors['accent']}
 - Neutral: {extracted_colors['neutral']}"""
         
-        services_list = business_data.get('services', '').split(',') if business_data.get('services') else []
-        services_formatted = '\n'.join([f"- {service.strip()}" for service in services_list if service.strip()])
+        services_formatted = '\n'.join(f"- {service}" for service in self.services_list(business_data))
         
         return f"""Generate a complete website configuration for this business:
 
@@ -680,8 +1188,7 @@ Generate the complete JavaScript configuration object following this EXACT struc
 
     def create_content_generation_prompt(self, business_data: Dict[str, Any]) -> str:
         """Create a detailed prompt for generating custom marketing copy"""
-        services_list = business_data.get('services', '').split(',') if business_data.get('services') else []
-        services_formatted = '\n'.join([f"- {service.strip()}" for service in services_list if service.strip()])
+        services_formatted = '\n'.join(f"- {service}" for service in self.services_list(business_data))
         
         return f"""You are a professional copywriter and marketing expert. Create compelling, conversion-focused content for this business:
 
@@ -769,25 +1276,285 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
   }}
 }}"""
     
+    def industry_key(self, business_data: Dict[str, Any]) -> str:
+        """Industry bucket used for colors and config skeletons ('general' when nothing matches)"""
+        industry = business_data.get('industry', '').lower()
+        for industry_key in INDUSTRY_COLORS:
+            if industry_key in industry:
+                return industry_key
+        return 'general'
+
+    def create_skeleton_prompt(self, industry: str) -> str:
+        """Prompt for an industry-wide config skeleton with placeholders for personalized fields"""
+        p = config_skeletons.placeholder
+        return f"""Generate a reusable website configuration skeleton for businesses in the "{industry}" industry.
+
+Every business-specific value must be left as the exact placeholder string shown (including the quotes).
+Fill everything else with sensible defaults for a typical "{industry}" business: opening hours,
+feature icons, three typical service tiers with prices, generic testimonials and an about section.
+Use double-quoted strings only.
+
+```javascript
+// Client Configuration
+export const clientConfig = {{
+  business: {{
+    name: {p('business.name')},
+    legalName: {p('business.legalName')},
+    tagline: {p('business.tagline')},
+    shortDescription: {p('business.shortDescription')},
+    longDescription: {p('business.longDescription')},
+    yearFounded: {p('business.yearFounded')},
+    industry: {p('business.industry')},
+    license: "[License if applicable]"
+  }},
+  contact: {{
+    email: {p('contact.email')},
+    phone: {p('contact.phone')},
+    address: {{
+      street: {p('contact.address.street')},
+      city: {p('contact.address.city')},
+      state: {p('contact.address.state')},
+      country: {p('contact.address.country')},
+      zip: {p('contact.address.zip')}
+    }},
+    hours: {{
+      monday: "[Typical hours]",
+      // ... through sunday
+    }},
+    website: {p('contact.website')}
+  }},
+  social: {{
+    linkedin: {p('social.linkedin')},
+    twitter: {p('social.twitter')},
+    facebook: {p('social.facebook')},
+    instagram: {p('social.instagram')}
+  }},
+  branding: {{
+    logo: {{
+      main: "/images/logo.svg",
+      dark: "/images/logo-dark.svg",
+      light: "/images/logo-light.svg"
+    }},
+    colors: {{
+      primary: {p('branding.colors.primary')},
+      secondary: {p('branding.colors.secondary')},
+      accent: {p('branding.colors.accent')},
+      neutral: {p('branding.colors.neutral')}
+    }},
+    fonts: {{
+      heading: {p('branding.fonts.heading')},
+      body: {p('branding.fonts.body')}
+    }}
+  }},
+  content: {{
+    hero: {{
+      headline: "[Generic headline]",
+      subheadline: "[Generic subheadline]",
+      cta: "[Primary CTA]",
+      secondaryCta: "[Secondary CTA]"
+    }},
+    features: [
+      {{ title: "[Feature]", description: "[Description]", icon: "[icon-name]", image: "/images/feature1.jpg" }}
+      // ... 4-6 features
+    ],
+    services: [
+      {{ name: "[Service]", description: "[Description]", features: ["[Feature 1]", "[Feature 2]"], price: "[Price]", cta: "[CTA]" }}
+      // ... 3 services
+    ],
+    testimonials: [
+      {{ quote: "[Testimonial]", author: "[Name]", title: "[Title]", company: "[Company]" }}
+      // ... 3-4 testimonials
+    ],
+    about: {{
+      story: "[Story]",
+      mission: "[Mission]",
+      values: ["[Value 1]", "[Value 2]"],
+      team: [
+        {{ name: "[Team Member Name]", title: "[Title]", image: "/images/team/member.jpg" }}
+      ]
+    }}
+  }},
+  seo: {{
+    title: {p('seo.title')},
+    description: {p('seo.description')},
+    keywords: {p('seo.keywords')},
+    og: {{
+      title: {p('seo.og.title')},
+      description: {p('seo.og.description')},
+      image: "/images/og-image.jpg",
+      url: {p('seo.og.url')}
+    }}
+  }}
+}};
+```
+
+Respond with the complete JavaScript skeleton following this EXACT structure."""
+
+    def create_skeleton_fill_prompt(self, business_data: Dict[str, Any]) -> str:
+        """Prompt asking only for the personalized fields of a skeleton-based config"""
+        services_formatted = ', '.join(self.services_list(business_data))
+        
+        return f"""Write the business-specific details of a website configuration for this business:
+
+- Name: {business_data['business_name']}
+- Industry: {business_data['industry']}
+- Description: {business_data.get('business_description', 'Professional services business')}
+- Target Audience: {business_data.get('target_audience', 'Business professionals')}
+- Services: {services_formatted or 'Professional consulting services'}
+- Website Domain: {business_data.get('website_domain', '')}
+
+Respond with ONLY this JSON object:
+{{
+  "business": {{"legalName": "...", "tagline": "...", "shortDescription": "...", "longDescription": "...", "yearFounded": 2020}},
+  "contact": {{"address": {{"street": "...", "city": "...", "state": "...", "country": "...", "zip": "..."}}}},
+  "social": {{"linkedin": "...", "twitter": "...", "facebook": "...", "instagram": "..."}},
+  "branding": {{"fonts": {{"heading": "...", "body": "..."}}}},
+  "seo": {{"title": "...", "description": "...", "keywords": ["...", "..."], "og": {{"title": "...", "description": "..."}}}}
+}}"""
+
+    def is_valid_skeleton(self, skeleton: str, warn: bool = False) -> bool:
+        """A skeleton must carry every placeholder and pass JavaScript validation"""
+        missing = config_skeletons.missing_placeholders(skeleton)
+        if missing:
+            if warn:
+                print(f"Warning: Config skeleton is missing placeholders: {', '.join(missing)}")
+            return False
+        if not self.validate_javascript_config(skeleton):
+            if warn:
+                print("Warning: Config skeleton failed validation")
+            return False
+        return True
+
+    async def get_config_skeleton(self, industry: str) -> Optional[Dict[str, Any]]:
+        """Load the industry's skeleton from the pool, generating and validating it on first use"""
+        async with self.skeleton_pool.lock(industry):
+            return await self._load_or_generate_skeleton(industry)
+
+    async def _load_or_generate_skeleton(self, industry: str) -> Optional[Dict[str, Any]]:
+        prompt = self.create_skeleton_prompt(industry)
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+        entry = self.skeleton_pool.get(industry, prompt_hash)
+        if entry:
+            self.skeleton_report['status'] = 'hit'
+            return entry
+        
+        print(f"Generating config skeleton for industry: {industry}...")
+        start = time.perf_counter()
+        skeleton = await self.generate_stage(
+            'config_skeleton',
+            system=self.create_system_prompt(),
+            messages=[{"role": "user", "content": prompt}],
+            validate=lambda text: self.is_valid_skeleton(self.clean_javascript_response(text))
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        skeleton = self.clean_javascript_response(skeleton)
+        
+        if not await asyncio.to_thread(self.is_valid_skeleton, skeleton, warn=True):
+            return None
+        
+        self.skeleton_report['status'] = 'generated'
+        generation = {
+            'output_tokens': self.usage['config_skeleton']['output_tokens'],
+            'elapsed_ms': round(elapsed_ms, 1),
+        }
+        try:
+            return self.skeleton_pool.put(industry, prompt_hash, skeleton, generation)
+        except OSError as e:
+            print(f"Warning: Could not store config skeleton: {e}")
+            return {'skeleton': skeleton, 'generation': generation}
+
+    def is_json_object(self, content: str) -> bool:
+        try:
+            return isinstance(self.parse_json_object(content), dict)
+        except ValueError:
+            return False
+
+    async def generate_config_from_skeleton(self, business_data: Dict[str, Any]) -> Optional[str]:
+        """Build the base config from the industry skeleton plus a small personalized-fields call"""
+        industry = self.industry_key(business_data)
+        self.skeleton_report = {'industry': industry}
+        entry = await self.get_config_skeleton(industry)
+        if not entry:
+            return None
+        
+        print("Filling config skeleton with business details...")
+        start = time.perf_counter()
+        response = await self.generate_stage(
+            'skeleton_fill',
+            system="You are a professional copywriter and brand strategist. Always respond with a single valid JSON object and nothing else.",
+            messages=[{"role": "user", "content": self.create_skeleton_fill_prompt(business_data)}],
+            validate=self.is_json_object
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        try:
+            fields = self.parse_json_object(response)
+        except ValueError as e:
+            print(f"Warning: Could not parse personalized fields: {e}")
+            return None
+        
+        colors = self.get_user_colors_with_priority(business_data)
+        values = config_skeletons.flatten_fields(fields)
+        values.update({
+            'business.name': business_data['business_name'],
+            'business.industry': business_data['industry'],
+            'contact.email': business_data['contact_email'],
+            'contact.phone': business_data.get('contact_phone', ''),
+            'contact.website': business_data.get('website_domain', ''),
+            'branding.colors.primary': colors['primary'],
+            'branding.colors.secondary': colors['secondary'],
+            'branding.colors.accent': colors['accent'],
+            'branding.colors.neutral': colors['secondary'],
+            'seo.og.url': business_data.get('website_domain', ''),
+        })
+        config = config_skeletons.fill_skeleton(entry['skeleton'], values)
+        config = config.replace('// Client Configuration\n', f"// Client Configuration for {business_data['business_name']}\n", 1)
+        if not await self.check_javascript_config(config):
+            print("Warning: Filled config skeleton failed validation")
+            return None
+        
+        # Savings relative to generating a full config for this industry
+        # (the client that generated the skeleton paid for both)
+        full = entry['generation']
+        fill_tokens = self.usage['skeleton_fill']['output_tokens']
+        generated = self.skeleton_report.get('status') == 'generated'
+        self.skeleton_report.update({
+            'status': 'generated' if generated else 'hit',
+            'fill': {'output_tokens': fill_tokens, 'elapsed_ms': round(elapsed_ms, 1)},
+            'full_config': full,
+            'saved': {
+                'output_tokens': -fill_tokens if generated else full['output_tokens'] - fill_tokens,
+                'elapsed_ms': round(-elapsed_ms if generated else full['elapsed_ms'] - elapsed_ms, 1),
+            },
+        })
+        if not generated:
+            print(f"Skeleton saved {self.skeleton_report['saved']['output_tokens']} output tokens "
+                  f"and {self.skeleton_report['saved']['elapsed_ms'] / 1000:.1f}s")
+        return config
+
     async def generate_theme_config(self, business_data: Dict[str, Any]) -> str:
         """Generate theme configuration using Claude API"""
         try:
-            system_prompt = self.create_system_prompt()
-            user_prompt = self.create_user_prompt(business_data)
+            if self.skeleton_pool:
+                config = await self.generate_config_from_skeleton(business_data)
+                if config:
+                    return config
+                print("Falling back to full configuration generation...")
+                self.skeleton_report['status'] = 'fallback'
+            
+            system_prompt, user_prompt = self.build_prompts('base_config', business_data)
             
             print("Generating AI content with Claude API...")
             
-            message = await self.call_claude_with_retry(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                temperature=0.7,
+            response_content = await self.generate_stage(
+                'base_config',
                 system=system_prompt,
                 messages=[
                     {"role": "user", "content": user_prompt}
-                ]
+                ],
+                validate=lambda text: self.validate_javascript_config(self.clean_javascript_response(text))
             )
             
-            response_content = message.content[0].text
             print(f"Generated {len(response_content)} characters of configuration")
             
             # Clean up any markdown code fences that might have been generated
@@ -802,166 +1569,281 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
     async def generate_custom_content(self, business_data: Dict[str, Any]) -> str:
         """Generate custom marketing content using Claude API"""
         try:
-            content_prompt = self.create_content_generation_prompt(business_data)
+            system_prompt, content_prompt = self.build_prompts('custom_content', business_data)
             
             print("Generating custom marketing content with Claude API...")
             
-            message = await self.call_claude_with_retry(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                temperature=0.8,  # Slightly higher temperature for creative content
-                system="You are a professional copywriter and marketing expert. Create compelling, industry-specific marketing content that converts visitors into customers. Always provide content in valid JSON format without markdown code blocks.",
+            content_response = await self.generate_stage(
+                'custom_content',
+                system=system_prompt,
                 messages=[
                     {"role": "user", "content": content_prompt}
-                ]
+                ],
+                validate=lambda text: bool(self.parse_content_sections(self.clean_json_response(text))[0])
             )
-            
-            content_response = message.content[0].text.strip()
             print(f"Generated {len(content_response)} characters of custom content")
             
             # Clean any potential markdown artifacts
-            if content_response.startswith('```json'):
-                lines = content_response.split('\n')
-                content_response = '\n'.join(lines[1:-1])
-            elif content_response.startswith('```'):
-                lines = content_response.split('\n')
-                content_response = '\n'.join(lines[1:-1])
-            
-            return content_response
+            return self.clean_json_response(content_response)
             
         except Exception as e:
             print(f"Error generating custom content: {str(e)}")
             raise
 
-    def merge_custom_content_into_config(self, base_config: str, custom_content: str) -> str:
-        """Merge custom generated content into the base configuration"""
-        try:
-            import re
-            
-            # Parse the custom content JSON
-            custom_data = json.loads(custom_content)
-            
-            # Escape quotes and newlines in strings for safe JS insertion
-            def escape_js_string(s):
-                if not isinstance(s, str):
-                    return str(s)
-                return s.replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
-            
-            # Replace placeholder content in the base config with custom content
-            updated_config = base_config
+    def create_variants_prompt(self, business_data: Dict[str, Any], count: int, colors: Dict[str, str]) -> str:
+        """Ask for alternative hero copy, taglines and palettes in one response"""
+        return f"""Create {count} distinct alternatives for the website of this business:
+
+- Company: {business_data['business_name']}
+- Industry: {business_data['industry']}
+- Description: {business_data.get('business_description') or 'Professional services business'}
+- Target Audience: {business_data.get('target_audience') or 'Business professionals'}
+- Current brand colors: primary {colors['primary']}, secondary {colors['secondary']}, accent {colors['accent']}
+
+Each alternative has a hero headline (4-10 words), a subheadline (12-25 words), a primary
+call to action (1-4 words), a tagline (2-10 words) and a palette. Vary the angle of the
+copy between alternatives. Palettes must stay recognizable for the brand; keep the current
+primary in at least one of them. Colors are #RRGGBB hex values.
+
+Return ONLY this JSON:
+{{"variants": [{{"headline": "...", "subheadline": "...", "cta": "...", "tagline": "...", "palette": {{"primary": "#...", "secondary": "#...", "accent": "#..."}}}}]}}"""
+    
+    async def generate_variants(self, business_data: Dict[str, Any], count: int, colors: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Generate `count` hero/tagline/palette variants in a single response"""
+        def parse(text: str) -> List[Dict[str, Any]]:
+            try:
+                variants = self.parse_json_object(text).get('variants')
+            except (ValueError, AttributeError):
+                return []
+            if not isinstance(variants, list):
+                return []
+            return [v for v in variants if isinstance(v, dict) and isinstance(v.get('headline'), str)]
+        
+        print(f"Generating {count} hero/tagline/palette variants...")
+        text = await self.generate_stage(
+            'variants',
+            system="You are a brand strategist and copywriter. Always answer with valid JSON only, without markdown code blocks.",
+            messages=[{"role": "user", "content": self.create_variants_prompt(business_data, count, colors)}],
+            validate=lambda text: bool(parse(text))
+        )
+        variants = parse(text)[:count]
+        if len(variants) < count:
+            print(f"Warning: Got {len(variants)} of {count} requested variants")
+        return variants
+    
+    def readability_score(self, text: str) -> float:
+        """Flesch reading ease mapped to 0-1 (60+, plain English, scores 1)"""
+        
+        words = re.findall(r"[A-Za-z']+", text)
+        if not words:
+            return 0.0
+        sentences = max(1, len(re.findall(r'[.!?]+', text)))
+        syllables = sum(max(1, len(re.findall(r'[aeiouy]+', word.lower())) - (word.lower().endswith('e') and len(word) > 2)) for word in words)
+        ease = 206.835 - 1.015 * (len(words) / sentences) - 84.6 * (syllables / len(words))
+        return round(min(max(ease / 60, 0.0), 1.0), 3)
+    
+    def score_variant(self, variant: Dict[str, Any], fallback_colors: Dict[str, str]) -> Dict[str, Any]:
+        """Score a variant locally: readability, word-count limits and palette harmony"""
+        in_limits = {}
+        for field, (low, high) in VARIANT_WORD_LIMITS.items():
+            words = len(str(variant.get(field, '')).split())
+            in_limits[field] = low <= words <= high
+        
+        palette = variant.get('palette') if isinstance(variant.get('palette'), dict) else {}
+        colors = {
+            slot: palette[slot] if self.validate_hex_color(str(palette.get(slot, ''))) else fallback_colors[slot]
+            for slot in ('primary', 'secondary', 'accent')
+        }
+        harmony = self.validate_color_harmony(colors['primary'], colors['secondary'], colors['accent'])
+        
+        scores = {
+            'readability': self.readability_score(f"{variant.get('headline', '')}. {variant.get('subheadline', '')}. {variant.get('tagline', '')}"),
+            'length': round(sum(in_limits.values()) / len(in_limits), 3),
+            'harmony': round(harmony.get('harmony_score', 0) / 10, 3),
+        }
+        scores['total'] = round(sum(VARIANT_SCORE_WEIGHTS[key] * scores[key] for key in VARIANT_SCORE_WEIGHTS), 3)
+        return {
+            'scores': scores,
+            'fields_over_limits': [field for field, ok in in_limits.items() if not ok],
+            'harmony_warnings': harmony.get('warnings', []),
+            'colors': colors,
+        }
+    
+    def apply_variant(self, config: str, variant: Dict[str, Any], colors: Dict[str, str]) -> str:
+        """The client config with a variant's hero, tagline and palette swapped in"""
+        
+        # Only the hero fields the variant supplies; the base cta and secondaryCta stay otherwise
+        hero = {field: variant[field] for field in ('headline', 'subheadline', 'cta') if variant.get(field)}
+        updated = self.merge_content_section(config, 'hero', hero)
+        replacements = [('tagline', variant.get('tagline'))] + [(slot, colors[slot]) for slot in ('primary', 'secondary', 'accent')]
+        for key, value in replacements:
+            if not value:
+                continue
+            literal = json.dumps(str(value), ensure_ascii=False)
+            pattern = rf'(["\']?\b{key}["\']?\s*:\s*)"(?:[^"\\]|\\.)*"'
+            if key != 'tagline':
+                # Palette slots: only inside the branding colors object
+                pattern = rf'(colors["\']?\s*:\s*\{{[^}}]*?["\']?\b{key}["\']?\s*:\s*)"(?:[^"\\]|\\.)*"'
+            updated = re.sub(pattern, lambda match: match.group(1) + literal, updated, count=1, flags=re.DOTALL)
+        return updated
+    
+    def build_variants(self, variants: List[Dict[str, Any]], business_data: Dict[str, Any],
+                       client_config: str, colors: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Score and rank variants, each with its own config and CSS theme (same theme class, so
+        a variant can replace the client's files as-is)"""
+        scored = [dict(variant, **self.score_variant(variant, colors)) for variant in variants]
+        scored.sort(key=lambda variant: variant['scores']['total'], reverse=True)
+        
+        ranked = []
+        for rank, variant in enumerate(scored, 1):
+            # A copy, so the variant's contrast and snap reports don't replace the client's
+            generator = copy.copy(self)
+            generator.contrast_report = {}
+            generator.snap_report = {}
+            variant_data = dict(business_data, **{f'{slot}_color': variant['colors'][slot] for slot in ('primary', 'secondary', 'accent')})
+            print(f"Variant {rank}: score {variant['scores']['total']} - {variant['headline']}")
+            ranked.append(dict(
+                variant,
+                rank=rank,
+                config=self.apply_variant(client_config, variant, variant['colors']),
+                css=generator.generate_css_theme(variant_data),
+                accessibility=generator.contrast_report,
+            ))
+        return ranked
+    
+    def escape_js_string(self, s) -> str:
+        """Escape quotes and newlines in strings for safe JS insertion"""
+        if not isinstance(s, str):
+            return str(s)
+        return s.replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+    def replace_config_value(self, config: str, key: str, replacement: str) -> str:
+        """Replace the array/object literal after the first `key:` in a JS config, matching brackets"""
+        
+        match = re.search(rf'\b{key}:\s*(?=[\[{{])', config)
+        if not match:
+            return config
+        
+        depth = 0
+        quote = None
+        i = match.end()
+        while i < len(config):
+            char = config[i]
+            if quote:
+                if char == '\\':
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char in '"\'`':
+                quote = char
+            elif config.startswith('//', i):
+                i = config.find('\n', i)
+                if i == -1:
+                    break
+            elif char in '[{':
+                depth += 1
+            elif char in ']}':
+                depth -= 1
+                if depth == 0:
+                    return config[:match.end()] + replacement + config[i + 1:]
+            i += 1
+        
+        # Unbalanced literal: leave the config untouched
+        return config
+
+    def merge_content_section(self, config: str, section: str, value: Any) -> str:
+        """Replace one placeholder section of the base configuration with custom content"""
+        
+        escape_js_string = self.escape_js_string
+        updated_config = config
+        
+        # Replace hero section with more specific patterns
+        if section == 'hero':
+            hero = value
             
-            # Replace hero section with more specific patterns
-            if 'hero' in custom_data:
-                hero = custom_data['hero']
-                
+            # Only the fields the content supplies; the rest keep the base config's values
+            for field in ('headline', 'subheadline', 'cta', 'secondaryCta'):
+                if field not in hero:
+                    continue
                 # Use more specific regex patterns to avoid conflicts
                 updated_config = re.sub(
-                    r'(hero: \{[^}]*?)headline: "[^"]*"',
-                    f'\\1headline: "{escape_js_string(hero.get("headline", ""))}"',
+                    rf'(hero: \{{[^}}]*?){field}: "[^"]*"',
+                    f'\\1{field}: "{escape_js_string(hero[field])}"',
                     updated_config, flags=re.DOTALL
                 )
-                updated_config = re.sub(
-                    r'(hero: \{[^}]*?)subheadline: "[^"]*"',
-                    f'\\1subheadline: "{escape_js_string(hero.get("subheadline", ""))}"',
-                    updated_config, flags=re.DOTALL
-                )
-                updated_config = re.sub(
-                    r'(hero: \{[^}]*?)cta: "[^"]*"',
-                    f'\\1cta: "{escape_js_string(hero.get("cta", ""))}"',
-                    updated_config, flags=re.DOTALL
-                )
-                updated_config = re.sub(
-                    r'(hero: \{[^}]*?)secondaryCta: "[^"]*"',
-                    f'\\1secondaryCta: "{escape_js_string(hero.get("secondaryCta", ""))}"',
-                    updated_config, flags=re.DOTALL
-                )
-            
-            # Replace features section with proper bracket matching
-            if 'features' in custom_data and custom_data['features']:
-                features_js = "[\n"
-                for feature in custom_data['features']:
-                    title = escape_js_string(feature.get('title', ''))
-                    desc = escape_js_string(feature.get('description', ''))
-                    features_js += f"""      {{
+        
+        # Replace features section with proper bracket matching
+        elif section == 'features' and value:
+            features_js = "[\n"
+            for feature in value:
+                title = escape_js_string(feature.get('title', ''))
+                desc = escape_js_string(feature.get('description', ''))
+                features_js += f"""      {{
         title: "{title}",
         description: "{desc}",
         icon: "code",
         image: "/images/feature.jpg"
       }},\n"""
-                features_js = features_js.rstrip(',\n') + "\n    ]"
-                
-                # Use more precise regex for features array
-                updated_config = re.sub(
-                    r'(features: )\[[\s\S]*?\](\s*,?\s*(?=\w+:|\}))',
-                    f'\\1{features_js}\\2',
-                    updated_config, flags=re.DOTALL
-                )
+            features_js = features_js.rstrip(',\n') + "\n    ]"
             
-            # Replace services section with better parsing
-            if 'services' in custom_data and custom_data['services']:
-                services_js = "[\n"
-                for service in custom_data['services']:
-                    name = escape_js_string(service.get('name', ''))
-                    desc = escape_js_string(service.get('description', ''))
-                    price = escape_js_string(service.get('price', ''))
-                    cta = escape_js_string(service.get('cta', ''))
-                    
-                    # Handle features array properly
-                    features = service.get('features', [])
-                    if features and len(features) > 0:
-                        features_str = '", "'.join([escape_js_string(f) for f in features])
-                        features_array = f'["{features_str}"]'
-                    else:
-                        features_array = '[]'
-                    
-                    services_js += f"""      {{
+            updated_config = self.replace_config_value(updated_config, 'features', features_js)
+        
+        # Replace services section with better parsing
+        elif section == 'services' and value:
+            services_js = "[\n"
+            for service in value:
+                name = escape_js_string(service.get('name', ''))
+                desc = escape_js_string(service.get('description', ''))
+                price = escape_js_string(service.get('price', ''))
+                cta = escape_js_string(service.get('cta', ''))
+                
+                # Handle features array properly
+                features = service.get('features', [])
+                if features and len(features) > 0:
+                    features_str = '", "'.join([escape_js_string(f) for f in features])
+                    features_array = f'["{features_str}"]'
+                else:
+                    features_array = '[]'
+                
+                services_js += f"""      {{
         name: "{name}",
         description: "{desc}",
         features: {features_array},
         price: "{price}",
         cta: "{cta}"
       }},\n"""
-                services_js = services_js.rstrip(',\n') + "\n    ]"
-                
-                # Use more precise regex for services array
-                updated_config = re.sub(
-                    r'(services: )\[[\s\S]*?\](\s*,?\s*(?=\w+:|\}))',
-                    f'\\1{services_js}\\2',
-                    updated_config, flags=re.DOTALL
-                )
+            services_js = services_js.rstrip(',\n') + "\n    ]"
             
-            # Replace testimonials section
-            if 'testimonials' in custom_data and custom_data['testimonials']:
-                testimonials_js = "[\n"
-                for testimonial in custom_data['testimonials']:
-                    quote = escape_js_string(testimonial.get('quote', ''))
-                    author = escape_js_string(testimonial.get('author', ''))
-                    title = escape_js_string(testimonial.get('title', ''))
-                    company = escape_js_string(testimonial.get('company', ''))
-                    
-                    testimonials_js += f"""      {{
+            updated_config = self.replace_config_value(updated_config, 'services', services_js)
+        
+        # Replace testimonials section
+        elif section == 'testimonials' and value:
+            testimonials_js = "[\n"
+            for testimonial in value:
+                quote = escape_js_string(testimonial.get('quote', ''))
+                author = escape_js_string(testimonial.get('author', ''))
+                title = escape_js_string(testimonial.get('title', ''))
+                company = escape_js_string(testimonial.get('company', ''))
+                
+                testimonials_js += f"""      {{
         quote: "{quote}",
         author: "{author}",
         title: "{title}",
         company: "{company}"
       }},\n"""
-                testimonials_js = testimonials_js.rstrip(',\n') + "\n    ]"
-                
-                updated_config = re.sub(
-                    r'(testimonials: )\[[\s\S]*?\](\s*,?\s*(?=\w+:|\}))',
-                    f'\\1{testimonials_js}\\2',
-                    updated_config, flags=re.DOTALL
-                )
+            testimonials_js = testimonials_js.rstrip(',\n') + "\n    ]"
             
-            # Replace about section
-            if 'about' in custom_data:
-                about = custom_data['about']
-                story = escape_js_string(about.get('story', ''))
-                mission = escape_js_string(about.get('mission', ''))
-                values = about.get('values', [])
-                values_list = '", "'.join([escape_js_string(v) for v in values])
-                
-                about_js = f"""{{
+            updated_config = self.replace_config_value(updated_config, 'testimonials', testimonials_js)
+        
+        # Replace about section
+        elif section == 'about':
+            about = value
+            story = escape_js_string(about.get('story', ''))
+            mission = escape_js_string(about.get('mission', ''))
+            values = about.get('values', [])
+            values_list = '", "'.join([escape_js_string(v) for v in values])
+            
+            about_js = f"""{{
       story: "{story}",
       mission: "{mission}",
       values: ["{values_list}"],
@@ -973,33 +1855,162 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
         }}
       ]
     }}"""
-                
-                updated_config = re.sub(
-                    r'(about: )\{[\s\S]*?\}(\s*(?=\}\s*,?\s*\w+:|^\s*\}|$))',
-                    f'\\1{about_js}\\2',
-                    updated_config, flags=re.DOTALL | re.MULTILINE
-                )
             
-            # Validate the merged configuration before returning
-            if self.validate_javascript_config(updated_config):
-                return updated_config
-            else:
-                print("Warning: Merged config failed validation, using base config")
-                return base_config
+            updated_config = self.replace_config_value(updated_config, 'about', about_js)
+        
+        return updated_config
+
+    def parse_content_sections(self, custom_content: str) -> tuple:
+        """Parse custom content section by section so one bad section doesn't sink the rest.
+        
+        Returns (sections, failures) where failures maps section name to the reason.
+        """
+        
+        sections = {}
+        failures = {}
+        
+        try:
+            parsed = json.loads(custom_content)
+            if not isinstance(parsed, dict):
+                raise ValueError("custom content is not a JSON object")
+            for section in CONTENT_SECTIONS:
+                if section in parsed:
+                    sections[section] = parsed[section]
+        except (json.JSONDecodeError, ValueError):
+            # Decode each top-level section on its own, starting right after its key
+            decoder = json.JSONDecoder()
+            for section in CONTENT_SECTIONS:
+                match = re.search(rf'"{section}"\s*:\s*', custom_content)
+                if not match:
+                    continue
+                try:
+                    sections[section], _ = decoder.raw_decode(custom_content, match.end())
+                except json.JSONDecodeError as e:
+                    failures[section] = f"invalid JSON: {e.msg}"
+        
+        for section in CONTENT_SECTIONS:
+            if section in sections:
+                problem = self.check_content_section(section, sections[section])
+                if problem:
+                    failures[section] = problem
+                    del sections[section]
+            elif section not in failures:
+                failures[section] = "missing"
+        
+        return sections, failures
+
+    def check_content_section(self, section: str, value: Any) -> Optional[str]:
+        """Return why a parsed section can't be merged, or None if it is usable"""
+        required_key = CONTENT_SECTION_KEYS[section]
+        if section in ('hero', 'about'):
+            if not isinstance(value, dict) or not isinstance(value.get(required_key), str):
+                return f"expected an object with '{required_key}'"
+        else:
+            if not isinstance(value, list) or not value:
+                return "expected a non-empty list"
+            if not all(isinstance(item, dict) and isinstance(item.get(required_key), str) for item in value):
+                return f"every item needs '{required_key}'"
+        return None
+
+    async def repair_content_section(self, section: str, reason: str, business_data: Dict[str, Any]) -> Optional[Any]:
+        """Re-request a single content section with a small output budget"""
+        prompt = f"""The "{section}" section of the marketing content for {business_data['business_name']} ({business_data['industry']}) could not be used: {reason}.
+
+Business description: {business_data.get('business_description', 'Professional services business')}
+Target audience: {business_data.get('target_audience', 'Business professionals')}
+Services: {business_data.get('services', '') or 'Professional consulting services'}
+
+Return ONLY this JSON object, with no comments, no trailing commas and every double quote inside a string escaped:
+{{"{section}": {CONTENT_SECTION_SHAPES[section]}}}"""
+        
+        settings = self.router.settings_for('content_repair')
+        fallback = self.router.fallback_for('content_repair')
+        
+        for attempt in [settings] + ([fallback] if fallback else []):
+            message = await self.call_claude_with_retry(
+                'content_repair',
+                model=attempt['model'],
+                max_tokens=min(attempt['max_tokens'], REPAIR_MAX_TOKENS[section]),
+                temperature=attempt['temperature'],
+                system="You are a professional copywriter. Always respond with a single valid JSON object and nothing else.",
+                messages=[{"role": "user", "content": prompt}]
+            )
             
-        except Exception as e:
-            print(f"Warning: Could not merge custom content, using base config: {e}")
-            import traceback
-            traceback.print_exc()
-            return base_config
+            repaired, failures = self.parse_content_sections(self.clean_json_response(message.content[0].text))
+            if section in repaired:
+                return repaired[section]
+            self.router.record_rejection(attempt['model'], 'content_repair')
+            print(f"  Repair of {section} with {attempt['model']} failed: {failures.get(section)}")
+        return None
 
+    async def merge_custom_content_with_repair(self, base_config: str, custom_content: str,
+                                               business_data: Dict[str, Any]) -> str:
+        """Merge custom content, re-requesting only the sections that fail to parse or validate"""
+        sections, failures = self.parse_content_sections(custom_content)
+        repairs_left = MAX_SECTION_REPAIRS
+        self.merge_report = {'merged_sections': [], 'dropped_sections': [], 'repairs': []}
+        
+        async def repair(section: str, reason: str) -> bool:
+            nonlocal repairs_left
+            while repairs_left > 0:
+                repairs_left -= 1
+                print(f"🔧 Repairing {section} section ({reason})...")
+                value = await self.repair_content_section(section, reason, business_data)
+                record = {'section': section, 'reason': reason, 'success': value is not None}
+                self.merge_report['repairs'].append(record)
+                if value is not None:
+                    sections[section] = value
+                    return True
+            return False
+        
+        for section, reason in failures.items():
+            if reason != 'missing' or not sections:
+                await repair(section, reason)
+        
+        # Fast path: everything merges into a valid config in one go
+        merged = base_config
+        for section in CONTENT_SECTIONS:
+            if section in sections:
+                merged = self.merge_content_section(merged, section, sections[section])
+        if sections and await self.check_javascript_config(merged):
+            self.merge_report['merged_sections'] = [s for s in CONTENT_SECTIONS if s in sections]
+            self.merge_report['dropped_sections'] = [s for s in CONTENT_SECTIONS if s not in sections]
+            return merged
+        
+        # Otherwise merge section by section, repairing (or dropping) whichever breaks the config
+        merged = base_config
+        for section in CONTENT_SECTIONS:
+            if section not in sections:
+                self.merge_report['dropped_sections'].append(section)
+                continue
+            candidate = self.merge_content_section(merged, section, sections[section])
+            if not await self.check_javascript_config(candidate):
+                candidate = None
+                if await repair(section, "merged config failed JavaScript validation"):
+                    candidate = self.merge_content_section(merged, section, sections[section])
+                    if not await self.check_javascript_config(candidate):
+                        candidate = None
+            if candidate is None:
+                print(f"Warning: Keeping base config content for {section}")
+                self.merge_report['dropped_sections'].append(section)
+                continue
+            merged = candidate
+            self.merge_report['merged_sections'].append(section)
+        
+        return merged
+
+    async def check_javascript_config(self, config_content: str) -> bool:
+        """validate_javascript_config in a worker thread, so node --check doesn't stall the event loop"""
+        return await asyncio.to_thread(self.validate_javascript_config, config_content)
+    
     def validate_javascript_config(self, config_content: str) -> bool:
         """Validate that the JavaScript configuration is syntactically correct"""
+        # The same text is often checked twice (stage validation, then the caller), skip the second node run
+        content_hash = hashlib.sha256(config_content.encode('utf-8')).hexdigest()
+        if content_hash in self._validated:
+            return self._validated[content_hash]
+        
         try:
-            import subprocess
-            import tempfile
-            import os
-            
             # Create a temporary file with the config
             with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
                 f.write(config_content)
@@ -1007,17 +2018,30 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
             
             try:
                 # Use Node.js to validate the syntax
-                result = subprocess.run(
-                    ['node', '--check', temp_file], 
-                    capture_output=True, 
-                    text=True,
-                    timeout=10
-                )
+                remaining = self.remaining_s('node --check')
+                timeout = NODE_CHECK_TIMEOUT_S if remaining is None else min(NODE_CHECK_TIMEOUT_S, remaining)
+                with self.tracer.span('node --check', 'subprocess', bytes=len(config_content)) as span:
+                    try:
+                        # subprocess.run kills the child when the timeout expires
+                        result = subprocess.run(
+                            ['node', '--check', temp_file], 
+                            capture_output=True, 
+                            text=True,
+                            timeout=timeout
+                        )
+                    except subprocess.TimeoutExpired:
+                        self.remaining_s('node --check finished')
+                        raise
+                    span['returncode'] = result.returncode
                 
                 is_valid = result.returncode == 0
                 if not is_valid:
                     print(f"JavaScript validation failed: {result.stderr}")
+                self.status.emit('config_validated', 'validate',
+                                 'Config is valid JavaScript' if is_valid else 'Config failed JavaScript validation',
+                                 valid=is_valid)
                 
+                self._validated[content_hash] = is_valid
                 return is_valid
                 
             finally:
@@ -1027,6 +2051,8 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
                 except:
                     pass
                     
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Warning: Could not validate JavaScript (validation disabled): {e}")
             # If validation fails, assume it's valid to not block the process
@@ -1065,6 +2091,7 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
         
         # Get colors using priority system: user-specified > logo-extracted > business-based
         colors = self.get_user_colors_with_priority(business_data)
+        self.theme_colors = dict(colors)
         print(f"Final theme colors: {colors}")
         
         # Generate industry-appropriate styling
@@ -1102,12 +2129,39 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
         secondary_scale = self.generate_color_scale(colors['secondary'])
         accent_scale = self.generate_color_scale(colors['accent'])
         
+        # Optionally snap every shade to the nearest approved palette color (before the contrast check)
+        if self.palette_index:
+            scales, self.snap_report = snap_theme(
+                {'primary': primary_scale, 'secondary': secondary_scale, 'accent': accent_scale},
+                self.palette_index, self.contrast_level
+            )
+            primary_scale, secondary_scale, accent_scale = scales['primary'], scales['secondary'], scales['accent']
+            print(f"Snapped {len(self.snap_report['shades'])} shades to {self.snap_report['palette']} "
+                  f"({self.snap_report['palette_size']} colors) in {self.snap_report['query_ms']}ms")
+        
+        # Move shades that fail their text pairings to the nearest compliant lightness
+        contrast_note = 'not enforced'
+        if self.contrast_level:
+            try:
+                scales, self.contrast_report = enforce_theme_contrast(
+                    {'primary': primary_scale, 'secondary': secondary_scale, 'accent': accent_scale},
+                    self.contrast_level
+                )
+                primary_scale, secondary_scale, accent_scale = scales['primary'], scales['secondary'], scales['accent']
+                contrast_note = f"WCAG {self.contrast_level} ({self.contrast_report['shades_adjusted']} shades adjusted)"
+                print(f"Contrast check: {contrast_note}")
+                for brand_shade in self.contrast_report['brand_colors_below_target']:
+                    print(f"  ⚠️  Brand color {brand_shade} is below {self.contrast_level} with white text; use 600+ for text buttons")
+            except ValueError as e:
+                print(f"Warning: Could not check theme contrast, keeping generated scales: {e}")
+        
         # Generate CSS theme
         css_theme = f"""
 /* 
  * Client Theme: {business_data['business_name']}
  * Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
  * Industry: {business_data['industry']}
+ * Contrast: {contrast_note}
  */
 .theme-{client_name} {{
   /* Background for visual distinction */
@@ -1173,103 +2227,717 @@ OUTPUT: Provide ONLY the content sections in this JSON structure:
 """
         return css_theme
 
-async def main():
-    parser = argparse.ArgumentParser(description='Generate AI-powered website theme and content')
-    parser.add_argument('--business-name', required=True, help='Business name')
+    def save_theme_bundle(self, client_name: str, css_theme: str, themes_dir: str = THEMES_DIR) -> str:
+        """Write a client's theme to its own CSS file and register it in the theme manifest"""
+        os.makedirs(themes_dir, exist_ok=True)
+        
+        css_content = css_theme.strip() + '\n'
+        theme_file = f'{client_name}.css'
+        theme_path = os.path.join(themes_dir, theme_file)
+        write_file_atomic(theme_path, css_content)
+        
+        # Load the existing manifest so other clients' entries are preserved
+        manifest_path = os.path.join(themes_dir, THEMES_MANIFEST)
+        manifest = {'version': 1, 'themes': {}}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read theme manifest, rebuilding it: {e}")
+        
+        themes = manifest.setdefault('themes', {})
+        themes[client_name] = {
+            'file': theme_file,
+            'className': f'theme-{client_name}',
+            'hash': hashlib.sha256(css_content.encode('utf-8')).hexdigest()[:16],
+            'bytes': len(css_content.encode('utf-8')),
+            'generated_at': datetime.now().isoformat()
+        }
+        manifest['themes'] = dict(sorted(themes.items()))
+        
+        # Write atomically so a concurrent build never reads a half-written manifest
+        temp_path = f'{manifest_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+        os.replace(temp_path, manifest_path)
+        
+        return theme_path
+    
+    def register_client(self, client_name: str, client_config: str, css_theme: str,
+                        business_name: str = '', industry: str = '', clients_dir: str = CLIENTS_DIR) -> str:
+        """Record a client in the client manifest (with the hashes incremental builds compare)
+        and regenerate the lazy client registry from it"""
+        manifest_path = os.path.join(clients_dir, CLIENTS_MANIFEST)
+        manifest = {'version': 1, 'clients': {}}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read client manifest, rebuilding it: {e}")
+        
+        clients = manifest.setdefault('clients', {})
+        clients[client_name] = {
+            'config': f'{client_name}.js',
+            'className': f'theme-{client_name}',
+            'businessName': business_name or client_name,
+            'industry': industry,
+            'colors': {slot: self.theme_colors.get(slot, '') for slot in ('primary', 'secondary', 'accent')},
+            'logo': f'/images/clients/{client_name}/logo.png',
+            # Rendered by the [client] route; otherwise the client has its own generated pages
+            'dynamicPage': self.dynamic_pages,
+            'configHash': hashlib.sha256(client_config.encode('utf-8')).hexdigest()[:16],
+            'themeHash': hashlib.sha256((css_theme.strip() + '\n').encode('utf-8')).hexdigest()[:16],
+            'generated_at': datetime.now().isoformat()
+        }
+        manifest['clients'] = dict(sorted(clients.items()))
+        write_file_atomic(manifest_path, json.dumps(manifest, indent=2) + '\n')
+        write_file_atomic(os.path.join(clients_dir, CLIENTS_REGISTRY), render_client_registry(manifest))
+        return manifest_path
+
+
+def render_client_registry(manifest: Dict[str, Any]) -> str:
+    """registry.js: per-client dynamic imports plus an index of the fields listings need"""
+    clients = manifest.get('clients', {})
+    loaders = '\n'.join(
+        f"  {json.dumps(name)}: () => import({json.dumps('./' + entry['config'])}),"
+        for name, entry in clients.items()
+    )
+    index = [
+        {
+            'name': name,
+            'businessName': entry.get('businessName', name),
+            'industry': entry.get('industry', ''),
+            'themeClass': entry['className'],
+            'colors': entry.get('colors', {}),
+            'dynamicPage': entry.get('dynamicPage', False),
+        }
+        for name, entry in clients.items()
+    ]
+    return f"""// Client registry - generated by scripts/generate-theme.py from manifest.json; do not edit.
+// Full configs are imported lazily, so pages only load (and bundle) the clients they render.
+
+export const clientLoaders = {{
+{loaders}
+}};
+
+// Lightweight fields for listings and theme pages (no full config needed)
+export const clientIndex = {json.dumps(index, indent=2, ensure_ascii=False)};
+
+export async function loadClientConfig(name) {{
+  const load = clientLoaders[name];
+  if (!load) {{
+    throw new Error(`Unknown client: ${{name}}`);
+  }}
+  const module = await load();
+  return module.clientConfig ?? module.default;
+}}
+"""
+
+
+BUSINESS_FIELDS = (
+    'business_name', 'business_description', 'industry', 'target_audience', 'services',
+    'contact_email', 'contact_phone', 'website_domain', 'client_name', 'logo_colors',
+    'logo_path', 'primary_color', 'secondary_color', 'accent_color'
+)
+REQUIRED_BUSINESS_FIELDS = ('business_name', 'industry', 'contact_email', 'client_name')
+
+
+def build_business_data(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a business record (CLI args or an NDJSON line) into business_data"""
+    missing = [field for field in REQUIRED_BUSINESS_FIELDS if not record.get(field)]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    
+    business_data = {field: record.get(field) or '' for field in BUSINESS_FIELDS}
+    # process-logo.js output can be piped in as an object rather than a JSON string
+    if isinstance(business_data['logo_colors'], dict):
+        business_data['logo_colors'] = json.dumps(business_data['logo_colors'])
+    business_data['logo_colors'] = business_data['logo_colors'] or '{}'
+    return business_data
+
+
+async def generate_client(generator: ThemeGenerator, business_data: Dict[str, Any],
+                          logo_colors: Optional[Awaitable[str]] = None) -> Dict[str, Any]:
+    """Run every generation stage for one client and return the config, CSS and metadata.
+    
+    Custom content does not depend on colors, so it starts right away and runs alongside
+    the color-dependent stages. Pass `logo_colors` (an awaitable resolving to the logo
+    colors JSON) to start content generation while the logo is still being processed;
+    the base config and CSS theme wait for it.
+    
+    Every stage checks the client's deadline before it starts; DeadlineExceeded cancels
+    whatever is still running and nothing is returned (so nothing gets written).
+    """
+    tracer = generator.tracer
+    memory = generator.memory
+    status = generator.status
+    timings = {}
+    start = time.perf_counter()
+    
+    async def run_stage(stage: str, awaitable, own_track: bool = False):
+        generator.remaining_s(stage)
+        status.emit('stage_started', stage, f'Started {stage}')
+        # Stages running alongside the main sequence get their own trace track
+        with memory.stage(stage), (tracer.track(stage) if own_track else contextlib.nullcontext()):
+            stage_start = time.perf_counter()
+            with tracer.span(stage):
+                result = await awaitable
+            timings[stage] = round((time.perf_counter() - stage_start) * 1000, 1)
+        return result
+    
+    print("Step 1: Generating custom marketing content...")
+    content_task = asyncio.create_task(run_stage('custom_content', generator.generate_custom_content(business_data),
+                                                 own_track=True))
+    variants_task = None
+    
+    try:
+        if logo_colors is not None:
+            business_data['logo_colors'] = await run_stage(
+                'wait_logo_colors', generator.within_deadline(logo_colors, 'logo processing')
+            )
+        
+        # Without --logo-colors, extract them from the logo file in-process (cached by content hash)
+        status.emit('stage_started', 'logo_colors', 'Started logo_colors')
+        with memory.stage('logo_colors'):
+            stage_start = time.perf_counter()
+            with tracer.span('logo_colors'):
+                # Off the event loop, so the content request started above goes out during extraction
+                business_data['logo_colors'] = await asyncio.to_thread(generator.resolve_logo_colors, business_data)
+            timings['logo_colors'] = round((time.perf_counter() - stage_start) * 1000, 1)
+        
+        if generator.variants:
+            # Alternatives need the brand colors but nothing else, so they run alongside the base config
+            brand_colors = generator.get_user_colors_with_priority(business_data, quiet=True)
+            variants_task = asyncio.create_task(run_stage(
+                'variants', generator.generate_variants(business_data, generator.variants, brand_colors), own_track=True
+            ))
+        
+        print("Step 2: Generating base configuration...")
+        base_config = await run_stage('base_config', generator.generate_theme_config(business_data))
+        
+        custom_content = await content_task
+        variants = await variants_task if variants_task else []
+    except BaseException:
+        for task in (content_task, variants_task):
+            if task is None:
+                continue
+            if task.done() and not task.cancelled():
+                task.exception()  # already failed too; retrieved so it isn't logged as unhandled
+            task.cancel()
+        raise
+    
+    print("Step 3: Merging custom content into configuration...")
+    client_config = await run_stage('merge', generator.merge_custom_content_with_repair(base_config, custom_content, business_data))
+    merged_sections = generator.merge_report.get('merged_sections', [])
+    status.emit('content_merged', 'merge', f'Merged {len(merged_sections)} content section(s)',
+                merged_sections=merged_sections, repairs=len(generator.merge_report.get('repairs', [])))
+    
+    # Generate CSS theme
+    generator.remaining_s('theme_css')
+    status.emit('stage_started', 'theme_css', 'Started theme_css')
+    with memory.stage('theme_css'):
+        stage_start = time.perf_counter()
+        with tracer.span('theme_css'):
+            css_theme = generator.generate_css_theme(business_data)
+        timings['theme_css'] = round((time.perf_counter() - stage_start) * 1000, 1)
+    
+    if variants:
+        status.emit('stage_started', 'variant_themes', 'Started variant_themes')
+        with memory.stage('variant_themes'):
+            stage_start = time.perf_counter()
+            with tracer.span('variant_themes'):
+                variants = generator.build_variants(variants, business_data, client_config, generator.theme_colors)
+            timings['variant_themes'] = round((time.perf_counter() - stage_start) * 1000, 1)
+    timings['total'] = round((time.perf_counter() - start) * 1000, 1)
+    
+    metadata = {
+        'client_name': business_data['client_name'],
+        'business_name': business_data['business_name'],
+        'industry': business_data['industry'],
+        'generated_at': datetime.now().isoformat(),
+        'files_created': [],
+        'ai_model': generator.router.default_model,
+        'stage_models': {stage: usage['model'] for stage, usage in generator.usage.items()},
+        'generation_steps': ['base_config', 'custom_content', 'theme_css'],
+        'content_customized': bool(generator.merge_report.get('merged_sections')),
+        'content_merge': generator.merge_report,
+        'colors_from_logo': True,
+        'accessibility': generator.contrast_report,
+        'palette_optimization': generator.palette_report,
+        'palette_snap': generator.snap_report,
+        'token_usage': generator.usage,
+        'model_stats': generator.router.summary(),
+        'config_skeleton': generator.skeleton_report,
+        'prompts': generator.prompt_report,
+        'scheduling': generator.schedule_report,
+        'timings_ms': timings,
+        'deadline': {
+            'budget_s': generator.deadline_s,
+            'remaining_s': round(generator.deadline - time.monotonic(), 1) if generator.deadline is not None else None,
+        },
+        'theme_colors': generator.theme_colors,
+        'variants': [
+            {key: variant[key] for key in ('rank', 'headline', 'subheadline', 'cta', 'tagline', 'colors',
+                                           'scores', 'fields_over_limits', 'harmony_warnings') if key in variant}
+            for variant in variants
+        ],
+        'input_hash': input_hash(business_data),
+        'business_data': business_data
+    }
+    if memory.enabled:
+        metadata['memory'] = memory.client_report()
+    
+    return {'config': client_config, 'css': css_theme, 'metadata': metadata, 'variants': variants}
+
+
+def write_file_atomic(path: str, content: str) -> None:
+    """Write through a temp file and rename, so an interrupted run never leaves a partial file"""
+    temp_path = f'{path}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+def write_variant_files(client_name: str, variants: List[Dict[str, Any]]) -> List[str]:
+    """Write each ranked variant's config and CSS theme, plus an index of their scores"""
+    config_dir = os.path.join('src/config/clients', VARIANTS_DIR, client_name)
+    css_dir = os.path.join(THEMES_DIR, VARIANTS_DIR, client_name)
+    os.makedirs(config_dir, exist_ok=True)
+    os.makedirs(css_dir, exist_ok=True)
+    
+    files, index = [], []
+    for variant in variants:
+        config_path = os.path.join(config_dir, f"v{variant['rank']}.js")
+        css_path = os.path.join(css_dir, f"v{variant['rank']}.css")
+        write_file_atomic(config_path, variant['config'])
+        write_file_atomic(css_path, variant['css'])
+        files += [config_path, css_path]
+        index.append({
+            'rank': variant['rank'],
+            'score': variant['scores']['total'],
+            'scores': variant['scores'],
+            'headline': variant.get('headline'),
+            'tagline': variant.get('tagline'),
+            'colors': variant['colors'],
+            'config': config_path,
+            'css': css_path,
+        })
+    index_path = os.path.join(config_dir, 'variants.json')
+    write_file_atomic(index_path, json.dumps(index, indent=2, ensure_ascii=False) + '\n')
+    return files + [index_path]
+
+
+def write_client_files(generator: ThemeGenerator, result: Dict[str, Any]) -> List[str]:
+    """Write a generated client's config, theme bundle and metadata into the repo tree"""
+    tracer = generator.tracer
+    metadata = result['metadata']
+    client_name = metadata['client_name']
+    
+    # Create output directories
+    os.makedirs(CLIENTS_DIR, exist_ok=True)
+    
+    # Save client configuration
+    client_config_path = os.path.join(CLIENTS_DIR, f'{client_name}.js')
+    with tracer.span('write', 'io', path=client_config_path):
+        write_file_atomic(client_config_path, result['config'])
+    print(f"✅ Client configuration saved to: {client_config_path}")
+    
+    # Save CSS theme as its own bundle so pages only load their client's theme
+    with tracer.span('write', 'io', path=THEMES_DIR):
+        themes_css_path = generator.save_theme_bundle(client_name, result['css'])
+    themes_manifest_path = os.path.join(THEMES_DIR, THEMES_MANIFEST)
+    print(f"✅ Theme CSS saved to: {themes_css_path}")
+    print(f"✅ Theme registered in: {themes_manifest_path}")
+    
+    with tracer.span('write', 'io', path=CLIENTS_MANIFEST):
+        clients_manifest_path = generator.register_client(client_name, result['config'], result['css'],
+                                                          metadata.get('business_name', ''), metadata.get('industry', ''))
+    print(f"✅ Client registered in: {clients_manifest_path}" + (" (dynamic page)" if generator.dynamic_pages else ''))
+    
+    # Save generation metadata
+    metadata['files_created'] = [client_config_path, themes_css_path, themes_manifest_path, clients_manifest_path,
+                                 os.path.join(CLIENTS_DIR, CLIENTS_REGISTRY)]
+    if result.get('variants'):
+        with tracer.span('write', 'io', path=VARIANTS_DIR):
+            metadata['files_created'] += write_variant_files(client_name, result['variants'])
+        print(f"✅ {len(result['variants'])} ranked variants saved to: src/config/clients/{VARIANTS_DIR}/{client_name}/")
+    metadata_path = os.path.join(CLIENTS_DIR, f'{client_name}-metadata.json')
+    with tracer.span('write', 'io', path=metadata_path):
+        write_file_atomic(metadata_path, json.dumps(metadata, indent=2))
+    print(f"✅ Generation metadata saved to: {metadata_path}")
+    
+    if generator.index:
+        try:
+            with tracer.span('index', 'io', path=generator.index.path):
+                generator.index.record(metadata, css=result['css'], metadata_path=metadata_path)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not index generation: {e}")
+    
+    files = metadata['files_created'] + [metadata_path]
+    generator.status.emit('files_written', 'write', f'Wrote {len(files)} file(s)', files=files)
+    return files
+
+
+def save_scheduler_metrics(generator: ThemeGenerator, path: str) -> None:
+    """Write the scheduler's per-class queue depth and wait-time metrics, and how many calls were coalesced"""
+    metrics = generator.scheduler.metrics()
+    metrics['coalescing'] = generator.coalescer.metrics()
+    if metrics['coalescing']['coalesced']:
+        print(f"API calls coalesced: {metrics['coalescing']['coalesced']} of {metrics['coalescing']['requests']} "
+              f"requests shared an identical in-flight call")
+    for name, stats in metrics['classes'].items():
+        if stats['dispatched']:
+            print(f"API queue [{name}]: {stats['dispatched']} calls, wait p50 {stats['wait_ms_p50']}ms, "
+                  f"p95 {stats['wait_ms_p95']}ms, max depth {stats['max_queue_depth']}")
+    if not path:
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=2)
+        print(f"Scheduler metrics written to: {path}")
+    except OSError as e:
+        print(f"Warning: Could not write scheduler metrics: {e}")
+
+
+async def close_status_reporter(status: StatusReporter, log=None) -> None:
+    """Flush buffered status events (bounded wait) and report what was sent"""
+    if not status.enabled:
+        return
+    await status.close(log=log)
+    metrics = status.metrics()
+    print(f"Status events: {metrics['sent']} sent in {metrics['requests']} request(s), {metrics['coalesced']} coalesced, "
+          f"{metrics['dropped']} dropped, {metrics['failed_requests']} failed request(s)", file=log)
+
+
+def save_memory_profile(memory: MemoryProfiler, path: str, log=None) -> None:
+    """Write the run's memory profile and stop tracing"""
+    try:
+        report = memory.save(path)
+        peak = f"{report['peak_rss_kb'] / 1024:.1f} MB" if report['peak_rss_kb'] is not None else 'n/a'
+        print(f"Memory profile written to: {path} (peak RSS {peak}, "
+              f"peak traced {report['traced_peak_kb'] / 1024:.1f} MB)", file=log)
+    except OSError as e:
+        print(f"Warning: Could not write memory profile: {e}", file=log)
+    finally:
+        memory.stop()
+
+
+def save_run_history(generator: ThemeGenerator) -> None:
+    """Keep the output-token history and model stats so later runs can size and route stages"""
+    if isinstance(generator.client, ReplayClient):
+        # Replayed calls have no real latency; leave the history of live runs alone
+        unused = generator.client.unused()
+        print(f"Replayed {generator.client.served} API call(s) from {generator.client.path}")
+        if unused:
+            print(f"Warning: {unused} recorded call(s) in {generator.client.path} were not used")
+        return
+    if isinstance(generator.client, RecordingClient):
+        try:
+            generator.client.save()
+            print(f"Recorded {len(generator.client.interactions)} API call(s) to: {generator.client.path}")
+        except OSError as e:
+            print(f"Warning: Could not save cassette: {e}")
+    try:
+        generator.token_budget.save()
+    except OSError as e:
+        print(f"Warning: Could not save token usage history: {e}")
+    try:
+        generator.router.save()
+    except OSError as e:
+        print(f"Warning: Could not save model stats: {e}")
+
+
+async def stream_ndjson(generator: ThemeGenerator, concurrency: int, write_files: bool, out=None) -> int:
+    """Read business records as NDJSON from stdin and emit one result line per client on stdout.
+    
+    At most `concurrency` records are read ahead and in flight, so memory stays flat
+    however long the stream is. Results are emitted in completion order with the input index.
+    Returns the number of records that failed.
+    """
+    out = out or sys.stdout
+    slots = asyncio.Semaphore(concurrency)
+    pending = set()
+    failures = 0
+    
+    def emit(result: Dict[str, Any]) -> None:
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        out.flush()
+    
+    async def process(index: int, line: str) -> None:
+        nonlocal failures
+        start = time.perf_counter()
+        client_name = None
+        try:
+            record = json.loads(line)
+            business_data = build_business_data(record)
+            client_name = business_data['client_name']
+            client_generator = generator.for_client(client_name, record.get('priority'), record.get('tenant'))
+            print(f"[{index}] Generating theme for: {business_data['business_name']} ({client_name})")
+            result = await generate_client(client_generator, business_data)
+            files = write_client_files(client_generator, result) if write_files else []
+            emit({
+                'index': index,
+                'client_name': client_name,
+                'status': 'ok',
+                'config': result['config'],
+                'css': result['css'],
+                'metadata': result['metadata'],
+                'variants': [{key: value for key, value in variant.items() if key != 'accessibility'}
+                             for variant in result['variants']],
+                'files': files,
+                'timings_ms': dict(result['metadata']['timings_ms'], total=round((time.perf_counter() - start) * 1000, 1)),
+            })
+        except Exception as e:
+            failures += 1
+            print(f"❌ [{index}] Theme generation failed: {e}")
+            emit({
+                'index': index,
+                'client_name': client_name,
+                'status': 'error',
+                'error': f"{type(e).__name__}: {e}",
+                'timings_ms': {'total': round((time.perf_counter() - start) * 1000, 1)},
+            })
+        finally:
+            slots.release()
+    
+    index = 0
+    while True:
+        await slots.acquire()
+        line = await asyncio.to_thread(sys.stdin.readline)
+        if not line:
+            slots.release()
+            break
+        if not line.strip():
+            slots.release()
+            continue
+        task = asyncio.create_task(process(index, line))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        index += 1
+    
+    if pending:
+        await asyncio.gather(*pending)
+    return failures
+
+
+def build_arg_parser(description: str = 'Generate AI-powered website theme and content') -> argparse.ArgumentParser:
+    """Business and generation options shared by generate-theme.py and onboard-client.py"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--business-name', default='', help='Business name (required unless --ndjson)')
     parser.add_argument('--business-description', default='', help='Business description')
-    parser.add_argument('--industry', required=True, help='Industry/business type')
+    parser.add_argument('--industry', default='', help='Industry/business type (required unless --ndjson)')
     parser.add_argument('--target-audience', default='', help='Target audience')
     parser.add_argument('--services', default='', help='Services (comma-separated)')
-    parser.add_argument('--contact-email', required=True, help='Contact email')
+    parser.add_argument('--contact-email', default='', help='Contact email (required unless --ndjson)')
     parser.add_argument('--contact-phone', default='', help='Contact phone')
     parser.add_argument('--website-domain', default='', help='Website domain')
-    parser.add_argument('--client-name', required=True, help='Client name for files')
-    parser.add_argument('--logo-colors', default='{}', help='Extracted logo colors JSON')
+    parser.add_argument('--client-name', default='', help='Client name for files (required unless --ndjson)')
+    parser.add_argument('--logo-colors', default='{}', help='Extracted logo colors JSON (extracted from --logo-path when omitted)')
     parser.add_argument('--logo-path', default='', help='Path to processed logo')
     parser.add_argument('--primary-color', default='', help='User-specified primary color (hex format)')
     parser.add_argument('--secondary-color', default='', help='User-specified secondary color (hex format)')
     parser.add_argument('--accent-color', default='', help='User-specified accent color (hex format)')
+    parser.add_argument('--contrast-level', default='AA', choices=['AA', 'AAA', 'off'],
+                        help='WCAG level the generated color scales are adjusted to meet (default: AA)')
+    parser.add_argument('--optimize-palette', action='store_true',
+                        help='Pick the best-balanced palette from logo, industry and harmony colors (requires numpy)')
+    parser.add_argument('--palette-budget-ms', type=float, default=PALETTE_BUDGET_MS,
+                        help=f'Time budget for the palette search in milliseconds (default: {PALETTE_BUDGET_MS:g})')
+    parser.add_argument('--snap-palette', default='',
+                        help='Snap generated shades to the nearest color of "tailwind" (the tailwind.config.js palette) '
+                             'or a brand palette file (JSON list/object of hex colors, or one color per line)')
+    parser.add_argument('--variants', type=int, default=0,
+                        help=f'Also generate this many alternative hero/tagline/palette variants, scored and ranked '
+                             f'locally and written with their own config and CSS (max {MAX_VARIANTS})')
+    parser.add_argument('--compact-prompts', action='store_true',
+                        help='Describe the config and content structure as a minimal schema instead of annotated templates')
+    parser.add_argument('--compare-prompts', action='store_true',
+                        help='Also build the other prompt mode to record both estimated sizes in the metadata')
+    parser.add_argument('--no-skeleton', action='store_true',
+                        help='Generate the full config instead of filling the cached per-industry skeleton')
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                        help=f'Model for creative stages and validation fallbacks (default: {DEFAULT_MODEL})')
+    parser.add_argument('--fast-model', default=FAST_MODEL,
+                        help=f'Model for structural stages when --route-models is set (default: {FAST_MODEL})')
+    parser.add_argument('--route-models', action='store_true',
+                        help='Send structural stages to --fast-model, falling back to --model on validation failure')
+    parser.add_argument('--trace', default='',
+                        help='Write a Chrome trace-event JSON of stages, API calls and subprocesses to this path')
+    parser.add_argument('--webhook-url', default=os.getenv('STATUS_WEBHOOK_URL', ''),
+                        help='Post stage events (started, API attempt, retry, merged, validated, written) '
+                             'to this status webhook in the background (default: $STATUS_WEBHOOK_URL)')
+    parser.add_argument('--webhook-batch', action='store_true',
+                        help='Send status events as versioned batches ({"schema": "status-events/v1", "events": [...]}) '
+                             'instead of one request per event; the receiver must accept that shape')
+    parser.add_argument('--memprofile', default='',
+                        help='Take tracemalloc snapshots per stage and write peak RSS and top allocation sites for '
+                             'the run to this JSON file (per-client figures go into the metadata; slows generation)')
+    parser.add_argument('--stage-config', default='',
+                        help='JSON file of per-stage overrides, e.g. {"custom_content": {"model": "...", "temperature": 0.9, "max_tokens": 3000}}')
+    parser.add_argument('--priority', default=DEFAULT_PRIORITY, choices=list(PRIORITY_CLASSES),
+                        help=f'Scheduling class for API calls; NDJSON records may set "priority" (default: {DEFAULT_PRIORITY})')
+    parser.add_argument('--tenant', default='',
+                        help='Tenant (agency) API calls are fair-queued under; NDJSON records may set "tenant" (default: the client)')
+    parser.add_argument('--tenant-weights', default='',
+                        help='JSON file of tenant weights for fair queuing, e.g. {"agency-a": 3} (default weight: 1)')
+    parser.add_argument('--api-concurrency', type=int, default=DEFAULT_API_CONCURRENCY,
+                        help=f'API requests in flight at once across all clients (default: {DEFAULT_API_CONCURRENCY})')
+    parser.add_argument('--aging-s', type=float, default=AGING_S,
+                        help=f'Queued API calls move up one priority class per this many seconds waited (default: {AGING_S:g})')
+    parser.add_argument('--scheduler-metrics', default='',
+                        help='Write per-class queue depth and wait-time metrics to this JSON file')
+    parser.add_argument('--no-coalesce', action='store_true',
+                        help='Send every API request, even when an identical one is already in flight')
+    parser.add_argument('--deadline-s', type=float, default=DEFAULT_DEADLINE_S,
+                        help=f'Per-client time budget covering every stage, API attempt and retry; 0 disables (default: {DEFAULT_DEADLINE_S:g})')
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record-cassette', default='',
+                          help='Record every API request/response of the run to this cassette file')
+    cassette.add_argument('--replay-cassette', default='',
+                          help='Serve API responses from this cassette instead of the API (no API key needed)')
+    parser.add_argument('--dynamic-page', action='store_true',
+                        help='Render the client through the dynamic src/pages/clients/[client] route instead of '
+                             'generated per-client pages')
+    parser.add_argument('--index-db', default=DEFAULT_INDEX_PATH,
+                        help=f'SQLite generation index each written generation is recorded in (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--no-index', action='store_true', help='Do not record generations in the index')
+    
+    return parser
+
+
+def create_generator(args: argparse.Namespace, api_key: str, tracer: Tracer,
+                     memory: Optional[MemoryProfiler] = None, status: Optional[StatusReporter] = None) -> ThemeGenerator:
+    """Build the generator (and its model router) from parsed options"""
+    stage_overrides = {}
+    if args.stage_config:
+        with open(args.stage_config, 'r', encoding='utf-8') as f:
+            stage_overrides = json.load(f)
+    router = ModelRouter(args.model, args.fast_model, route=args.route_models, overrides=stage_overrides)
+    
+    client = None
+    skeleton_dir = None
+    if args.replay_cassette:
+        client = ReplayClient(args.replay_cassette)
+    elif args.record_cassette:
+        client = RecordingClient(anthropic.Anthropic(api_key=api_key), args.record_cassette)
+    if client is not None and not args.no_skeleton:
+        # A cached skeleton skips its API request, so cassettes start from (and leave behind) an empty pool
+        skeleton_dir = tempfile.mkdtemp(prefix='config-skeletons-')
+        atexit.register(shutil.rmtree, skeleton_dir, True)
+    
+    tenant_weights = {}
+    if args.tenant_weights:
+        with open(args.tenant_weights, 'r', encoding='utf-8') as f:
+            tenant_weights = json.load(f)
+    scheduler = ApiScheduler(args.api_concurrency, tenant_weights, aging_s=args.aging_s)
+    
+    index = None
+    if not args.no_index:
+        try:
+            index = GenerationIndex(args.index_db)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not open generation index, continuing without it: {e}")
+    
+    return ThemeGenerator(
+        api_key,
+        contrast_level=None if args.contrast_level == 'off' else args.contrast_level,
+        optimize_palette=args.optimize_palette,
+        palette_budget_ms=args.palette_budget_ms,
+        use_skeletons=not args.no_skeleton,
+        skeleton_dir=skeleton_dir,
+        router=router,
+        tracer=tracer,
+        memory=memory,
+        status=status,
+        index=index,
+        scheduler=scheduler,
+        priority=args.priority,
+        tenant=args.tenant,
+        coalescer=RequestCoalescer(enabled=not args.no_coalesce, private_errors=(DeadlineExceeded,)),
+        deadline_s=args.deadline_s or None,
+        snap_palette=args.snap_palette or None,
+        client=client,
+        variants=args.variants,
+        dynamic_pages=args.dynamic_page,
+        compact_prompts=args.compact_prompts,
+        compare_prompts=args.compare_prompts
+    )
+
+
+async def main():
+    parser = build_arg_parser()
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Read business records as NDJSON from stdin and write one NDJSON result per client to stdout')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Clients generated at once in --ndjson mode (default: 4)')
+    parser.add_argument('--no-write', action='store_true',
+                        help='Do not write config, theme or metadata files into the repo tree')
     
     args = parser.parse_args()
+    if not args.ndjson:
+        missing = [f'--{field.replace("_", "-")}' for field in REQUIRED_BUSINESS_FIELDS if not getattr(args, field)]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.api_concurrency < 1:
+        parser.error("--api-concurrency must be at least 1")
+    if not 0 <= args.variants <= MAX_VARIANTS:
+        parser.error(f"--variants must be between 0 and {MAX_VARIANTS}")
     
-    # Get API key from environment
+    # Get API key from environment (a replayed run makes no API calls)
     api_key = os.getenv('ANTHROPIC_API_KEY')
-    if not api_key:
+    if not api_key and not args.replay_cassette:
         print("Error: ANTHROPIC_API_KEY environment variable not set")
         sys.exit(1)
     
+    tracer = Tracer(enabled=bool(args.trace))
+    memory = MemoryProfiler(enabled=bool(args.memprofile))
+    memory.start()
+    status = StatusReporter(args.webhook_url, batch=args.webhook_batch)
+    status.start()
+    
     try:
+        # Initialize theme generator
+        generator = create_generator(args, api_key, tracer, memory, status)
+        
+        if args.ndjson:
+            # stdout carries only result lines; progress messages go to stderr
+            out = sys.stdout
+            with contextlib.redirect_stdout(sys.stderr):
+                failures = await stream_ndjson(generator, args.concurrency, not args.no_write, out)
+                save_run_history(generator)
+                save_scheduler_metrics(generator, args.scheduler_metrics)
+            if failures:
+                sys.exit(1)
+            return
+        
         # Prepare business data
-        business_data = {
-            'business_name': args.business_name,
-            'business_description': args.business_description,
-            'industry': args.industry,
-            'target_audience': args.target_audience,
-            'services': args.services,
-            'contact_email': args.contact_email,
-            'contact_phone': args.contact_phone,
-            'website_domain': args.website_domain,
-            'client_name': args.client_name,
-            'logo_colors': args.logo_colors,
-            'logo_path': args.logo_path,
-            'primary_color': args.primary_color,
-            'secondary_color': args.secondary_color,
-            'accent_color': args.accent_color
-        }
+        business_data = build_business_data(vars(args))
         
         print(f"Generating theme for: {args.business_name}")
         print(f"Industry: {args.industry}")
         print(f"Client name: {args.client_name}")
         
-        # Initialize theme generator
-        generator = ThemeGenerator(api_key)
-        
-        # Generate AI configuration and custom content in parallel
-        print("Step 1: Generating base configuration...")
-        base_config = await generator.generate_theme_config(business_data)
+        generator = generator.for_client(args.client_name)
+        result = await generate_client(generator, business_data)
+        if not args.no_write:
+            write_client_files(generator, result)
         
-        print("Step 2: Generating custom marketing content...")
-        custom_content = await generator.generate_custom_content(business_data)
-        
-        print("Step 3: Merging custom content into configuration...")
-        client_config = generator.merge_custom_content_into_config(base_config, custom_content)
-        
-        # Generate CSS theme
-        css_theme = generator.generate_css_theme(business_data)
-        
-        # Create output directories
-        os.makedirs('src/config/clients', exist_ok=True)
-        
-        # Save client configuration
-        client_config_path = f'src/config/clients/{args.client_name}.js'
-        with open(client_config_path, 'w', encoding='utf-8') as f:
-            f.write(client_config)
-        print(f"✅ Client configuration saved to: {client_config_path}")
-        
-        # Append CSS theme to client-themes.css
-        themes_css_path = 'src/styles/client-themes.css'
-        with open(themes_css_path, 'a', encoding='utf-8') as f:
-            f.write(f"\n{css_theme}\n")
-        print(f"✅ Theme CSS appended to: {themes_css_path}")
-        
-        # Save generation metadata
-        metadata = {
-            'client_name': args.client_name,
-            'business_name': args.business_name,
-            'industry': args.industry,
-            'generated_at': datetime.now().isoformat(),
-            'files_created': [client_config_path, themes_css_path],
-            'ai_model': 'claude-3-5-sonnet-20241022',
-            'generation_steps': ['base_config', 'custom_content', 'theme_css'],
-            'content_customized': True,
-            'colors_from_logo': True,
-            'business_data': business_data
-        }
-        
-        metadata_path = f'src/config/clients/{args.client_name}-metadata.json'
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
-        print(f"✅ Generation metadata saved to: {metadata_path}")
+        save_run_history(generator)
+        if args.scheduler_metrics:
+            save_scheduler_metrics(generator, args.scheduler_metrics)
         
         print("\n🎉 AI theme generation completed successfully!")
         print(f"Theme class: theme-{args.client_name}")
@@ -1277,9 +2945,18 @@ async def main():
         
     except Exception as e:
         print(f"❌ Theme generation failed: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if args.trace:
+            try:
+                tracer.save(args.trace)
+                print(f"Trace written to: {args.trace} (open in https://ui.perfetto.dev)", file=sys.stderr if args.ndjson else sys.stdout)
+            except OSError as e:
+                print(f"Warning: Could not write trace: {e}")
+        if args.memprofile:
+            save_memory_profile(memory, args.memprofile, sys.stderr if args.ndjson else sys.stdout)
+        await close_status_reporter(status, sys.stderr if args.ndjson else sys.stdout)
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
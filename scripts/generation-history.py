@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Generation History
+Query and export the SQLite generation index that generate-theme.py writes, and
+import the <client>-metadata.json files written before the index existed.
+"""
+
+import argparse
+import sys
+
+from generation_index import DEFAULT_INDEX_PATH, GenerationIndex, export_rows
+
+
+def add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--client', default='', help='Only this client')
+    parser.add_argument('--industry', default='', help='Only this industry (case-insensitive)')
+    parser.add_argument('--model', default='', help='Only generations that used this model in any stage')
+    parser.add_argument('--latest', action='store_true', help='Only the latest generation of each client')
+    parser.add_argument('--limit', type=int, default=None, help='At most this many rows')
+
+
+def print_table(rows, columns) -> None:
+    if not rows:
+        print('No generations found')
+        return
+    widths = {column: max(len(column), *(len(str(row[column] if row[column] is not None else '')) for row in rows))
+              for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(str(row[column] if row[column] is not None else '').ljust(widths[column]) for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the client generation index')
+    parser.add_argument('--db', default=DEFAULT_INDEX_PATH, help=f'Index database (default: {DEFAULT_INDEX_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Index existing <client>-metadata.json files')
+    import_parser.add_argument('--dir', default='src/config/clients', help='Directory of metadata files')
+
+    query_parser = commands.add_parser('query', help='List generations')
+    add_filters(query_parser)
+    query_parser.add_argument('--stages', action='store_true', help='Also list per-stage model, time and tokens')
+
+    export_parser = commands.add_parser('export', help='Export generations as JSON, NDJSON or CSV')
+    add_filters(export_parser)
+    export_parser.add_argument('--format', default='json', choices=['json', 'ndjson', 'csv'])
+    export_parser.add_argument('--output', default='', help='Output file (default: stdout)')
+
+    stale_parser = commands.add_parser('stale-css', help='Clients whose theme bundle needs a rebuild')
+    stale_parser.add_argument('--themes-dir', default='src/styles/themes', help='Theme bundle directory')
+
+    args = parser.parse_args()
+    index = GenerationIndex(args.db)
+    try:
+        if args.command == 'import':
+            imported, skipped = index.import_metadata_files(args.dir)
+            print(f"Imported {imported} generation(s), skipped {skipped} (already indexed or unreadable)")
+
+        elif args.command == 'query':
+            rows = index.query(args.client, args.industry, args.model, args.latest, args.limit)
+            print_table(rows, ('client_name', 'industry', 'generated_at', 'model', 'primary_color',
+                               'total_ms', 'output_tokens', 'source'))
+            if args.stages:
+                for row in rows:
+                    print(f"\n{row['client_name']} @ {row['generated_at']}")
+                    print_table(index.stages(row['id']), ('stage', 'model', 'duration_ms', 'input_tokens', 'output_tokens'))
+
+        elif args.command == 'export':
+            rows = index.query(args.client, args.industry, args.model, args.latest, args.limit)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                    export_rows(rows, f, args.format)
+                print(f"Exported {len(rows)} generation(s) to: {args.output}")
+            else:
+                export_rows(rows, sys.stdout, args.format)
+
+        elif args.command == 'stale-css':
+            rows = index.stale_css(args.themes_dir)
+            if rows:
+                print_table(rows, ('client_name', 'generated_at', 'reason'))
+            else:
+                print('All indexed theme bundles are up to date')
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
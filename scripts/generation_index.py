@@ -0,0 +1,248 @@
+"""
+Generation Index
+Keeps every client generation in one SQLite database with a row per generation
+(client, industry, colors, model, timings, tokens, input hash) and a row per stage,
+so questions like "which clients use industry X" or "which were generated with
+model Y" don't require parsing every <client>-metadata.json file.
+"""
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, List, Any, Optional, Tuple
+
+DEFAULT_INDEX_PATH = '.cache/generations.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    business_name TEXT,
+    industry TEXT COLLATE NOCASE,
+    generated_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model TEXT,
+    primary_color TEXT,
+    secondary_color TEXT,
+    accent_color TEXT,
+    input_hash TEXT,
+    css_hash TEXT,
+    total_ms REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    metadata_path TEXT,
+    metadata TEXT NOT NULL,
+    UNIQUE (client_name, generated_at)
+);
+CREATE INDEX IF NOT EXISTS generations_client ON generations (client_name, generated_at);
+CREATE INDEX IF NOT EXISTS generations_industry ON generations (industry);
+CREATE INDEX IF NOT EXISTS generations_model ON generations (model);
+CREATE INDEX IF NOT EXISTS generations_input_hash ON generations (input_hash);
+
+CREATE TABLE IF NOT EXISTS generation_stages (
+    generation_id INTEGER NOT NULL REFERENCES generations (id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    model TEXT,
+    duration_ms REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    PRIMARY KEY (generation_id, stage)
+);
+CREATE INDEX IF NOT EXISTS generation_stages_model ON generation_stages (model);
+"""
+
+# Columns returned by query() and written by export
+COLUMNS = (
+    'id', 'client_name', 'business_name', 'industry', 'generated_at', 'source', 'model',
+    'primary_color', 'secondary_color', 'accent_color', 'input_hash', 'css_hash',
+    'total_ms', 'input_tokens', 'output_tokens', 'metadata_path'
+)
+
+
+def decode_logo_colors(value: Any) -> Dict[str, Any]:
+    """logo_colors is stored as a JSON string inside the metadata JSON; return it as a dict"""
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            decoded = json.loads(value)
+        except json.JSONDecodeError:
+            return {}
+        return decoded if isinstance(decoded, dict) else {}
+    return {}
+
+
+def input_hash(business_data: Dict[str, Any]) -> str:
+    """Hash of the generation inputs, with logo_colors decoded so formatting doesn't matter"""
+    normalized = dict(business_data, logo_colors=decode_logo_colors(business_data.get('logo_colors')))
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def css_hash(css: str) -> str:
+    """Same hash the theme manifest records for a bundle"""
+    return hashlib.sha256((css.strip() + '\n').encode('utf-8')).hexdigest()[:16]
+
+
+def _theme_colors(metadata: Dict[str, Any]) -> Dict[str, str]:
+    if metadata.get('theme_colors'):
+        return metadata['theme_colors']
+    # Metadata written before theme colors were recorded: use the logo palette
+    palette = decode_logo_colors(metadata.get('business_data', {}).get('logo_colors')).get('palette', {})
+    return {slot: palette.get(slot) for slot in ('primary', 'secondary', 'accent')}
+
+
+class GenerationIndex:
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA foreign_keys = ON')
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def record(self, metadata: Dict[str, Any], css: Optional[str] = None,
+               metadata_path: Optional[str] = None, source: str = 'generate') -> Optional[int]:
+        """Index one generation's metadata; returns its row id, or None if it was already indexed"""
+        business_data = metadata.get('business_data', {})
+        colors = _theme_colors(metadata)
+        usage = metadata.get('token_usage', {})
+        timings = metadata.get('timings_ms', {})
+
+        with self._db:
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO generations (client_name, business_name, industry, generated_at, source, model, '
+                'primary_color, secondary_color, accent_color, input_hash, css_hash, total_ms, input_tokens, '
+                'output_tokens, metadata_path, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    metadata['client_name'],
+                    metadata.get('business_name'),
+                    metadata.get('industry'),
+                    metadata['generated_at'],
+                    source,
+                    metadata.get('ai_model'),
+                    colors.get('primary'),
+                    colors.get('secondary'),
+                    colors.get('accent'),
+                    metadata.get('input_hash') or (input_hash(business_data) if business_data else None),
+                    css_hash(css) if css is not None else None,
+                    timings.get('total'),
+                    sum(stage.get('input_tokens', 0) for stage in usage.values()) if usage else None,
+                    sum(stage.get('output_tokens', 0) for stage in usage.values()) if usage else None,
+                    metadata_path,
+                    json.dumps(metadata),
+                )
+            )
+            if not cursor.rowcount:
+                return None
+            generation_id = cursor.lastrowid
+
+            stage_models = metadata.get('stage_models', {})
+            stages = [stage for stage in timings if stage != 'total']
+            stages += [stage for stage in usage if stage not in timings]
+            self._db.executemany(
+                'INSERT INTO generation_stages (generation_id, stage, model, duration_ms, input_tokens, output_tokens) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        generation_id,
+                        stage,
+                        stage_models.get(stage),
+                        timings.get(stage),
+                        usage.get(stage, {}).get('input_tokens'),
+                        usage.get(stage, {}).get('output_tokens'),
+                    )
+                    for stage in stages
+                ]
+            )
+        return generation_id
+
+    def import_metadata_files(self, directory: str = 'src/config/clients') -> Tuple[int, int]:
+        """One-time import of existing <client>-metadata.json files; returns (imported, skipped)"""
+        imported = skipped = 0
+        for path in sorted(glob.glob(os.path.join(directory, '*-metadata.json'))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                generation_id = self.record(metadata, metadata_path=path, source='import')
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                print(f"Warning: Could not import {path}: {e}")
+                skipped += 1
+                continue
+            if generation_id is None:
+                skipped += 1
+            else:
+                imported += 1
+        return imported, skipped
+
+    def query(self, client: str = '', industry: str = '', model: str = '',
+              latest: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Generations matching every given filter, newest first. `model` matches the
+        run's default model or any stage model; `latest` keeps one row per client"""
+        where, params = [], []
+        if client:
+            where.append('g.client_name = ?')
+            params.append(client)
+        if industry:
+            where.append('g.industry = ?')
+            params.append(industry)
+        if model:
+            where.append('(g.model = ? OR EXISTS (SELECT 1 FROM generation_stages s '
+                         'WHERE s.generation_id = g.id AND s.model = ?))')
+            params += [model, model]
+        if latest:
+            where.append('g.generated_at = (SELECT MAX(generated_at) FROM generations WHERE client_name = g.client_name)')
+
+        sql = f"SELECT {', '.join(f'g.{column}' for column in COLUMNS)} FROM generations g"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY g.generated_at DESC, g.id DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self._db.execute(sql, params)]
+
+    def stages(self, generation_id: int) -> List[Dict[str, Any]]:
+        rows = self._db.execute(
+            'SELECT stage, model, duration_ms, input_tokens, output_tokens FROM generation_stages '
+            'WHERE generation_id = ? ORDER BY rowid', (generation_id,)
+        )
+        return [dict(row) for row in rows]
+
+    def stale_css(self, themes_dir: str = 'src/styles/themes') -> List[Dict[str, Any]]:
+        """Latest generation per client whose theme bundle is missing or differs from the indexed CSS"""
+        stale = []
+        for row in self.query(latest=True):
+            theme_path = os.path.join(themes_dir, f"{row['client_name']}.css")
+            try:
+                with open(theme_path, 'r', encoding='utf-8') as f:
+                    on_disk = css_hash(f.read())
+            except OSError:
+                stale.append(dict(row, reason='missing theme bundle'))
+                continue
+            if row['css_hash'] is None:
+                stale.append(dict(row, reason='no indexed CSS (imported generation)'))
+            elif row['css_hash'] != on_disk:
+                stale.append(dict(row, reason='theme bundle differs from generated CSS'))
+        return stale
+
+
+def export_rows(rows: List[Dict[str, Any]], out, fmt: str = 'json') -> None:
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else list(COLUMNS), extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    elif fmt == 'ndjson':
+        for row in rows:
+            out.write(json.dumps(row) + '\n')
+    else:
+        json.dump(rows, out, indent=2)
+        out.write('\n')
@@ -0,0 +1,81 @@
+#!/usr/bin/env node
+
+/**
+ * Image Job Utilities
+ * Bounded worker pool and content-hash manifests shared by process-logo.js and
+ * optimize-images.js, so image variants are generated concurrently and unchanged
+ * source images are not processed again.
+ */
+
+import { createHash } from 'crypto';
+import fs from 'fs/promises';
+import os from 'os';
+import path from 'path';
+import { performance } from 'perf_hooks';
+
+// sharp already spreads each operation over libuv threads; a few jobs at once keep them busy
+export const DEFAULT_IMAGE_CONCURRENCY = Math.max(1, Math.min(4, os.cpus().length));
+
+/**
+ * Run jobs ({ name, run }) with at most `concurrency` in flight.
+ * Resolves to [{ name, ms, value }] in job order; rejects with the first failure.
+ */
+export async function runPool(jobs, concurrency = DEFAULT_IMAGE_CONCURRENCY) {
+  const results = new Array(jobs.length);
+  let next = 0;
+
+  async function worker() {
+    while (next < jobs.length) {
+      const index = next++;
+      const job = jobs[index];
+      const start = performance.now();
+      const value = await job.run();
+      results[index] = { name: job.name, ms: Math.round((performance.now() - start) * 10) / 10, value };
+    }
+  }
+
+  const workers = Array.from({ length: Math.max(1, Math.min(concurrency, jobs.length)) }, worker);
+  await Promise.all(workers);
+  return results;
+}
+
+// SHA-256 of a file's content (first 16 hex chars, like the theme manifest hashes)
+export async function hashFile(filePath) {
+  const content = await fs.readFile(filePath);
+  return createHash('sha256').update(content).digest('hex').slice(0, 16);
+}
+
+export async function readManifest(manifestPath) {
+  try {
+    return JSON.parse(await fs.readFile(manifestPath, 'utf-8'));
+  } catch (error) {
+    if (error.code !== 'ENOENT') {
+      console.warn(`Warning: Could not read ${manifestPath}, reprocessing: ${error.message}`);
+    }
+    return null;
+  }
+}
+
+// Write through a temp file and rename, so an interrupted run never leaves a partial manifest
+export async function writeManifest(manifestPath, manifest) {
+  await fs.mkdir(path.dirname(manifestPath), { recursive: true });
+  const tempPath = `${manifestPath}.tmp`;
+  await fs.writeFile(tempPath, JSON.stringify(manifest, null, 2) + '\n');
+  await fs.rename(tempPath, manifestPath);
+}
+
+/**
+ * Whether a manifest was written for this exact source and pipeline version
+ * and every file it lists is still on disk
+ */
+export async function isManifestCurrent(manifest, sourceHash, version, files) {
+  if (!manifest || manifest.sourceHash !== sourceHash || manifest.version !== version) {
+    return false;
+  }
+  try {
+    await Promise.all(files.map(file => fs.access(file)));
+    return true;
+  } catch {
+    return false;
+  }
+}
@@ -0,0 +1,235 @@
+"""
+Logo Color Extraction
+Python port of the color extraction in process-logo.js: downsamples the logo,
+quantizes it with median cut refined by k-means, and classifies the clusters into
+Vibrant-style swatches. Results are cached by the image's content hash.
+"""
+
+import colorsys
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from PIL import Image
+
+from theme_accessibility import relative_luminance
+
+# Bump when the algorithm changes so stale cache entries are ignored
+EXTRACTOR_VERSION = 1
+
+DEFAULT_CACHE_DIR = '.cache/logo-colors'
+
+_SAMPLE_SIZE = 64        # logos are downsampled to at most 64x64 before quantizing
+_MAX_CLUSTERS = 32
+_KMEANS_ITERATIONS = 6
+_MIN_ALPHA = 125
+
+NEUTRAL_FALLBACK = '#6b7280'
+
+# Swatch targets and weights, matching node-vibrant's defaults
+_TARGETS = {
+    'vibrant':      {'luma': (0.3, 0.5, 0.7),  'sat': (0.35, 1.0, 1.0)},
+    'lightVibrant': {'luma': (0.55, 0.74, 1.0), 'sat': (0.35, 1.0, 1.0)},
+    'darkVibrant':  {'luma': (0.0, 0.26, 0.45), 'sat': (0.35, 1.0, 1.0)},
+    'muted':        {'luma': (0.3, 0.5, 0.7),  'sat': (0.0, 0.3, 0.4)},
+    'lightMuted':   {'luma': (0.55, 0.74, 1.0), 'sat': (0.0, 0.3, 0.4)},
+    'darkMuted':    {'luma': (0.0, 0.26, 0.45), 'sat': (0.0, 0.3, 0.4)},
+}
+_SWATCH_ORDER = ['vibrant', 'darkVibrant', 'lightVibrant', 'muted', 'darkMuted', 'lightMuted']
+_WEIGHT_SATURATION = 3.0
+_WEIGHT_LUMA = 6.5
+_WEIGHT_POPULATION = 0.5
+
+
+def _load_pixels(image_path: str) -> np.ndarray:
+    """Downsample the logo and return opaque, non-white pixels as an (N, 3) float array"""
+    with Image.open(image_path) as image:
+        image = image.convert('RGBA')
+        image.thumbnail((_SAMPLE_SIZE, _SAMPLE_SIZE))
+        pixels = np.asarray(image, dtype=np.float64).reshape(-1, 4)
+
+    opaque = pixels[:, 3] >= _MIN_ALPHA
+    not_white = ~np.all(pixels[:, :3] > 250, axis=1)
+    return pixels[opaque & not_white, :3]
+
+
+def _median_cut(pixels: np.ndarray, max_boxes: int) -> List[np.ndarray]:
+    """Split the color space at the median of the widest channel until max_boxes boxes"""
+    boxes = [pixels]
+    while len(boxes) < max_boxes:
+        # Split the box with the largest (channel range x population)
+        spans = [np.ptp(box, axis=0).max() * len(box) if len(box) > 1 else -1 for box in boxes]
+        index = int(np.argmax(spans))
+        if spans[index] <= 0:
+            break
+        box = boxes.pop(index)
+        channel = int(np.argmax(np.ptp(box, axis=0)))
+        ordered = box[np.argsort(box[:, channel], kind='stable')]
+        middle = len(ordered) // 2
+        boxes.extend([ordered[:middle], ordered[middle:]])
+    return boxes
+
+
+def _kmeans(pixels: np.ndarray, centers: np.ndarray, iterations: int) -> tuple:
+    """Refine median-cut centers with a few vectorized k-means steps"""
+    for _ in range(iterations):
+        distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, pixels)
+        occupied = counts > 0
+        updated = centers.copy()
+        updated[occupied] = sums[occupied] / counts[occupied, None]
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    counts = np.bincount(distances.argmin(axis=1), minlength=len(centers))
+    return centers[counts > 0], counts[counts > 0]
+
+
+def _to_hex(rgb) -> str:
+    r, g, b = (int(round(min(max(c, 0), 255))) for c in rgb)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _hsl(centers: np.ndarray) -> tuple:
+    unit = centers / 255.0
+    max_val, min_val = unit.max(axis=1), unit.min(axis=1)
+    delta = max_val - min_val
+    lightness = (max_val + min_val) / 2
+    denominator = np.where(lightness > 0.5, 2 - max_val - min_val, max_val + min_val)
+    saturation = np.where(delta == 0, 0.0, delta / np.maximum(denominator, 1e-9))
+    return saturation, lightness
+
+
+def _classify(centers: np.ndarray, counts: np.ndarray) -> Dict[str, Optional[str]]:
+    """Assign each Vibrant swatch the best-scoring unused cluster"""
+    saturation, lightness = _hsl(centers)
+    population = counts / counts.max()
+    used = np.zeros(len(centers), dtype=bool)
+    swatches = {}
+
+    for name in _SWATCH_ORDER:
+        (min_luma, target_luma, max_luma), (min_sat, target_sat, max_sat) = _TARGETS[name]['luma'], _TARGETS[name]['sat']
+        eligible = (
+            ~used
+            & (lightness >= min_luma) & (lightness <= max_luma)
+            & (saturation >= min_sat) & (saturation <= max_sat)
+        )
+        if not eligible.any():
+            swatches[name] = None
+            continue
+        score = (
+            _WEIGHT_SATURATION * (1 - np.abs(saturation - target_sat))
+            + _WEIGHT_LUMA * (1 - np.abs(lightness - target_luma))
+            + _WEIGHT_POPULATION * population
+        ) / (_WEIGHT_SATURATION + _WEIGHT_LUMA + _WEIGHT_POPULATION)
+        best = int(np.argmax(np.where(eligible, score, -np.inf)))
+        used[best] = True
+        swatches[name] = _to_hex(centers[best])
+
+    return swatches
+
+
+def _fill_missing_swatches(swatches: Dict[str, Optional[str]]) -> None:
+    """Derive missing vibrant swatches from the ones found, like node-vibrant does"""
+    def with_lightness(hex_color: str, lightness: float) -> str:
+        h, _, s = colorsys.rgb_to_hls(*(int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5)))
+        return _to_hex([c * 255 for c in colorsys.hls_to_rgb(h, lightness, s)])
+
+    if not swatches['vibrant']:
+        source = swatches['darkVibrant'] or swatches['lightVibrant']
+        if source:
+            swatches['vibrant'] = with_lightness(source, _TARGETS['vibrant']['luma'][1])
+    if swatches['vibrant']:
+        if not swatches['darkVibrant']:
+            swatches['darkVibrant'] = with_lightness(swatches['vibrant'], _TARGETS['darkVibrant']['luma'][1])
+        if not swatches['lightVibrant']:
+            swatches['lightVibrant'] = with_lightness(swatches['vibrant'], _TARGETS['lightVibrant']['luma'][1])
+
+
+def _analyze_brightness(colors: List[str]) -> str:
+    if not colors:
+        return 'mixed'
+    brightness = [
+        (int(c[1:3], 16) * 299 + int(c[3:5], 16) * 587 + int(c[5:7], 16) * 114) / 1000 for c in colors
+    ]
+    average = sum(brightness) / len(brightness)
+    if average < 85:
+        return 'dark'
+    if average > 170:
+        return 'light'
+    return 'mixed'
+
+
+def _analyze_contrast(colors: List[str]) -> str:
+    if len(colors) < 2:
+        return 'medium'
+    luminances = [relative_luminance(c) for c in colors]
+    max_contrast = (max(luminances) + 0.05) / (min(luminances) + 0.05)
+    if max_contrast > 7:
+        return 'high'
+    if max_contrast > 4.5:
+        return 'medium'
+    return 'low'
+
+
+def extract_colors(image_path: str) -> Dict[str, Any]:
+    """Extract a palette with the same shape as process-logo.js extractColors()"""
+    pixels = _load_pixels(image_path)
+    if len(pixels) == 0:
+        raise ValueError('Logo has no opaque, non-white pixels')
+
+    boxes = _median_cut(pixels, _MAX_CLUSTERS)
+    centers, counts = _kmeans(pixels, np.array([box.mean(axis=0) for box in boxes]), _KMEANS_ITERATIONS)
+    swatches = _classify(centers, counts)
+    _fill_missing_swatches(swatches)
+
+    dominant_colors = [swatches[name] for name in _SWATCH_ORDER if swatches[name]]
+    found = list(dominant_colors)
+    while len(dominant_colors) < 3:
+        dominant_colors.append(NEUTRAL_FALLBACK)
+
+    return {
+        'dominantColors': dominant_colors[:5],
+        'palette': {
+            'primary': swatches['vibrant'] or dominant_colors[0],
+            'secondary': swatches['darkVibrant'] or dominant_colors[1],
+            'accent': swatches['lightVibrant'] or dominant_colors[2],
+            'neutral': swatches['muted'] or NEUTRAL_FALLBACK,
+        },
+        'brightness': _analyze_brightness(found),
+        'contrast': _analyze_contrast(found),
+        'raw': swatches,
+    }
+
+
+def extract_colors_cached(image_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+    """Extract colors, reusing a previous result for byte-identical images"""
+    with open(image_path, 'rb') as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+
+    cache_path = os.path.join(cache_dir, f'{content_hash}.json')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('extractorVersion') == EXTRACTOR_VERSION:
+            return cached['colors']
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
+
+    colors = extract_colors(image_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # A temp file per writer: clients extracting the same logo concurrently must not share one
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'extractorVersion': EXTRACTOR_VERSION, 'colors': colors}, f, indent=2)
+    os.replace(temp_path, cache_path)
+
+    return colors
@@ -0,0 +1,208 @@
+"""
+Memory Profile
+Takes tracemalloc snapshots around each generation stage and records peak RSS per
+client and per run, with the top allocation sites, so batch workers can be sized
+and memory growth in long-running processes shows up between runs.
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
+
+TOP_SITES = 10
+# One frame is enough to group by allocation line, and keeps snapshots cheap
+TRACEBACK_FRAMES = 1
+
+_IGNORED_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+def current_rss_kb() -> Optional[int]:
+    """Resident set size of this process right now (Linux only, None elsewhere)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Highest resident set size this process has reached"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _kb(size: int) -> float:
+    return round(size / 1024, 1)
+
+
+def _short_path(filename: str) -> str:
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        relative = filename
+    if not relative.startswith('..'):
+        return relative
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+    )
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, since: Optional[tracemalloc.Snapshot] = None,
+              limit: int = TOP_SITES) -> List[Dict[str, Any]]:
+    """Allocation lines holding the most memory (or that grew the most since `since`)"""
+    if since is None:
+        stats = snapshot.statistics('lineno')[:limit]
+        return [{'site': f'{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+                 'size_kb': _kb(stat.size), 'count': stat.count} for stat in stats]
+    stats = [stat for stat in snapshot.compare_to(since, 'lineno') if stat.size_diff > 0][:limit]
+    return [{'site': f'{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+             'size_kb': _kb(stat.size_diff), 'count': stat.count_diff} for stat in stats]
+
+
+class MemoryProfiler:
+    def __init__(self, enabled: bool = True, limit: int = TOP_SITES):
+        self.enabled = enabled
+        self.limit = limit
+        self.client: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._client_start: Dict[str, Any] = {}
+        # Shared by every client view
+        self._run: Dict[str, Any] = {'clients': [], 'active': {}, 'traced_peak': 0}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._start_rss_kb: Optional[int] = None
+        self._start_time = time.monotonic()
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._started_tracing = True
+        self._baseline = _snapshot()
+        self._start_rss_kb = current_rss_kb()
+        self._start_time = time.monotonic()
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def for_client(self, client: str) -> 'MemoryProfiler':
+        """A view of this profiler that keeps its own stage records for one client"""
+        view = copy.copy(self)
+        view.client = client
+        view.stages = {}
+        view._client_start = {'rss_kb': current_rss_kb()} if self.enabled else {}
+        return view
+
+    def _fold_peak(self) -> None:
+        # reset_peak() clears the process-wide peak, so keep the run's highest value here
+        self._run['traced_peak'] = max(self._run['traced_peak'], tracemalloc.get_traced_memory()[1])
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record traced memory, the stage's peak and its top allocation sites around the block.
+        Stages that overlap (e.g. concurrent clients) share one peak and are marked `overlapped`."""
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+        active = self._run['active']
+        record: Dict[str, Any] = {}
+        if active:
+            record['overlapped'] = True
+            for other in active.values():
+                other['overlapped'] = True
+        else:
+            self._fold_peak()
+            tracemalloc.reset_peak()
+        before = _snapshot()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        active[id(record)] = record
+        try:
+            yield
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            del active[id(record)]
+            traced_after, peak = tracemalloc.get_traced_memory()
+            self._fold_peak()
+            record.update({
+                'traced_kb': _kb(traced_after),
+                'allocated_kb': _kb(traced_after - traced_before),
+                'traced_peak_kb': _kb(peak),
+                'rss_kb': current_rss_kb(),
+                'top_sites': top_sites(_snapshot(), before, self.limit),
+            })
+            self.stages[name] = record
+
+    def client_report(self) -> Dict[str, Any]:
+        """This client's stage records and RSS, also added to the run report"""
+        if not self.enabled:
+            return {}
+        rss_kb = current_rss_kb()
+        start_rss_kb = self._client_start.get('rss_kb')
+        report = {
+            'rss_start_kb': start_rss_kb,
+            'rss_end_kb': rss_kb,
+            'rss_growth_kb': rss_kb - start_rss_kb if rss_kb is not None and start_rss_kb is not None else None,
+            # Process high-water mark when the client finished (shared with clients generated concurrently)
+            'peak_rss_kb': peak_rss_kb(),
+            'traced_peak_kb': max((stage['traced_peak_kb'] for stage in self.stages.values()), default=0.0),
+            'stages': self.stages,
+        }
+        self._run['clients'].append({
+            'client': self.client,
+            **{key: report[key] for key in ('rss_growth_kb', 'peak_rss_kb', 'traced_peak_kb')},
+        })
+        return report
+
+    def run_report(self) -> Dict[str, Any]:
+        """Peak RSS and traced memory for the whole run, with the sites still holding memory it allocated"""
+        snapshot = _snapshot() if tracemalloc.is_tracing() else None
+        if snapshot is not None:
+            self._fold_peak()
+        rss_kb = current_rss_kb()
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_s': round(time.monotonic() - self._start_time, 1),
+            'peak_rss_kb': peak_rss_kb(),
+            'rss_start_kb': self._start_rss_kb,
+            'rss_end_kb': rss_kb,
+            'traced_peak_kb': _kb(self._run['traced_peak']),
+            'traceback_frames': TRACEBACK_FRAMES,
+            'clients': self._run['clients'],
+            'top_sites_retained': top_sites(snapshot, self._baseline, self.limit)
+                                  if snapshot is not None and self._baseline is not None else [],
+            'top_sites_held': top_sites(snapshot, limit=self.limit) if snapshot is not None else [],
+        }
+
+    def save(self, path: str) -> Dict[str, Any]:
+        report = self.run_report()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
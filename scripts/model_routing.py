@@ -0,0 +1,116 @@
+"""
+Model Routing
+Per-stage model, temperature and max_tokens settings, an optional router that sends
+structural stages to a faster model, and per-model latency/token statistics kept
+across runs so the routing table can be tuned from data.
+"""
+
+import json
+import os
+from typing import Dict, List, Any, Optional
+
+from token_budget import percentile
+
+DEFAULT_MODEL = 'claude-3-5-sonnet-20241022'
+FAST_MODEL = 'claude-3-5-haiku-20241022'
+
+DEFAULT_STATS_PATH = '.cache/model-stats.json'
+
+# Structural stages produce scaffolding that is validated mechanically, so a faster
+# model is safe there (a failed validation falls back to the default model).
+# Creative stages write the copy visitors read and stay on the default model.
+STAGE_SETTINGS = {
+    'base_config':     {'temperature': 0.7, 'max_tokens': 4000, 'kind': 'structural'},
+    'config_skeleton': {'temperature': 0.3, 'max_tokens': 4000, 'kind': 'structural'},
+    'skeleton_fill':   {'temperature': 0.7, 'max_tokens': 1500, 'kind': 'structural'},
+    'content_repair':  {'temperature': 0.7, 'max_tokens': 1200, 'kind': 'structural'},
+    'custom_content':  {'temperature': 0.8, 'max_tokens': 4000, 'kind': 'creative'},
+    'variants':        {'temperature': 0.9, 'max_tokens': 2000, 'kind': 'creative'},
+}
+
+# Samples kept per model and stage
+MAX_SAMPLES = 200
+
+
+class ModelRouter:
+    def __init__(self, default_model: str = DEFAULT_MODEL, fast_model: str = FAST_MODEL,
+                 route: bool = False, overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                 stats_path: str = DEFAULT_STATS_PATH):
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.route = route
+        self.overrides = overrides or {}
+        unknown = set(self.overrides) - set(STAGE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown stage(s) in stage config: {', '.join(sorted(unknown))}")
+
+        self.stats_path = stats_path
+        self.history: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        try:
+            with open(stats_path, 'r', encoding='utf-8') as f:
+                self.history = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def settings_for(self, stage: str) -> Dict[str, Any]:
+        """model, temperature and max_tokens for a stage: stage config > router > defaults"""
+        defaults = STAGE_SETTINGS[stage]
+        model = self.fast_model if self.route and defaults['kind'] == 'structural' else self.default_model
+        settings = {'model': model, 'temperature': defaults['temperature'], 'max_tokens': defaults['max_tokens']}
+        settings.update(self.overrides.get(stage, {}))
+        return settings
+
+    def fallback_for(self, stage: str) -> Optional[Dict[str, Any]]:
+        """Settings to retry a stage with after its output failed validation, if any"""
+        settings = self.settings_for(stage)
+        if settings['model'] == self.default_model:
+            return None
+        return dict(settings, model=self.default_model)
+
+    def _entry(self, model: str, stage: str) -> Dict[str, Any]:
+        return self.history.setdefault(model, {}).setdefault(
+            stage, {'calls': 0, 'rejections': 0, 'latency_ms': [], 'output_tokens': [], 'input_tokens': []}
+        )
+
+    def record_call(self, model: str, stage: str, latency_ms: float, input_tokens: int, output_tokens: int) -> None:
+        entry = self._entry(model, stage)
+        entry['calls'] += 1
+        for key, value in (('latency_ms', round(latency_ms, 1)), ('input_tokens', input_tokens), ('output_tokens', output_tokens)):
+            entry[key].append(value)
+            del entry[key][:-MAX_SAMPLES]
+
+    def expected_latency_ms(self, model: str, stage: str) -> Optional[float]:
+        """Median recorded latency of one call, or None when nothing has been recorded"""
+        latency = self.history.get(model, {}).get(stage, {}).get('latency_ms')
+        return percentile(latency, 0.5) if latency else None
+
+    def record_rejection(self, model: str, stage: str) -> None:
+        """Count an output that failed validation"""
+        self._entry(model, stage)['rejections'] += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per model and stage: call count, rejection rate, latency percentiles and throughput"""
+        summary = {}
+        for model, stages in self.history.items():
+            for stage, entry in stages.items():
+                latency, output = entry['latency_ms'], entry['output_tokens']
+                stats = {'calls': entry['calls'], 'rejections': entry['rejections']}
+                if latency:
+                    stats.update({
+                        'latency_ms_p50': round(percentile(latency, 0.5), 1),
+                        'latency_ms_p95': round(percentile(latency, 0.95), 1),
+                        'output_tokens_mean': round(sum(output) / len(output)),
+                        'input_tokens_mean': round(sum(entry['input_tokens']) / len(entry['input_tokens'])),
+                        'output_tokens_per_s': round(sum(output) / max(sum(latency) / 1000, 1e-9), 1),
+                    })
+                summary.setdefault(model, {})[stage] = stats
+        return summary
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.stats_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.stats_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.history, f)
+        os.replace(temp_path, self.stats_path)
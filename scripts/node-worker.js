@@ -0,0 +1,80 @@
+#!/usr/bin/env node
+
+/**
+ * Node Worker
+ * Long-lived helper for scripts/onboard-client.py: runs the Node side of the
+ * onboarding pipeline (logo processing, client page creation) without paying
+ * interpreter startup per step.
+ *
+ * Protocol: one JSON request per line on stdin, {"id", "method", "params"};
+ * one JSON response per line on stdout, {"id", "result"} or {"id", "error"}.
+ * Requests run concurrently and responses may arrive out of order. When stdin
+ * closes, requests already running finish before the worker exits.
+ * Log output from the scripts is sent to stderr so stdout carries only responses.
+ */
+
+import readline from 'readline';
+import { LogoProcessor } from './process-logo.js';
+import { createClientPage } from './create-client-page.js';
+
+// stdout is reserved for responses
+console.log = console.error;
+console.info = console.error;
+console.warn = console.error;
+
+const methods = {
+  ping: async () => ({ pong: true, pid: process.pid }),
+
+  processLogo: async ({ logoUrl, clientName, outputDir = 'public/images', tempDir = 'temp' }) => {
+    const processor = new LogoProcessor({ outputDir, tempDir });
+    const result = await processor.processLogo(logoUrl, clientName);
+    if (!result.success) {
+      throw new Error(`Logo processing failed: ${result.error}`);
+    }
+    return result;
+  },
+
+  createClientPage: async ({ clientName }) => createClientPage(clientName)
+};
+
+function respond(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function handle(line) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (error) {
+    respond({ id: null, error: `Invalid request: ${error.message}` });
+    return;
+  }
+
+  const method = methods[request.method];
+  if (!method) {
+    respond({ id: request.id, error: `Unknown method: ${request.method}` });
+    return;
+  }
+
+  try {
+    respond({ id: request.id, result: await method(request.params || {}) });
+  } catch (error) {
+    respond({ id: request.id, error: error.message });
+  }
+}
+
+// Requests still running; the worker only exits once they have settled
+const pending = new Set();
+
+const input = readline.createInterface({ input: process.stdin });
+input.on('line', (line) => {
+  if (line.trim()) {
+    const job = handle(line);
+    pending.add(job);
+    job.finally(() => pending.delete(job));
+  }
+});
+input.on('close', async () => {
+  await Promise.allSettled([...pending]);
+  process.exit(0);
+});
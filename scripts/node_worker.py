@@ -0,0 +1,99 @@
+"""
+Node Worker Client
+Runs scripts/node-worker.js as one long-lived subprocess and calls its methods
+(logo processing, client page creation) over NDJSON on stdin/stdout.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+from typing import Dict, Any, Optional
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'node-worker.js')
+
+# Responses can carry a full logo-processing result; raise asyncio's 64KB line limit
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class NodeWorkerError(RuntimeError):
+    pass
+
+
+class NodeWorker:
+    def __init__(self, script: str = WORKER_SCRIPT, node: str = 'node'):
+        self.script = script
+        self.node = node
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        # stderr is inherited so the scripts' progress output shows up in the job log
+        self._process = await asyncio.create_subprocess_exec(
+            self.node, self.script,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=sys.stderr,
+            limit=_STREAM_LIMIT
+        )
+        self._reader = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self) -> None:
+        while True:
+            line = await self._process.stdout.readline()
+            if not line:
+                break
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Warning: Unexpected output from Node worker: {line[:200]!r}")
+                continue
+            future = self._pending.pop(response.get('id'), None)
+            if future and not future.done():
+                if 'error' in response:
+                    future.set_exception(NodeWorkerError(response['error']))
+                else:
+                    future.set_result(response.get('result'))
+
+        # Worker exited: fail everything still waiting
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(NodeWorkerError('Node worker exited'))
+        self._pending.clear()
+
+    async def call(self, method: str, **params) -> Any:
+        """Call a worker method and wait for its result (raises NodeWorkerError)"""
+        if self._process is None:
+            await self.start()
+        if self._process.returncode is not None:
+            raise NodeWorkerError('Node worker is not running')
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._process.stdin.write((json.dumps({'id': request_id, 'method': method, 'params': params}) + '\n').encode('utf-8'))
+        await self._process.stdin.drain()
+        return await future
+
+    async def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.returncode is None:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        if self._reader:
+            await self._reader
+
+    async def __aenter__(self) -> 'NodeWorker':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""
+Client Onboarding Runner
+Runs the whole client pipeline in one process: logo processing, AI theme and
+content generation, and client page creation. Node work (sharp, node-vibrant,
+page templates) goes to one persistent worker process, and results stay in memory
+between stages instead of passing through temp files and CLI arguments.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, Any
+
+from node_worker import NodeWorker
+from status_events import StatusReporter
+
+# generate-theme.py is a script (hyphenated name), so load it by path
+_spec = importlib.util.spec_from_file_location(
+    'generate_theme', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate-theme.py')
+)
+generate_theme = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(generate_theme)
+
+
+async def process_logo(worker: NodeWorker, args, business_data: Dict[str, Any], status: StatusReporter) -> str:
+    """Process the logo in the Node worker and return its colors JSON for the generator"""
+    client_name = business_data['client_name']
+    if not args.logo_url:
+        print("No logo URL provided, generating business-based theme colors")
+        status.emit('logo_skipped', 'logo', 'Logo-less generation - using business-based colors')
+        return json.dumps({'businessBased': True})
+
+    print(f"Processing logo from URL: {args.logo_url}")
+    result = await worker.call('processLogo', logoUrl=args.logo_url, clientName=client_name)
+    business_data['logo_path'] = os.path.join(result['outputPath'], 'logo.png')
+    status.emit('logo_processed', 'logo', 'Logo downloaded and optimized')
+    return json.dumps(result['colors'])
+
+
+async def onboard(args, api_key: str) -> None:
+    business_data = generate_theme.build_business_data(vars(args))
+    client_name = business_data['client_name']
+    tracer = generate_theme.Tracer(enabled=bool(args.trace))
+    memory = generate_theme.MemoryProfiler(enabled=bool(args.memprofile))
+    memory.start()
+    # Status events are posted in the background, so a slow receiver never holds up onboarding
+    status = StatusReporter(args.webhook_url, batch=args.webhook_batch)
+    status.start()
+    generator = generate_theme.create_generator(args, api_key, tracer, memory, status).for_client(client_name)
+
+    print(f"Onboarding client: {args.business_name} ({client_name})")
+
+    async with NodeWorker() as worker:
+        try:
+            # Custom content starts immediately; the color-dependent stages wait for the logo
+            logo_task = asyncio.create_task(process_logo(worker, args, business_data, generator.status))
+            try:
+                result = await generate_theme.generate_client(generator, business_data, logo_colors=logo_task)
+            except BaseException:
+                logo_task.cancel()
+                raise
+            generate_theme.write_client_files(generator, result)
+            generator.status.emit('content_generated', None, 'AI content and theme generated')
+
+            # The page imports the client config, so it is only created once the config is written
+            # (cancelling a worker call doesn't stop the worker, so starting it earlier could leave
+            # a page behind after a failed generation). With --dynamic-page the [client] route
+            # renders the client and no page files are written.
+            if not args.dynamic_page:
+                with generator.tracer.span('create_client_page'):
+                    page = await generator.within_deadline(
+                        worker.call('createClientPage', clientName=client_name), 'client page creation'
+                    )
+                print(f"✅ Client page created in: {page['pageDir']}")
+            else:
+                print(f"✅ Client page served by the dynamic route: /clients/{client_name}/")
+        finally:
+            if args.trace:
+                try:
+                    tracer.save(args.trace)
+                    print(f"Trace written to: {args.trace}")
+                except OSError as e:
+                    print(f"Warning: Could not write trace: {e}")
+            if args.memprofile:
+                generate_theme.save_memory_profile(memory, args.memprofile)
+            await generate_theme.close_status_reporter(status)
+
+    generate_theme.save_run_history(generator)
+
+
+async def main():
+    parser = generate_theme.build_arg_parser('Onboard a client: process logo, generate theme and content, create pages')
+    parser.add_argument('--logo-url', default='', help='URL of the client logo (business-based colors when omitted)')
+    # Someone is waiting on an onboarding, so its API calls go ahead of bulk re-themes
+    parser.set_defaults(priority='interactive')
+    args = parser.parse_args()
+
+    missing = [f'--{field.replace("_", "-")}' for field in generate_theme.REQUIRED_BUSINESS_FIELDS if not getattr(args, field)]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
+
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key and not args.replay_cassette:
+        print("Error: ANTHROPIC_API_KEY environment variable not set")
+        sys.exit(1)
+
+    try:
+        await onboard(args, api_key)
+        print("\n🎉 Client onboarding completed successfully!")
+    except Exception as e:
+        print(f"❌ Client onboarding failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -8,16 +8,30 @@
 
 import fs from 'fs/promises';
 import path from 'path';
+import { performance } from 'perf_hooks';
+import {
+  DEFAULT_IMAGE_CONCURRENCY,
+  hashFile,
+  isManifestCurrent,
+  readManifest,
+  runPool,
+  writeManifest
+} from './image-job-utils.js';
 
-// Simple argument parser
+// Bump when the generated images change, so existing manifests are invalidated
+const IMAGE_PIPELINE_VERSION = 1;
+
+// Simple argument parser (flags without a value are booleans)
 function parseArgs() {
   const args = process.argv.slice(2);
   const parsed = {};
   
-  for (let i = 0; i < args.length; i += 2) {
+  for (let i = 0; i < args.length; i++) {
     if (args[i].startsWith('--')) {
       const key = args[i].slice(2).replace(/-/g, '_');
-      parsed[key] = args[i + 1];
+      const value = args[i + 1] && !args[i + 1].startsWith('--') ? args[i + 1] : true;
+      parsed[key] = value;
+      if (value !== true) i++;
     }
   }
   
@@ -97,10 +111,8 @@ async function optimizeImage(inputPath, outputPath, options = {}) {
   };
 }
 
-// Generate responsive image variants
-async function generateResponsiveImages(inputPath, outputDir, basename) {
-  const variants = [];
-  
+// Jobs for the responsive image variants
+function responsiveImageJobs(inputPath, outputDir, basename) {
   const responsiveSizes = [
     { suffix: '-sm', width: null, height: 60 },
     { suffix: '-md', width: null, height: 80 },
@@ -108,21 +120,27 @@ async function generateResponsiveImages(inputPath, outputDir, basename) {
     { suffix: '-xl', width: null, height: 160 }
   ];
   
-  for (const size of responsiveSizes) {
-    const outputPath = path.join(outputDir, `${basename}${size.suffix}.png`);
-    const result = await optimizeImage(inputPath, outputPath, {
-      width: size.width,
-      height: size.height,
-      format: 'png'
-    });
-    variants.push(result);
-  }
-  
-  return variants;
+  return responsiveSizes.map(size => {
+    const name = `${basename}${size.suffix}.png`;
+    return {
+      name,
+      run: () => optimizeImage(inputPath, path.join(outputDir, name), {
+        width: size.width,
+        height: size.height,
+        format: 'png'
+      })
+    };
+  });
 }
 
-// Generate favicon formats
-async function generateFavicons(inputPath, outputDir) {
+// Generate responsive image variants
+async function generateResponsiveImages(inputPath, outputDir, basename, concurrency = DEFAULT_IMAGE_CONCURRENCY) {
+  const results = await runPool(responsiveImageJobs(inputPath, outputDir, basename), concurrency);
+  return results.map(result => ({ ...result.value, ms: result.ms }));
+}
+
+// Jobs for the favicon formats
+function faviconJobs(inputPath, outputDir) {
   const faviconFormats = [
     { name: 'favicon.ico', size: 32, format: 'ico' },
     { name: 'favicon.png', size: 32, format: 'png' },
@@ -133,19 +151,20 @@ async function generateFavicons(inputPath, outputDir) {
     { name: 'android-chrome-512x512.png', size: 512, format: 'png' }
   ];
   
-  const favicons = [];
-  
-  for (const favicon of faviconFormats) {
-    const outputPath = path.join(outputDir, favicon.name);
-    const result = await optimizeImage(inputPath, outputPath, {
+  return faviconFormats.map(favicon => ({
+    name: favicon.name,
+    run: () => optimizeImage(inputPath, path.join(outputDir, favicon.name), {
       width: favicon.size,
       height: favicon.size,
       format: favicon.format
-    });
-    favicons.push(result);
-  }
-  
-  return favicons;
+    })
+  }));
+}
+
+// Generate favicon formats
+async function generateFavicons(inputPath, outputDir, concurrency = DEFAULT_IMAGE_CONCURRENCY) {
+  const results = await runPool(faviconJobs(inputPath, outputDir), concurrency);
+  return results.map(result => ({ ...result.value, ms: result.ms }));
 }
 
 // Generate Open Graph image
@@ -213,78 +232,93 @@ async function extractDominantColors(imagePath) {
 }
 
 // Main optimization function
-async function optimizeClientImages(inputImagePath, clientName, businessName = '') {
+async function optimizeClientImages(inputImagePath, clientName, businessName = '', options = {}) {
+  const { concurrency = DEFAULT_IMAGE_CONCURRENCY, force = false } = options;
   console.log(`Starting image optimization for client: ${clientName}`);
   console.log(`Input image: ${inputImagePath}`);
   
+  const start = performance.now();
   const outputDir = `public/images/clients/${clientName}`;
   await fs.mkdir(outputDir, { recursive: true });
-  
-  const results = {
-    clientName,
-    businessName,
-    outputDir,
-    processedImages: [],
-    extractedColors: null,
-    metadata: {}
-  };
+  const manifestPath = path.join(outputDir, 'image-manifest.json');
+  const colorsPath = 'temp/extracted_colors.json';
   
   try {
+    // Same source image as last time and every output still there: reuse the previous results
+    const sourceHash = await hashFile(inputImagePath);
+    const previous = await readManifest(manifestPath);
+    const previousFiles = previous ? previous.processedImages.map(image => image.outputPath) : [];
+    if (!force && await isManifestCurrent(previous, sourceHash, IMAGE_PIPELINE_VERSION, previousFiles)
+        && previous.businessName === businessName) {
+      console.log(`✅ Source image unchanged (${sourceHash}), reusing ${previousFiles.length} images from ${manifestPath}`);
+      await fs.mkdir('temp', { recursive: true });
+      await fs.writeFile(colorsPath, JSON.stringify(previous.extractedColors, null, 2));
+      return { ...previous, cached: true };
+    }
+    
+    const results = {
+      version: IMAGE_PIPELINE_VERSION,
+      sourceHash,
+      clientName,
+      businessName,
+      outputDir,
+      processedImages: [],
+      extractedColors: null,
+      metadata: {},
+      timings_ms: {}
+    };
+    
     // Extract image metadata
     const metadata = await getImageMetadata(inputImagePath);
     results.metadata = metadata;
     console.log('Image metadata:', metadata);
     
-    // Extract dominant colors
-    const colors = await extractDominantColors(inputImagePath);
-    results.extractedColors = colors;
-    
-    // Generate main logo variants
-    console.log('Generating logo variants...');
-    const basename = 'logo';
-    const logoVariants = await generateResponsiveImages(inputImagePath, outputDir, basename);
-    results.processedImages.push(...logoVariants);
-    
-    // Generate favicons
-    console.log('Generating favicons...');
-    const favicons = await generateFavicons(inputImagePath, outputDir);
-    results.processedImages.push(...favicons);
-    
-    // Generate Open Graph image
+    // Every variant, favicon, OG and theme image only needs the source image,
+    // so they all go through one bounded pool while the colors are extracted
+    const jobs = [
+      ...responsiveImageJobs(inputImagePath, outputDir, 'logo'),
+      ...faviconJobs(inputImagePath, outputDir)
+    ];
     if (businessName) {
-      console.log('Generating Open Graph image...');
-      const ogImage = await generateOpenGraphImage(inputImagePath, outputDir, businessName);
-      results.processedImages.push(ogImage);
+      jobs.push({ name: 'og-image.jpg', run: () => generateOpenGraphImage(inputImagePath, outputDir, businessName) });
+    }
+    for (const name of ['logo-dark.png', 'logo-light.png']) {
+      jobs.push({
+        name,
+        run: () => optimizeImage(inputImagePath, path.join(outputDir, name), {
+          width: null,
+          height: 120,
+          format: 'png'
+        })
+      });
     }
     
-    // Generate dark/light variants (simulated)
-    console.log('Generating theme variants...');
-    const darkVariant = await optimizeImage(inputImagePath, path.join(outputDir, 'logo-dark.png'), {
-      width: null,
-      height: 120,
-      format: 'png'
-    });
-    const lightVariant = await optimizeImage(inputImagePath, path.join(outputDir, 'logo-light.png'), {
-      width: null,
-      height: 120,
-      format: 'png'
-    });
-    results.processedImages.push(darkVariant, lightVariant);
+    console.log(`Generating ${jobs.length} images (${concurrency} at a time)...`);
+    const colorsStart = performance.now();
+    const [colors, images] = await Promise.all([
+      extractDominantColors(inputImagePath).then((extracted) => {
+        results.timings_ms.colors = Math.round((performance.now() - colorsStart) * 10) / 10;
+        return extracted;
+      }),
+      runPool(jobs, concurrency)
+    ]);
+    results.extractedColors = colors;
+    results.processedImages = images.map(image => ({ name: image.name, ...image.value, ms: image.ms }));
+    results.timings_ms.images = Object.fromEntries(images.map(image => [image.name, image.ms]));
+    results.timings_ms.total = Math.round(performance.now() - start);
     
-    // Save processing results
-    const manifestPath = path.join(outputDir, 'image-manifest.json');
-    await fs.writeFile(manifestPath, JSON.stringify(results, null, 2));
+    // Save processing results (with the source hash, so an unchanged image is skipped next time)
+    await writeManifest(manifestPath, results);
     console.log(`Image manifest saved: ${manifestPath}`);
     
     // Save extracted colors for theme generation
-    const colorsPath = 'temp/extracted_colors.json';
     await fs.mkdir('temp', { recursive: true });
     await fs.writeFile(colorsPath, JSON.stringify(colors, null, 2));
     console.log(`Colors saved: ${colorsPath}`);
     
-    console.log(`✅ Image optimization completed! Generated ${results.processedImages.length} images.`);
+    console.log(`✅ Image optimization completed! Generated ${results.processedImages.length} images in ${results.timings_ms.total}ms.`);
     
-    return results;
+    return { ...results, cached: false };
     
   } catch (error) {
     console.error(`❌ Image optimization failed: ${error.message}`);
@@ -297,11 +331,16 @@ if (import.meta.url === `file://${process.argv[1]}`) {
   const args = parseArgs();
   
   if (!args.input_image || !args.client_name) {
-    console.error('Usage: node optimize-images.js --input-image <PATH> --client-name <NAME> [--business-name <NAME>]');
+    console.error('Usage: node optimize-images.js --input-image <PATH> --client-name <NAME> [--business-name <NAME>] [--concurrency <N>] [--force]');
     process.exit(1);
   }
   
-  optimizeClientImages(args.input_image, args.client_name, args.business_name)
+  const options = {
+    concurrency: args.concurrency ? parseInt(args.concurrency, 10) : DEFAULT_IMAGE_CONCURRENCY,
+    force: args.force === true
+  };
+  
+  optimizeClientImages(args.input_image, args.client_name, args.business_name || '', options)
     .then((result) => {
       console.log('Image optimization completed successfully');
       process.exit(0);
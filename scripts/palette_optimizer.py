@@ -0,0 +1,214 @@
+"""
+Palette Optimizer
+Searches primary/secondary/accent triples drawn from logo colors, industry palettes
+and computed harmonies, and returns the best-balanced palette within a time budget.
+"""
+
+import colorsys
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from theme_accessibility import SRGB_TO_LINEAR
+
+# Source weights: how much a candidate color is trusted to represent the brand
+SOURCE_WEIGHTS = {
+    'user': 1.2,
+    'logo-palette': 1.0,
+    'logo-dominant': 0.8,
+    'industry': 0.6,
+    'harmony': 0.4,
+}
+
+# Objective weights
+W_PRIMARY_CONTRAST = 1.5   # primary carries white button text (shades are fixed up later)
+W_PRIMARY_FIDELITY = 2.0
+W_FIDELITY = 1.0           # per secondary/accent
+W_LIGHTNESS_SPLIT = 1.5    # primary vs secondary lightness separation
+W_HUE_HARMONY = 2.0        # primary vs accent complementary/triadic
+W_ACCENT_VIBRANCY = 1.5
+W_SECONDARY_NEUTRAL = 0.5  # secondary is used for body text and borders
+
+# Best case of every term that depends on secondary/accent, used to prune primaries
+_PAIR_UPPER_BOUND = (
+    2 * W_FIDELITY * max(SOURCE_WEIGHTS.values())
+    + W_LIGHTNESS_SPLIT + W_HUE_HARMONY + W_ACCENT_VIBRANCY + W_SECONDARY_NEUTRAL
+)
+
+# Colors closer than this (RGB euclidean) count as the same color
+_MIN_COLOR_DISTANCE = 24.0
+
+DEFAULT_BUDGET_MS = 25.0
+
+# theme_accessibility's table as an array, so whole candidate sets are linearized at once
+_SRGB_TO_LINEAR = np.array(SRGB_TO_LINEAR)
+
+
+def _hex_to_rgb_array(colors: List[str]) -> np.ndarray:
+    return np.array([[int(c[i:i + 2], 16) for i in (1, 3, 5)] for c in colors], dtype=np.int64)
+
+
+def _rgb_to_hsl(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized RGB (0-255) -> HSL (degrees, percent, percent)"""
+    unit = rgb / 255.0
+    r, g, b = unit[:, 0], unit[:, 1], unit[:, 2]
+    max_val = unit.max(axis=1)
+    min_val = unit.min(axis=1)
+    delta = max_val - min_val
+    lightness = (max_val + min_val) / 2
+
+    safe_delta = np.where(delta == 0, 1, delta)
+    saturation = np.where(
+        delta == 0, 0,
+        np.where(lightness > 0.5, delta / np.maximum(2 - max_val - min_val, 1e-9), delta / np.maximum(max_val + min_val, 1e-9))
+    )
+    hue = np.select(
+        [delta == 0, max_val == r, max_val == g],
+        [0, ((g - b) / safe_delta) % 6, (b - r) / safe_delta + 2],
+        (r - g) / safe_delta + 4
+    ) * 60
+    return hue % 360, saturation * 100, lightness * 100
+
+
+def _hsl_to_hex(h: float, s: float, l: float) -> str:
+    r, g, b = colorsys.hls_to_rgb((h % 360) / 360, l / 100, s / 100)
+    return f"#{round(r * 255):02x}{round(g * 255):02x}{round(b * 255):02x}"
+
+
+def harmony_candidates(colors: List[str]) -> List[str]:
+    """Complementary and triadic partners for each base color"""
+    if not colors:
+        return []
+    hue, sat, light = _rgb_to_hsl(_hex_to_rgb_array(colors))
+    partners = []
+    for h, s, l in zip(hue, sat, light):
+        for offset in (180, 120, 240):
+            partners.append(_hsl_to_hex(h + offset, s, l))
+    return partners
+
+
+class _CandidatePool:
+    """Per-candidate features computed once, in arrays, for the whole search"""
+
+    def __init__(self, candidates: List[Tuple[str, str]]):
+        seen = {}
+        for color, source in candidates:
+            color = color.lower()
+            # Keep the most trusted source when a color appears more than once
+            if color not in seen or SOURCE_WEIGHTS[source] > SOURCE_WEIGHTS[seen[color]]:
+                seen[color] = source
+
+        self.colors = list(seen)
+        self.sources = [seen[c] for c in self.colors]
+        rgb = _hex_to_rgb_array(self.colors)
+        self.hue, self.sat, self.light = _rgb_to_hsl(rgb)
+        linear = _SRGB_TO_LINEAR[rgb]
+        self.luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+        self.weight = np.array([SOURCE_WEIGHTS[s] for s in self.sources])
+
+        # Pairwise "same color" mask
+        diff = rgb[:, None, :] - rgb[None, :, :]
+        self.same = np.sqrt((diff ** 2).sum(axis=2)) < _MIN_COLOR_DISTANCE
+
+    def indices(self, allowed: Optional[str]) -> np.ndarray:
+        if allowed:
+            return np.array([self.colors.index(allowed.lower())])
+        return np.arange(len(self.colors))
+
+
+def _primary_scores(pool: _CandidatePool, idx: np.ndarray) -> np.ndarray:
+    contrast = 1.05 / (pool.luminance[idx] + 0.05)  # against white
+    return (
+        W_PRIMARY_CONTRAST * np.minimum(contrast / 3.0, 1.0)
+        + W_PRIMARY_FIDELITY * pool.weight[idx]
+    )
+
+
+def _pair_scores(pool: _CandidatePool, p: int, sec: np.ndarray, acc: np.ndarray) -> np.ndarray:
+    """Score every (secondary, accent) combination for one primary as a matrix"""
+    lightness_split = np.minimum(np.abs(pool.light[p] - pool.light[sec]) / 15.0, 1.0)
+    neutral = 1.0 - pool.sat[sec] / 100.0
+
+    hue_gap = np.abs(pool.hue[p] - pool.hue[acc])
+    hue_gap = np.minimum(hue_gap, 360 - hue_gap)
+    harmony = np.maximum(np.exp(-((hue_gap - 180) / 30) ** 2), np.exp(-((hue_gap - 120) / 25) ** 2))
+    vibrancy = (pool.sat[acc] / 100.0) * (1 - np.abs(pool.light[acc] - 55) / 55)
+
+    secondary_terms = (
+        W_FIDELITY * pool.weight[sec] + W_LIGHTNESS_SPLIT * lightness_split + W_SECONDARY_NEUTRAL * neutral
+    )
+    accent_terms = W_FIDELITY * pool.weight[acc] + W_HUE_HARMONY * harmony + W_ACCENT_VIBRANCY * vibrancy
+    scores = secondary_terms[:, None] + accent_terms[None, :]
+
+    # Three distinct colors: no slot may repeat (or nearly repeat) another
+    invalid = pool.same[sec][:, acc] | pool.same[p, sec][:, None] | pool.same[p, acc][None, :]
+    return np.where(invalid, -np.inf, scores)
+
+
+def optimize_palette(candidates: List[Tuple[str, str]],
+                     fixed: Optional[Dict[str, str]] = None,
+                     budget_ms: float = DEFAULT_BUDGET_MS) -> Optional[Dict[str, Any]]:
+    """Find the best primary/secondary/accent triple among (color, source) candidates.
+
+    Slots in `fixed` (user-specified colors) are kept as given. Primaries are visited
+    best-first and the search stops once no remaining primary can beat the current
+    best, or when the time budget runs out.
+    """
+    fixed = {slot: color for slot, color in (fixed or {}).items() if color}
+    pool = _CandidatePool(candidates + [(color, 'user') for color in fixed.values()])
+    if len(pool.colors) < 3:
+        return None
+
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000.0
+
+    primaries = pool.indices(fixed.get('primary'))
+    secondaries = pool.indices(fixed.get('secondary'))
+    accents = pool.indices(fixed.get('accent'))
+
+    primary_scores = _primary_scores(pool, primaries)
+    order = np.argsort(-primary_scores)
+
+    best_score, best = -np.inf, None
+    evaluated = pruned = 0
+    timed_out = False
+
+    for rank, position in enumerate(order):
+        p = primaries[position]
+        if primary_scores[position] + _PAIR_UPPER_BOUND <= best_score:
+            pruned = len(order) - rank
+            break
+        if time.perf_counter() > deadline:
+            timed_out = True
+            break
+
+        scores = _pair_scores(pool, p, secondaries, accents)
+        evaluated += scores.size
+        flat = int(np.argmax(scores))
+        candidate_score = primary_scores[position] + scores.flat[flat]
+        if candidate_score > best_score:
+            s, a = np.unravel_index(flat, scores.shape)
+            best_score = candidate_score
+            best = (p, secondaries[s], accents[a])
+
+    if best is None or not np.isfinite(best_score):
+        return None
+
+    p, s, a = best
+    return {
+        'primary': pool.colors[p],
+        'secondary': pool.colors[s],
+        'accent': pool.colors[a],
+        'sources': {
+            'primary': pool.sources[p],
+            'secondary': pool.sources[s],
+            'accent': pool.sources[a],
+        },
+        'score': round(float(best_score), 3),
+        'candidates': len(pool.colors),
+        'evaluated': evaluated,
+        'pruned_primaries': pruned,
+        'timed_out': timed_out,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
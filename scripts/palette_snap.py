@@ -0,0 +1,298 @@
+"""
+Palette Snapping
+Snaps generated color shades to the perceptually nearest color of a fixed palette:
+the Tailwind palette used by tailwind.config.js, or a brand-approved palette file.
+Palettes are indexed once per process in a KD-tree over OKLab coordinates, and the
+33 shades of a theme are answered as one batch of nearest-neighbor queries.
+"""
+
+import heapq
+import json
+import os
+import re
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from theme_accessibility import (
+    CONTRAST_LEVELS, DARK_SHADES, LIGHT_SHADES, REPORTED_SHADES, SRGB_TO_LINEAR, TEXT_SHADE, WHITE,
+    contrast_ratio, relative_luminance
+)
+
+TAILWIND_CONFIG = 'tailwind.config.js'
+
+# Candidates considered per shade when the nearest color would break a contrast pairing
+SNAP_CANDIDATES = 8
+
+# Tailwind CSS v3 default palette (tailwindcss/colors), which tailwind.config.js extends
+TAILWIND_COLORS = {
+    'slate': ['#f8fafc', '#f1f5f9', '#e2e8f0', '#cbd5e1', '#94a3b8', '#64748b', '#475569', '#334155', '#1e293b', '#0f172a', '#020617'],
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827', '#030712'],
+    'zinc': ['#fafafa', '#f4f4f5', '#e4e4e7', '#d4d4d8', '#a1a1aa', '#71717a', '#52525b', '#3f3f46', '#27272a', '#18181b', '#09090b'],
+    'neutral': ['#fafafa', '#f5f5f5', '#e5e5e5', '#d4d4d4', '#a3a3a3', '#737373', '#525252', '#404040', '#262626', '#171717', '#0a0a0a'],
+    'stone': ['#fafaf9', '#f5f5f4', '#e7e5e4', '#d6d3d1', '#a8a29e', '#78716c', '#57534e', '#44403c', '#292524', '#1c1917', '#0c0a09'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'],
+    'orange': ['#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412', '#7c2d12', '#431407'],
+    'amber': ['#fffbeb', '#fef3c7', '#fde68a', '#fcd34d', '#fbbf24', '#f59e0b', '#d97706', '#b45309', '#92400e', '#78350f', '#451a03'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'],
+    'lime': ['#f7fee7', '#ecfccb', '#d9f99d', '#bef264', '#a3e635', '#84cc16', '#65a30d', '#4d7c0f', '#3f6212', '#365314', '#1a2e05'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'],
+    'emerald': ['#ecfdf5', '#d1fae5', '#a7f3d0', '#6ee7b7', '#34d399', '#10b981', '#059669', '#047857', '#065f46', '#064e3b', '#022c22'],
+    'teal': ['#f0fdfa', '#ccfbf1', '#99f6e4', '#5eead4', '#2dd4bf', '#14b8a6', '#0d9488', '#0f766e', '#115e59', '#134e4a', '#042f2e'],
+    'cyan': ['#ecfeff', '#cffafe', '#a5f3fc', '#67e8f9', '#22d3ee', '#06b6d4', '#0891b2', '#0e7490', '#155e75', '#164e63', '#083344'],
+    'sky': ['#f0f9ff', '#e0f2fe', '#bae6fd', '#7dd3fc', '#38bdf8', '#0ea5e9', '#0284c7', '#0369a1', '#075985', '#0c4a6e', '#082f49'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81', '#1e1b4b'],
+    'violet': ['#f5f3ff', '#ede9fe', '#ddd6fe', '#c4b5fd', '#a78bfa', '#8b5cf6', '#7c3aed', '#6d28d9', '#5b21b6', '#4c1d95', '#2e1065'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87', '#3b0764'],
+    'fuchsia': ['#fdf4ff', '#fae8ff', '#f5d0fe', '#f0abfc', '#e879f9', '#d946ef', '#c026d3', '#a21caf', '#86198f', '#701a75', '#4a044e'],
+    'pink': ['#fdf2f8', '#fce7f3', '#fbcfe8', '#f9a8d4', '#f472b6', '#ec4899', '#db2777', '#be185d', '#9d174d', '#831843', '#500724'],
+    'rose': ['#fff1f2', '#ffe4e6', '#fecdd3', '#fda4af', '#fb7185', '#f43f5e', '#e11d48', '#be123c', '#9f1239', '#881337', '#4c0519'],
+}
+TAILWIND_SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+
+_HEX = re.compile(r'#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b')
+
+def normalize_hex(color: str) -> Optional[str]:
+    match = _HEX.fullmatch(color.strip())
+    if not match:
+        return None
+    digits = match.group(1).lower()
+    if len(digits) == 3:
+        digits = ''.join(c * 2 for c in digits)
+    return f'#{digits}'
+
+
+def hex_to_oklab(hex_color: str) -> Tuple[float, float, float]:
+    """#RRGGBB -> OKLab (L, a, b); euclidean distance here tracks perceived difference"""
+    r = SRGB_TO_LINEAR[int(hex_color[1:3], 16)]
+    g = SRGB_TO_LINEAR[int(hex_color[3:5], 16)]
+    b = SRGB_TO_LINEAR[int(hex_color[5:7], 16)]
+    l = (0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b) ** (1 / 3)
+    m = (0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b) ** (1 / 3)
+    s = (0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b) ** (1 / 3)
+    return (
+        0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+        1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+        0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s,
+    )
+
+
+class PaletteIndex:
+    """KD-tree over a palette's OKLab coordinates.
+
+    The tree is implicit: points are reordered so every range [lo, hi) has its splitting
+    point at the middle, and only the split axis per position is stored.
+    """
+
+    def __init__(self, colors: List[Tuple[str, str]], name: str = 'palette'):
+        start = time.perf_counter()
+        unique = {}
+        for color_name, hex_color in colors:
+            normalized = normalize_hex(hex_color)
+            if normalized and normalized not in unique:
+                unique[normalized] = color_name
+        if not unique:
+            raise ValueError(f"Palette {name} has no valid colors")
+
+        self.name = name
+        entries = [(hex_to_oklab(hex_color), hex_color, color_name) for hex_color, color_name in unique.items()]
+        self._axes = [0] * len(entries)
+        self._build(entries, 0, len(entries))
+        self._coords = [entry[0] for entry in entries]
+        self._hex = [entry[1] for entry in entries]
+        self._names = [entry[2] for entry in entries]
+        self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def _build(self, entries: list, lo: int, hi: int) -> None:
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 1:
+                continue
+            # Split on the axis with the largest spread in this range
+            spreads = [
+                max(entry[0][axis] for entry in entries[lo:hi]) - min(entry[0][axis] for entry in entries[lo:hi])
+                for axis in range(3)
+            ]
+            axis = spreads.index(max(spreads))
+            entries[lo:hi] = sorted(entries[lo:hi], key=lambda entry: entry[0][axis])
+            mid = (lo + hi) >> 1
+            self._axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+    def _search(self, query: Tuple[float, float, float], k: int) -> List[Tuple[float, int]]:
+        coords, axes = self._coords, self._axes
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance², position)
+        worst = float('inf')  # distance² of the k-th best so far
+        stack = [(0, len(axes), 0.0)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            lo, hi, bound = pop()
+            if lo >= hi or bound >= worst:
+                continue
+            mid = (lo + hi) >> 1
+            point = coords[mid]
+            dx = query[0] - point[0]
+            dy = query[1] - point[1]
+            dz = query[2] - point[2]
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < worst:
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, mid))
+                else:
+                    heapq.heapreplace(best, (-distance, mid))
+                if len(best) == k:
+                    worst = -best[0][0]
+            axis = axes[mid]
+            diff = query[axis] - point[axis]
+            # Far side first so the near side is searched first
+            if diff < 0:
+                push((mid + 1, hi, diff * diff))
+                push((lo, mid, 0.0))
+            else:
+                push((lo, mid, diff * diff))
+                push((mid + 1, hi, 0.0))
+        return sorted((-negative, position) for negative, position in best)
+
+    def nearest(self, colors: List[str], k: int = 1) -> List[List[Dict[str, Any]]]:
+        """The k nearest palette colors for each input color, closest first"""
+        k = max(1, min(k, len(self._coords)))
+        results = []
+        for color in colors:
+            results.append([
+                {'hex': self._hex[position], 'name': self._names[position], 'distance': round(distance ** 0.5, 4)}
+                for distance, position in self._search(hex_to_oklab(color), k)
+            ])
+        return results
+
+
+def tailwind_palette(config_path: str = TAILWIND_CONFIG) -> List[Tuple[str, str]]:
+    """The default Tailwind colors plus any literal hex colors added in tailwind.config.js"""
+    colors = [
+        (f'{family}-{shade}', hex_color)
+        for family, shades in TAILWIND_COLORS.items()
+        for shade, hex_color in zip(TAILWIND_SHADES, shades)
+    ]
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = f.read()
+        colors += [(f'config-{match.group(1).lower()}', match.group(0)) for match in _HEX.finditer(config)]
+    except OSError:
+        pass
+    return colors
+
+
+def _flatten(value: Any, prefix: str = '') -> List[Tuple[str, str]]:
+    if isinstance(value, str):
+        return [(prefix or value, value)]
+    if isinstance(value, list):
+        return [color for i, item in enumerate(value) for color in _flatten(item, f'{prefix}-{i}' if prefix else str(i))]
+    if isinstance(value, dict):
+        return [color for key, item in value.items() for color in _flatten(item, f'{prefix}-{key}' if prefix else str(key))]
+    return []
+
+
+def load_palette_file(path: str) -> List[Tuple[str, str]]:
+    """A brand palette: JSON (list of hex colors or nested {name: hex}) or text with one color per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if path.endswith('.json'):
+        return _flatten(json.loads(content))
+    colors = []
+    for line in content.splitlines():
+        match = _HEX.search(line)
+        if match:
+            name = line[match.end():].strip(' \t,;:') or match.group(0)
+            colors.append((name, match.group(0)))
+    return colors
+
+
+_INDEXES: Dict[Tuple[str, float], PaletteIndex] = {}
+
+
+def get_palette_index(source: str) -> PaletteIndex:
+    """'tailwind' or a palette file path; each palette is indexed once per process"""
+    path = TAILWIND_CONFIG if source == 'tailwind' else source
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        if source != 'tailwind':
+            raise
+        mtime = 0.0
+    key = (source, mtime)
+    if key not in _INDEXES:
+        colors = tailwind_palette(path) if source == 'tailwind' else load_palette_file(path)
+        _INDEXES[key] = PaletteIndex(colors, name=source)
+    return _INDEXES[key]
+
+
+def snap_theme(scales: Dict[str, Dict[str, str]], index: PaletteIndex,
+               level: Optional[str] = 'AA') -> Tuple[Dict[str, Dict[str, str]], Dict[str, Any]]:
+    """Snap every shade of every scale to its nearest palette color.
+
+    All shades are queried in one batch. With a contrast level, a shade whose nearest color
+    would break its text pairing (or the scale's order), the same pairings theme_accessibility
+    enforces, takes the nearest of its SNAP_CANDIDATES candidates that passes; shades without
+    such a candidate keep the nearest color and are left to the contrast solver.
+    """
+    start = time.perf_counter()
+    keys = [(name, shade) for name, scale in scales.items() for shade in scale]
+    candidates = dict(zip(keys, index.nearest([scales[name][shade] for name, shade in keys])))
+    query_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    target = CONTRAST_LEVELS[level] if level else None
+    snapped: Dict[str, Dict[str, str]] = {}
+    shades: Dict[str, Any] = {}
+    constrained = 0
+
+    def pick(name: str, shade: str, against: Optional[str], floor: float) -> Optional[float]:
+        """Choose the shade's color; returns its contrast against `against`"""
+        nonlocal constrained
+        choice = candidates[(name, shade)][0]
+        if against is not None and shade not in REPORTED_SHADES:
+            against_luminance = relative_luminance(against)
+            if contrast_ratio(relative_luminance(choice['hex']), against_luminance) < floor:
+                for option in index.nearest([scales[name][shade]], SNAP_CANDIDATES)[0][1:]:
+                    if contrast_ratio(relative_luminance(option['hex']), against_luminance) >= floor:
+                        constrained += 1
+                        choice = option
+                        break
+        snapped[name][shade] = choice['hex']
+        shades[f'{name}-{shade}'] = {'from': scales[name][shade], 'to': choice['hex'],
+                                     'name': choice['name'], 'distance': choice['distance']}
+        if against is None:
+            return None
+        return contrast_ratio(relative_luminance(choice['hex']), relative_luminance(against))
+
+    for name, scale in scales.items():
+        snapped[name] = dict(scale)
+        floor = target or 0.0
+        for shade in REPORTED_SHADES + DARK_SHADES:
+            if shade in scale:
+                ratio = pick(name, shade, WHITE if target else None, floor)
+                if ratio is not None and shade not in REPORTED_SHADES:
+                    floor = max(floor, ratio)
+        floor = target or 0.0
+        text_shade = snapped[name].get(TEXT_SHADE)
+        for shade in LIGHT_SHADES:
+            if shade in scale:
+                ratio = pick(name, shade, text_shade if target else None, floor)
+                if ratio is not None:
+                    floor = max(floor, ratio)
+        for shade in scale:
+            if f'{name}-{shade}' not in shades:
+                pick(name, shade, None, 0.0)
+
+    return snapped, {
+        'palette': index.name,
+        'palette_size': len(index),
+        'index_build_ms': index.build_ms,
+        'query_ms': query_ms,
+        'snap_ms': round((time.perf_counter() - start) * 1000, 3),
+        'shades_constrained_by_contrast': constrained,
+        'shades': shades,
+    }
@@ -16,6 +16,19 @@ import https from 'https';
 import http from 'http';
 import { URL } from 'url';
 import pngToIco from 'png-to-ico';
+import { performance } from 'perf_hooks';
+import {
+  DEFAULT_IMAGE_CONCURRENCY,
+  hashFile,
+  isManifestCurrent,
+  readManifest,
+  runPool,
+  writeManifest
+} from './image-job-utils.js';
+
+// Bump when the generated variants change, so existing manifests are invalidated
+const LOGO_PIPELINE_VERSION = 1;
+const LOGO_MANIFEST = 'logo-manifest.json';
 
 class LogoProcessor {
   constructor(options = {}) {
@@ -23,6 +36,8 @@ class LogoProcessor {
     this.tempDir = options.tempDir || 'temp';
     this.maxFileSize = options.maxFileSize || 10 * 1024 * 1024; // 10MB
     this.supportedFormats = ['png', 'jpg', 'jpeg', 'svg', 'webp'];
+    this.concurrency = options.concurrency || DEFAULT_IMAGE_CONCURRENCY;
+    this.force = Boolean(options.force);
   }
 
   /**
@@ -35,10 +50,33 @@ class LogoProcessor {
       // Ensure temp directory exists
       await fs.mkdir(this.tempDir, { recursive: true });
       
+      const start = performance.now();
+      
       // 1. Download logo
       const logoPath = await this.downloadLogo(logoUrl);
       console.log('✅ Logo downloaded successfully');
       
+      const outputPath = clientName 
+        ? path.join(this.outputDir, 'clients', clientName)
+        : this.outputDir;
+      
+      // Same logo as last time and every output still there: nothing to do
+      const sourceHash = await hashFile(logoPath);
+      const manifestPath = path.join(outputPath, LOGO_MANIFEST);
+      const manifest = await readManifest(manifestPath);
+      const manifestFiles = manifest ? manifest.files.map(file => file.path) : [];
+      if (!this.force && await isManifestCurrent(manifest, sourceHash, LOGO_PIPELINE_VERSION, manifestFiles)) {
+        await this.cleanup([logoPath]);
+        console.log(`✅ Logo unchanged (${sourceHash}), reusing ${manifestFiles.length} files from ${manifestPath}`);
+        return {
+          success: true,
+          files: manifest.files,
+          colors: manifest.colors,
+          outputPath,
+          cached: true
+        };
+      }
+      
       // 2. Validate and get metadata
       const metadata = await this.validateAndGetMetadata(logoPath);
       console.log('✅ Logo validated:', metadata);
@@ -46,28 +84,30 @@ class LogoProcessor {
       // 3. Process and optimize the image
       const processedPath = await this.processImage(logoPath, metadata);
       
-      // 4. Generate all required sizes
-      const outputPath = clientName 
-        ? path.join(this.outputDir, 'clients', clientName)
-        : this.outputDir;
+      // 4. Generate all required sizes, the dark variants and the color palette concurrently
       await fs.mkdir(outputPath, { recursive: true });
       await fs.mkdir(path.join(outputPath, 'favicon'), { recursive: true });
       
-      const generatedFiles = await this.generateVariants(processedPath, outputPath);
+      const { files: generatedFiles, colors: colorData } = await this.generateVariants(processedPath, outputPath);
       console.log(`✅ Generated ${generatedFiles.length} logo variants`);
-      
-      // 5. Extract color palette
-      const colorData = await this.extractColors(processedPath);
       console.log('✅ Extracted color palette:', colorData);
       
-      // 6. Generate dark theme variant
-      await this.generateDarkVariant(processedPath, outputPath);
-      console.log('✅ Generated dark theme variant');
-      
-      // 7. Save color data
+      // 5. Save color data
       const colorFile = path.join(outputPath, 'colors.json');
       await fs.writeFile(colorFile, JSON.stringify(colorData, null, 2));
       
+      // 6. Record the source hash and per-variant timings so an unchanged logo is skipped next time
+      await writeManifest(manifestPath, {
+        version: LOGO_PIPELINE_VERSION,
+        sourceHash,
+        sourceUrl: logoUrl,
+        generated_at: new Date().toISOString(),
+        concurrency: this.concurrency,
+        total_ms: Math.round(performance.now() - start),
+        colors: colorData,
+        files: generatedFiles
+      });
+      
       // Clean up temp files
       await this.cleanup([logoPath, processedPath]);
       
@@ -75,7 +115,8 @@ class LogoProcessor {
         success: true,
         files: generatedFiles,
         colors: colorData,
-        outputPath
+        outputPath,
+        cached: false
       };
     } catch (error) {
       console.error('❌ Logo processing failed:', error.message);
@@ -196,7 +237,8 @@ class LogoProcessor {
   }
 
   /**
-   * Generate all required logo variants
+   * Generate all required logo variants through a bounded worker pool.
+   * Returns the generated files (each with its generation time) and the color palette.
    */
   async generateVariants(imagePath, outputDir) {
     const variants = [
@@ -210,66 +252,82 @@ class LogoProcessor {
       { name: 'favicon/android-chrome-512x512.png', size: 512, description: 'Android Chrome large' }
     ];
     
-    const generatedFiles = [];
-    
-    for (const variant of variants) {
-      const outputPath = path.join(outputDir, variant.name);
-      
-      await sharp(imagePath)
-        .resize(variant.size, variant.size, {
-          fit: 'inside',
-          withoutEnlargement: true,
-          background: { r: 0, g: 0, b: 0, alpha: 0 }
-        })
-        .png({ quality: 90 })
-        .toFile(outputPath);
-      
-      generatedFiles.push({
-        name: variant.name,
-        path: outputPath,
-        size: variant.size,
-        description: variant.description
-      });
-      
-      console.log(`  📦 Generated ${variant.name} (${variant.size}x${variant.size})`);
-    }
-    
-    // Generate ICO file from 32x32 PNG
-    await this.generateFavicon(
-      path.join(outputDir, 'favicon/favicon.png'),
-      path.join(outputDir, 'favicon/favicon.ico')
-    );
+    // Phase 1: everything that only needs the processed logo
+    const resizeJobs = variants.map(variant => ({
+      name: variant.name,
+      run: async () => {
+        const outputPath = path.join(outputDir, variant.name);
+        await sharp(imagePath)
+          .resize(variant.size, variant.size, {
+            fit: 'inside',
+            withoutEnlargement: true,
+            background: { r: 0, g: 0, b: 0, alpha: 0 }
+          })
+          .png({ quality: 90 })
+          .toFile(outputPath);
+        console.log(`  📦 Generated ${variant.name} (${variant.size}x${variant.size})`);
+        return {
+          name: variant.name,
+          path: outputPath,
+          size: variant.size,
+          description: variant.description
+        };
+      }
+    }));
+    const phaseOne = await runPool([
+      ...resizeJobs,
+      { name: 'logo-dark.png', run: () => this.generateDarkVariant(imagePath, outputDir) },
+      { name: 'colors', run: () => this.extractColors(imagePath) }
+    ], this.concurrency);
     
-    generatedFiles.push({
-      name: 'favicon/favicon.ico',
-      path: path.join(outputDir, 'favicon/favicon.ico'),
-      description: 'ICO format favicon'
-    });
+    const timed = (result) => ({ ...result.value, ms: result.ms });
+    const generatedFiles = phaseOne.slice(0, resizeJobs.length).map(timed);
+    const darkResult = phaseOne[resizeJobs.length];
+    generatedFiles.push(...[
+      { name: 'logo-dark.png', path: path.join(outputDir, 'logo-dark.png'), description: 'Dark theme variant', ms: darkResult.ms },
+      { name: 'logo-dark-bg.png', path: path.join(outputDir, 'logo-dark-bg.png'), description: 'Dark theme variant on white', ms: darkResult.ms }
+    ].filter(file => existsSync(file.path)));  // the fallback only writes logo-dark.png
+    const colors = phaseOne[resizeJobs.length + 1].value;
     
-    // Generate WebP variants for modern browsers
+    // Phase 2: the ICO file and WebP versions are derived from phase 1 outputs
     const webpVariants = [
       { source: 'logo.png', output: 'logo.webp' },
       { source: 'logo-large.png', output: 'logo-large.webp' }
     ];
-    
-    for (const variant of webpVariants) {
-      const sourcePath = path.join(outputDir, variant.source);
-      const outputPath = path.join(outputDir, variant.output);
-      
-      await sharp(sourcePath)
-        .webp({ quality: 90 })
-        .toFile(outputPath);
-      
-      generatedFiles.push({
+    const phaseTwo = await runPool([
+      {
+        name: 'favicon/favicon.ico',
+        run: async () => {
+          await this.generateFavicon(
+            path.join(outputDir, 'favicon/favicon.png'),
+            path.join(outputDir, 'favicon/favicon.ico')
+          );
+          return {
+            name: 'favicon/favicon.ico',
+            path: path.join(outputDir, 'favicon/favicon.ico'),
+            description: 'ICO format favicon'
+          };
+        }
+      },
+      ...webpVariants.map(variant => ({
         name: variant.output,
-        path: outputPath,
-        description: 'WebP optimized version'
-      });
-      
-      console.log(`  📦 Generated ${variant.output} (WebP format)`);
-    }
+        run: async () => {
+          const outputPath = path.join(outputDir, variant.output);
+          await sharp(path.join(outputDir, variant.source))
+            .webp({ quality: 90 })
+            .toFile(outputPath);
+          console.log(`  📦 Generated ${variant.output} (WebP format)`);
+          return {
+            name: variant.output,
+            path: outputPath,
+            description: 'WebP optimized version'
+          };
+        }
+      }))
+    ], this.concurrency);
+    generatedFiles.push(...phaseTwo.map(timed));
     
-    return generatedFiles;
+    return { files: generatedFiles, colors };
   }
 
   /**
@@ -531,12 +589,16 @@ if (import.meta.url === `file://${process.argv[1]}`) {
     console.error('  --output           Output directory (default: public/images)');
     console.error('  --client           Client name for organizing files');
     console.error('  --extract-colors   Output file for extracted colors JSON');
+    console.error(`  --concurrency      Variants generated at once (default: ${DEFAULT_IMAGE_CONCURRENCY})`);
+    console.error('  --force            Reprocess even if the logo is unchanged since the last run');
     process.exit(1);
   }
   
   const processor = new LogoProcessor({
     outputDir: args.output || 'public/images',
-    tempDir: args.temp || 'temp'
+    tempDir: args.temp || 'temp',
+    concurrency: args.concurrency ? parseInt(args.concurrency, 10) : undefined,
+    force: args.force === true
   });
   
   const logoUrl = args.url || args.logo_url;
@@ -545,7 +607,9 @@ if (import.meta.url === `file://${process.argv[1]}`) {
   processor.processLogo(logoUrl, clientName)
     .then(async (result) => {
       if (result.success) {
-        console.log('\n✅ Logo processing completed successfully!');
+        console.log(result.cached
+          ? '\n✅ Logo unchanged, existing files kept'
+          : '\n✅ Logo processing completed successfully!');
         console.log(`📁 Output directory: ${result.outputPath}`);
         console.log(`🎨 Colors extracted: ${result.colors.dominantColors.join(', ')}`);
         
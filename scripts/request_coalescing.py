@@ -0,0 +1,93 @@
+"""
+Request Coalescing
+Singleflight for Claude API calls: while a request is in flight, identical requests
+(same normalized request as the cassettes match on, and the same max_tokens) wait for
+it and share its response instead of making their own call. Happens when a webhook
+fires twice, or concurrent clients are generated from identical inputs.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple, Type
+
+from api_cassette import request_key
+
+
+def coalescing_key(request: Dict[str, Any]) -> str:
+    # A smaller max_tokens can truncate, so it must not share a larger request's response
+    return f"{request_key(request)}:{request.get('max_tokens')}"
+
+
+class RequestCoalescer:
+    """Shares one in-flight call per key. A leader failing with one of `private_errors`
+    (its own deadline, say) doesn't fail the waiting requests; the next one re-issues the call."""
+
+    def __init__(self, enabled: bool = True, private_errors: Tuple[Type[BaseException], ...] = ()):
+        self.enabled = enabled
+        self.private_errors = private_errors
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiting: Dict[str, int] = {}
+        self.requests = 0
+        self.issued = 0
+        self.coalesced = 0
+        self.max_waiting = 0
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]],
+                  wait: Optional[Callable[[Awaitable[Any]], Awaitable[Any]]] = None) -> Tuple[Any, bool]:
+        """Return (result, shared): the in-flight result for `key`, or the result of `call()`.
+        `wait` wraps a shared wait, e.g. to apply the waiting client's own deadline."""
+        self.requests += 1
+        if not self.enabled:
+            self.issued += 1
+            return await call(), False
+
+        future = self._inflight.get(key)
+        while future is not None:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            self.max_waiting = max(self.max_waiting, self._waiting[key])
+            try:
+                # shield: a waiter giving up must not cancel the call the others wait for
+                shared = asyncio.shield(future)
+                result = await (wait(shared) if wait else shared)
+                self.coalesced += 1
+                return result, True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader gave up; try again (and lead, unless another waiter got there first)
+                future = self._inflight.get(key)
+            finally:
+                self._waiting[key] -= 1
+                if not self._waiting[key]:
+                    del self._waiting[key]
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.issued += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            if isinstance(e, self.private_errors):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved, so it isn't logged when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'requests': self.requests,
+            'issued': self.issued,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+            'max_waiting': self.max_waiting,
+        }
@@ -0,0 +1,158 @@
+"""
+Status Events
+Stage events (stage started, API attempt, retry, content merged, config validated,
+files written) for a status webhook. Emitting only puts the event in a bounded
+in-memory buffer; a background task posts the buffered events, so a slow or
+unreachable receiver never holds up generation. Events are posted one at a time in
+the same shape as webhook-utils.js sends (`status`, `client_name`, `message`,
+`timestamp`, plus event fields); receivers that opt in get batches instead.
+"""
+
+import asyncio
+import copy
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+import aiohttp
+
+WEBHOOK_TIMEOUT_S = 10
+# Events emitted within this window are sent together; repeats of a progress event coalesce
+BATCH_INTERVAL_S = 1.0
+MAX_BATCH = 50
+# Beyond this many buffered events the oldest are dropped
+MAX_BUFFERED = 500
+FLUSH_TIMEOUT_S = 5
+# Versioned payload for receivers that opt into batches ({schema, events, dropped})
+BATCH_SCHEMA = 'status-events/v1'
+# Progress events where only the latest matters; everything else (retries, validation
+# results, written files) is always delivered on its own
+COALESCED_STATUSES = ('stage_started', 'api_attempt')
+
+
+class StatusReporter:
+    def __init__(self, webhook_url: str = '', batch: bool = False, batch_interval_s: float = BATCH_INTERVAL_S,
+                 max_buffered: int = MAX_BUFFERED, max_batch: int = MAX_BATCH):
+        self.webhook_url = webhook_url
+        self.enabled = bool(webhook_url)
+        self.batch = batch
+        self.batch_interval_s = batch_interval_s
+        self.max_buffered = max_buffered
+        self.max_batch = max_batch
+        self.client: Optional[str] = None
+        # Shared by every client view
+        self._buffer: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self.stats = {'emitted': 0, 'coalesced': 0, 'dropped': 0, 'sent': 0, 'requests': 0, 'failed_requests': 0}
+        self._wakeup = asyncio.Event()
+        self._runner: Dict[str, Any] = {'task': None, 'loop': None, 'sending': False, 'closing': False,
+                                        'dropped_reported': 0, 'seq': 0}
+
+    def for_client(self, client: str) -> 'StatusReporter':
+        """A view of this reporter that tags its events with a client name"""
+        view = copy.copy(self)
+        view.client = client
+        return view
+
+    def start(self) -> None:
+        """Start the background sender (call from the running event loop)"""
+        if self.enabled and self._runner['task'] is None:
+            self._runner['loop'] = asyncio.get_running_loop()
+            self._runner['task'] = asyncio.create_task(self._run())
+
+    def emit(self, status: str, stage: Optional[str] = None, message: str = '', **data) -> None:
+        """Buffer an event without waiting. A pending progress event (COALESCED_STATUSES) with the
+        same client, stage and status is replaced by this one; its `count` says how many it stands for."""
+        if not self.enabled:
+            return
+        loop = self._runner['loop']
+        if loop is not None and not self._on_loop(loop):
+            # Emitted from a worker thread (e.g. validation); the buffer belongs to the loop thread
+            loop.call_soon_threadsafe(lambda: self.emit(status, stage, message, **data))
+            return
+        if status in COALESCED_STATUSES:
+            key = (self.client, stage, status)
+        else:
+            self._runner['seq'] += 1
+            key = (self.client, stage, status, self._runner['seq'])
+        pending = self._buffer.pop(key, None)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+        self._buffer[key] = {
+            'status': status,
+            'client_name': self.client,
+            'stage': stage,
+            'message': message,
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'count': pending['count'] + 1 if pending else 1,
+            **data,
+        }
+        self.stats['emitted'] += 1
+        while len(self._buffer) > self.max_buffered:
+            self._buffer.popitem(last=False)
+            self.stats['dropped'] += 1
+        self._wakeup.set()
+
+    @staticmethod
+    def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        return [self._buffer.popitem(last=False)[1] for _ in range(min(self.max_batch, len(self._buffer)))]
+
+    async def _post(self, session: aiohttp.ClientSession, events: List[Dict[str, Any]]) -> None:
+        dropped = self.stats['dropped'] - self._runner['dropped_reported']
+        self._runner['dropped_reported'] = self.stats['dropped']
+        if self.batch:
+            payloads = [{'schema': BATCH_SCHEMA, 'events': events, 'dropped': dropped}]
+        else:
+            payloads = [dict(event, dropped=dropped) if dropped and i == 0 else event for i, event in enumerate(events)]
+        for payload in payloads:
+            try:
+                async with session.post(self.webhook_url, json=payload) as response:
+                    if response.status >= 400:
+                        self.stats['failed_requests'] += 1
+                        print(f"Status webhook returned {response.status}, continuing...")
+                        continue
+                self.stats['sent'] += len(payload['events']) if self.batch else 1
+                self.stats['requests'] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats['failed_requests'] += 1
+                print(f"Status webhook failed, continuing... ({e})")
+
+    async def _run(self) -> None:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT_S)) as session:
+            while True:
+                await self._wakeup.wait()
+                if not self._runner['closing']:
+                    await asyncio.sleep(self.batch_interval_s)
+                self._wakeup.clear()
+                self._runner['sending'] = True
+                try:
+                    while self._buffer:
+                        await self._post(session, self._take_batch())
+                finally:
+                    self._runner['sending'] = False
+
+    async def close(self, timeout: float = FLUSH_TIMEOUT_S, log=None) -> None:
+        """Send what is still buffered (waiting at most `timeout` seconds) and stop the sender.
+        `log` is the file warnings go to (stdout by default)."""
+        task = self._runner['task']
+        if task is None:
+            return
+        self._runner['closing'] = True
+        self._wakeup.set()
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + timeout
+        while (self._buffer or self._runner['sending']) and not task.done() and loop.time() < give_up:
+            await asyncio.sleep(0.05)
+        if self._buffer:
+            print(f"Warning: {len(self._buffer)} status event(s) not sent within {timeout:g}s", file=log)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self._runner['task'] = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self.stats, buffered=len(self._buffer))
@@ -0,0 +1,181 @@
+"""
+Theme Accessibility Engine
+WCAG 2.x relative luminance and contrast checks for generated color scales.
+Shades that fail their text pairings are moved to the nearest compliant lightness.
+"""
+
+import colorsys
+from typing import Dict, List, Any, Tuple
+
+# Minimum contrast ratios for normal-size text
+CONTRAST_LEVELS = {
+    'AA': 4.5,
+    'AAA': 7.0,
+}
+
+WHITE = '#ffffff'
+
+# sRGB channel (0-255) -> linear light, precomputed once so luminance is three lookups
+SRGB_TO_LINEAR = tuple(
+    (c / 255) / 12.92 if (c / 255) <= 0.04045 else (((c / 255) + 0.055) / 1.055) ** 2.4
+    for c in range(256)
+)
+
+# How the site's components use each shade (see src/components and create-client-page.js):
+# - dark shades carry white text (bg-primary-600 text-white) and are used as text on white
+# - light tints sit behind the scale's own dark text (text-primary-900 on bg-primary-50/100)
+# 300-500 are decorative or the brand color itself and are only reported, never moved.
+# Both groups are ordered outward from the brand color so fixes keep the scale monotonic.
+DARK_SHADES = ('600', '700', '800', '900', '950')
+LIGHT_SHADES = ('200', '100', '50')
+REPORTED_SHADES = ('500',)
+TEXT_SHADE = '900'
+
+# Lightness bisection steps; 12 halvings of 0-100 resolve well below one 8-bit step
+_BISECT_STEPS = 12
+
+
+def _parse_hex(hex_color: str) -> Tuple[int, int, int]:
+    hex_color = hex_color.lstrip('#')
+    return int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+
+
+def relative_luminance(hex_color: str) -> float:
+    """WCAG relative luminance of a #RRGGBB color"""
+    r, g, b = _parse_hex(hex_color)
+    return 0.2126 * SRGB_TO_LINEAR[r] + 0.7152 * SRGB_TO_LINEAR[g] + 0.0722 * SRGB_TO_LINEAR[b]
+
+
+def contrast_ratio(luminance_a: float, luminance_b: float) -> float:
+    """WCAG contrast ratio between two relative luminances"""
+    lighter, darker = (luminance_a, luminance_b) if luminance_a >= luminance_b else (luminance_b, luminance_a)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def batch_contrast(pairs: List[Tuple[str, str]]) -> List[float]:
+    """Contrast ratios for many (background, foreground) pairs, sharing luminance lookups"""
+    luminance_cache: Dict[str, float] = {}
+
+    def luminance(color: str) -> float:
+        if color not in luminance_cache:
+            luminance_cache[color] = relative_luminance(color)
+        return luminance_cache[color]
+
+    return [contrast_ratio(luminance(bg), luminance(fg)) for bg, fg in pairs]
+
+
+def _hls_to_hex(h: float, l: float, s: float) -> str:
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return f"#{round(r * 255):02x}{round(g * 255):02x}{round(b * 255):02x}"
+
+
+def _bisect_lightness(hex_color: str, against: str, target: float, darken: bool) -> str:
+    """Find the lightness closest to the shade's own that reaches the target contrast.
+
+    With hue and saturation fixed every RGB channel is monotonic in lightness,
+    so contrast against a fixed color is monotonic too and bisection is exact.
+    """
+    r, g, b = _parse_hex(hex_color)
+    h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+    against_luminance = relative_luminance(against)
+
+    # Search between the current lightness (fails) and the extreme (black or white passes)
+    failing, passing = l, (0.0 if darken else 1.0)
+    best = _hls_to_hex(h, passing, s)
+    for _ in range(_BISECT_STEPS):
+        mid = (failing + passing) / 2
+        candidate = _hls_to_hex(h, mid, s)
+        if contrast_ratio(relative_luminance(candidate), against_luminance) >= target:
+            passing, best = mid, candidate
+        else:
+            failing = mid
+    return best
+
+
+def _check_pairings(adjusted: Dict[str, str], pairings: List[Tuple[str, str, bool]], target: float) -> List[Dict[str, Any]]:
+    """Check (shade, foreground, darken-to-fix) pairings in one batch, fixing failing shades in place.
+
+    Pairings are ordered outward from the brand color; each fixable shade must reach at
+    least the contrast of the one before it, so a fix never inverts the scale's order.
+    """
+    ratios = batch_contrast([(adjusted[shade], foreground) for shade, foreground, _ in pairings])
+    report = []
+    floor = target
+
+    for (shade, foreground, darken), ratio in zip(pairings, ratios):
+        background = adjusted[shade]
+        entry = {
+            'shade': shade,
+            'background': background,
+            'foreground': foreground,
+            'ratio': round(ratio, 2),
+            'passes': ratio >= target,
+        }
+        if shade in REPORTED_SHADES:
+            report.append(entry)
+            continue
+
+        if ratio < floor:
+            fixed = _bisect_lightness(background, foreground, floor, darken)
+            adjusted[shade] = fixed
+            ratio = contrast_ratio(relative_luminance(fixed), relative_luminance(foreground))
+            entry.update({
+                'adjusted_to': fixed,
+                'ratio_after': round(ratio, 2),
+                'passes': ratio >= target,
+            })
+        floor = max(floor, ratio)
+        report.append(entry)
+
+    return report
+
+
+def enforce_scale_contrast(scale: Dict[str, str], level: str = 'AA') -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+    """Check every shade/text pairing of a scale and fix failing shades.
+
+    Returns the adjusted scale and one report entry per pairing.
+    """
+    target = CONTRAST_LEVELS[level]
+    adjusted = dict(scale)
+
+    # Dark shades first: the light tints are checked against the (possibly darkened) text shade
+    report = _check_pairings(
+        adjusted,
+        [(shade, WHITE, True) for shade in REPORTED_SHADES + DARK_SHADES if shade in adjusted],
+        target
+    )
+
+    text_shade = adjusted.get(TEXT_SHADE)
+    if text_shade:
+        report += _check_pairings(
+            adjusted,
+            [(shade, text_shade, False) for shade in LIGHT_SHADES if shade in adjusted],
+            target
+        )
+
+    return adjusted, report
+
+
+def enforce_theme_contrast(scales: Dict[str, Dict[str, str]], level: str = 'AA') -> Tuple[Dict[str, Dict[str, str]], Dict[str, Any]]:
+    """Run the contrast solver over all scales of a theme (primary, secondary, accent)"""
+    adjusted_scales = {}
+    pairings = {}
+    adjusted_count = 0
+    failing_brand = []
+
+    for name, scale in scales.items():
+        adjusted_scales[name], report = enforce_scale_contrast(scale, level)
+        pairings[name] = report
+        adjusted_count += sum(1 for entry in report if 'adjusted_to' in entry)
+        failing_brand.extend(
+            f"{name}-{entry['shade']}" for entry in report
+            if entry['shade'] in REPORTED_SHADES and not entry['passes']
+        )
+
+    return adjusted_scales, {
+        'level': level,
+        'target_ratio': CONTRAST_LEVELS[level],
+        'shades_adjusted': adjusted_count,
+        'brand_colors_below_target': failing_brand,
+        'pairings': pairings,
+    }
@@ -0,0 +1,77 @@
+"""
+Token Budget Tracker
+Records output tokens per generation stage across runs and derives max_tokens
+budgets from the observed distribution instead of always reserving the maximum.
+"""
+
+import json
+import math
+import os
+from typing import Dict, List, Any, Optional
+
+DEFAULT_HISTORY_PATH = '.cache/token-usage.json'
+
+# Samples kept per stage; older runs roll off so budgets follow prompt changes
+MAX_SAMPLES = 200
+
+# Below this many samples the stage keeps its default budget
+MIN_SAMPLES = 10
+
+# Budget = p95 of past outputs plus headroom, never below the floor.
+# A budget that turns out too small only costs a continuation request.
+HEADROOM = 1.2
+MIN_BUDGET = 512
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile (fraction 0-1) of a non-empty sample list"""
+    ordered = sorted(samples)
+    index = (len(ordered) - 1) * fraction
+    lower, upper = math.floor(index), math.ceil(index)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+class TokenBudget:
+    def __init__(self, history_path: str = DEFAULT_HISTORY_PATH, default_budget: int = 4000):
+        self.history_path = history_path
+        self.default_budget = default_budget
+        self.history: Dict[str, List[int]] = {}
+        try:
+            with open(history_path, 'r', encoding='utf-8') as f:
+                self.history = {stage: list(samples) for stage, samples in json.load(f).items()}
+        except (OSError, json.JSONDecodeError, AttributeError):
+            pass
+
+    def budget_for(self, stage: str, cap: Optional[int] = None) -> int:
+        """max_tokens for a stage: p95 of previous outputs with headroom, capped at the stage's (or default) budget"""
+        cap = cap or self.default_budget
+        samples = self.history.get(stage, [])
+        if len(samples) < MIN_SAMPLES:
+            return cap
+        budget = math.ceil(percentile(samples, 0.95) * HEADROOM)
+        return max(min(MIN_BUDGET, cap), min(budget, cap))
+
+    def record(self, stage: str, output_tokens: int) -> None:
+        samples = self.history.setdefault(stage, [])
+        samples.append(int(output_tokens))
+        del samples[:-MAX_SAMPLES]
+
+    def distribution(self, stage: str) -> Dict[str, Any]:
+        samples = self.history.get(stage, [])
+        if not samples:
+            return {'samples': 0}
+        return {
+            'samples': len(samples),
+            'p50': round(percentile(samples, 0.5)),
+            'p95': round(percentile(samples, 0.95)),
+            'max': max(samples),
+        }
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.history_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.history_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.history, f)
+        os.replace(temp_path, self.history_path)
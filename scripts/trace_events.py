@@ -0,0 +1,127 @@
+"""
+Trace Events
+Records spans in the Chrome trace-event format so a generation run can be opened
+in Perfetto (ui.perfetto.dev) or chrome://tracing. Each client's spans get their
+own track; spans recorded outside a client land on the thread that ran them.
+"""
+
+import copy
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+PROCESS_NAME = 'generate-theme'
+
+# Track set by Tracer.track() for the current task (and the tasks and threads it starts)
+_current_track: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('trace_track', default=None)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.events: List[Dict[str, Any]] = []
+        self.client: Optional[str] = None
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._track: Optional[int] = None
+        self._origin_ns = time.perf_counter_ns()
+
+    def for_client(self, client: str) -> 'Tracer':
+        """A view of this tracer that tags its spans with a client name and puts them on the
+        client's own track, so clients generated concurrently on one event loop don't overlap"""
+        view = copy.copy(self)
+        view.client = client
+        view._track = self._new_track(f'client {client}')
+        return view
+
+    def _new_track(self, name: str) -> int:
+        track = -(len(self._threads) + 1)
+        self._threads[track] = name
+        return track
+
+    @contextmanager
+    def track(self, name: str):
+        """Record spans of the enclosed block (including tasks and threads it starts) on a track
+        of their own, so a stage running alongside others doesn't overlap them on one track"""
+        if not self.enabled:
+            yield
+            return
+        token = _current_track.set(self._new_track(f'client {self.client}: {name}' if self.client else name))
+        try:
+            yield
+        finally:
+            _current_track.reset(token)
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def _tid(self) -> int:
+        track = _current_track.get()
+        if track is not None:
+            return track
+        if self._track is not None:
+            return self._track
+        thread = threading.current_thread()
+        self._threads.setdefault(thread.ident, thread.name)
+        return thread.ident
+
+    def _args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        if self.client:
+            return {'client': self.client, **args}
+        return args
+
+    @contextmanager
+    def span(self, name: str, cat: str = 'stage', **args):
+        """Record the enclosed block as a complete ('X') event; yields a dict for result args"""
+        if not self.enabled:
+            yield {}
+            return
+        result: Dict[str, Any] = {}
+        start = self._now_us()
+        tid = self._tid()
+        try:
+            yield result
+        except BaseException as e:
+            result['error'] = type(e).__name__
+            raise
+        finally:
+            self.events.append({
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': start,
+                'dur': self._now_us() - start,
+                'pid': self._pid,
+                'tid': tid,
+                'args': self._args({**args, **result}),
+            })
+
+    def instant(self, name: str, cat: str = 'stage', **args) -> None:
+        if not self.enabled:
+            return
+        self.events.append({
+            'name': name,
+            'cat': cat,
+            'ph': 'i',
+            's': 't',
+            'ts': self._now_us(),
+            'pid': self._pid,
+            'tid': self._tid(),
+            'args': self._args(args),
+        })
+
+    def save(self, path: str) -> None:
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': PROCESS_NAME}}]
+        metadata += [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self._threads.items()
+        ]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + self.events, 'displayTimeUnit': 'ms'}, f)
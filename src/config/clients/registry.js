@@ -0,0 +1,57 @@
+// Client registry - generated by scripts/generate-theme.py from manifest.json; do not edit.
+// Full configs are imported lazily, so pages only load (and bundle) the clients they render.
+
+export const clientLoaders = {
+  "tech10": () => import("./tech10.js"),
+  "tech6": () => import("./tech6.js"),
+  "tech8": () => import("./tech8.js"),
+};
+
+// Lightweight fields for listings and theme pages (no full config needed)
+export const clientIndex = [
+  {
+    "name": "tech10",
+    "businessName": "Tech 10",
+    "industry": "Technology",
+    "themeClass": "theme-tech10",
+    "colors": {
+      "primary": "#fc7c04",
+      "secondary": "#d46c04",
+      "accent": "#fcbc7a"
+    },
+    "dynamicPage": false
+  },
+  {
+    "name": "tech6",
+    "businessName": "Tech 6",
+    "industry": "Technology",
+    "themeClass": "theme-tech6",
+    "colors": {
+      "primary": "#2563eb",
+      "secondary": "#64748b",
+      "accent": "#f59e0b"
+    },
+    "dynamicPage": false
+  },
+  {
+    "name": "tech8",
+    "businessName": "Tech 8",
+    "industry": "Technology",
+    "themeClass": "theme-tech8",
+    "colors": {
+      "primary": "#fc7c04",
+      "secondary": "#d46c04",
+      "accent": "#fcbc7a"
+    },
+    "dynamicPage": false
+  }
+];
+
+export async function loadClientConfig(name) {
+  const load = clientLoaders[name];
+  if (!load) {
+    throw new Error(`Unknown client: ${name}`);
+  }
+  const module = await load();
+  return module.clientConfig ?? module.default;
+}
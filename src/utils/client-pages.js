@@ -0,0 +1,43 @@
+/**
+ * Dynamic Client Pages
+ *
+ * Static paths for the src/pages/clients/[client] route. Clients are read from
+ * the client manifest that generate-theme.py maintains; only clients registered
+ * with a dynamic page are rendered here (the others have generated page files).
+ */
+
+import clientManifest from '../config/clients/manifest.json';
+import { loadClientConfig } from '../config/clients/registry.js';
+
+/**
+ * Clients an incremental build is limited to (BUILD_CLIENTS=a,b), or null for all
+ * @returns {Set<string>|null}
+ */
+function buildFilter() {
+  const only = (process.env.BUILD_CLIENTS || '').split(',').map(name => name.trim()).filter(Boolean);
+  return only.length ? new Set(only) : null;
+}
+
+/**
+ * getStaticPaths entries for every dynamic client
+ * @returns {Promise<Array<{params: {client: string}, props: Object}>>}
+ */
+export async function getDynamicClientPaths() {
+  const only = buildFilter();
+  const entries = Object.entries(clientManifest.clients)
+    .filter(([name, entry]) => entry.dynamicPage && (!only || only.has(name)));
+
+  return Promise.all(entries.map(async ([name, entry]) => {
+    // Loaded on demand, so a build only evaluates the configs of the clients it renders
+    const clientConfig = await loadClientConfig(name);
+    return {
+      params: { client: name },
+      props: {
+        clientName: name,
+        clientConfig,
+        clientTheme: entry.className,
+        logoBasePath: entry.logo.replace(/\/[^/]+$/, '')
+      }
+    };
+  }));
+}
@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the Python generation scripts in scripts/
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts')
+sys.path.insert(0, os.path.abspath(SCRIPTS_DIR))
+
+
+def load_script(name: str):
+    """Import a hyphenated script (e.g. generate-theme.py) as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), os.path.join(SCRIPTS_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def generate_theme():
+    return load_script('generate-theme')
+
+
+@pytest.fixture
+def generator(generate_theme):
+    return generate_theme.ThemeGenerator('test-key', use_skeletons=False)
@@ -0,0 +1,91 @@
+"""
+Priority classes, weighted fair queuing across tenants, and aging (api_scheduler.py)
+"""
+
+import asyncio
+
+from api_scheduler import ApiScheduler
+
+
+async def dispatch_order(scheduler, requests, wait_before_release=0.0):
+    """Queue (name, priority, tenant) requests behind a held slot and return the order they are served in"""
+    served = []
+
+    async def request(name, priority, tenant):
+        async with scheduler.slot(priority, tenant):
+            served.append(name)
+
+    await scheduler.acquire()
+    tasks = []
+    for name, priority, tenant in requests:
+        tasks.append(asyncio.create_task(request(name, priority, tenant)))
+        await asyncio.sleep(0)  # enqueue in the given order
+    await asyncio.sleep(wait_before_release)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return served
+
+
+def test_higher_priority_class_is_served_first():
+    scheduler = ApiScheduler(1, aging_s=0)
+    order = asyncio.run(dispatch_order(scheduler, [
+        ('bulk', 'bulk', ''), ('standard', 'standard', ''), ('interactive', 'interactive', ''),
+    ]))
+    assert order == ['interactive', 'standard', 'bulk']
+
+
+def test_tenants_share_slots_fairly():
+    scheduler = ApiScheduler(1, aging_s=0)
+    order = asyncio.run(dispatch_order(scheduler, [
+        *[(f'a{i}', 'standard', 'agency-a') for i in range(4)],
+        *[(f'b{i}', 'standard', 'agency-b') for i in range(2)],
+    ]))
+    # agency-a queued everything first but doesn't get to go first with all of it
+    assert order == ['a0', 'b0', 'a1', 'b1', 'a2', 'a3']
+
+
+def test_tenant_weights_scale_the_share():
+    scheduler = ApiScheduler(1, {'agency-a': 2}, aging_s=0)
+    order = asyncio.run(dispatch_order(scheduler, [
+        *[(f'a{i}', 'standard', 'agency-a') for i in range(4)],
+        *[(f'b{i}', 'standard', 'agency-b') for i in range(2)],
+    ]))
+    assert order == ['a0', 'a1', 'b0', 'a2', 'a3', 'b1']
+
+
+def test_waiting_requests_age_into_higher_classes():
+    scheduler = ApiScheduler(1, aging_s=0.05)
+
+    async def run():
+        served = []
+
+        async def request(name, priority):
+            async with scheduler.slot(priority):
+                served.append(name)
+
+        await scheduler.acquire()
+        bulk = asyncio.create_task(request('bulk', 'bulk'))
+        await asyncio.sleep(0.15)  # bulk has waited long enough to rank with interactive
+        interactive = asyncio.create_task(request('interactive', 'interactive'))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(bulk, interactive)
+        return served
+
+    assert asyncio.run(run()) == ['bulk', 'interactive']
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    scheduler = ApiScheduler(1)
+
+    async def run():
+        await scheduler.acquire()
+        waiting = asyncio.create_task(scheduler.acquire('interactive'))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        scheduler.release()
+        return await asyncio.wait_for(scheduler.acquire('bulk'), 1)
+
+    asyncio.run(run())
+    assert scheduler.metrics()['active'] == 1
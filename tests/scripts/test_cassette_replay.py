@@ -0,0 +1,60 @@
+"""
+End-to-end generation replayed from a recorded cassette, without network or an API key
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+from trace_events import Tracer
+
+CASSETTE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'cassettes', 'acme-software.json'))
+ARGS = ['--business-name', 'Acme', '--industry', 'Software', '--contact-email', 'a@b.c',
+        '--client-name', 'acme', '--no-index']
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    os.makedirs(tmp_path / 'src' / 'styles' / 'themes')
+    os.makedirs(tmp_path / 'src' / 'config' / 'clients')
+    return tmp_path
+
+
+def without_timestamp(css):
+    return '\n'.join(line for line in css.splitlines() if 'Generated on:' not in line)
+
+
+def replay(workdir):
+    env = {key: value for key, value in os.environ.items() if key != 'ANTHROPIC_API_KEY'}
+    result = subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, 'generate-theme.py'), *ARGS, '--replay-cassette', CASSETTE],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def test_replay_is_hermetic_and_deterministic(workdir):
+    first = replay(workdir)
+    config = (workdir / 'src' / 'config' / 'clients' / 'acme.js').read_text()
+    theme = without_timestamp((workdir / 'src' / 'styles' / 'themes' / 'acme.css').read_text())
+
+    second = replay(workdir)
+
+    for output in (first, second):
+        assert 'Replayed 3 API call(s)' in output
+        assert 'were not used' not in output
+    assert (workdir / 'src' / 'config' / 'clients' / 'acme.js').read_text() == config
+    assert without_timestamp((workdir / 'src' / 'styles' / 'themes' / 'acme.css').read_text()) == theme
+    # Replays leave no skeleton cache or run history behind for the next run to pick up
+    assert not (workdir / '.cache').exists()
+
+
+def test_cassette_runs_use_their_own_skeleton_pool(generate_theme):
+    args = generate_theme.build_arg_parser().parse_args(ARGS + ['--replay-cassette', CASSETTE])
+    generator = generate_theme.create_generator(args, '', Tracer(enabled=False))
+    assert os.path.abspath(generator.skeleton_pool.pool_dir) != os.path.abspath(generate_theme.config_skeletons.DEFAULT_POOL_DIR)
+    assert os.listdir(generator.skeleton_pool.pool_dir) == []
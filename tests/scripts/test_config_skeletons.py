@@ -0,0 +1,58 @@
+"""
+Skeleton pool TTL and prompt-hash invalidation (config_skeletons.py)
+"""
+
+import json
+import time
+
+import pytest
+
+import config_skeletons
+from config_skeletons import SKELETON_FIELDS, SkeletonPool, fill_skeleton, missing_placeholders, placeholder
+
+SKELETON = '{\n' + ',\n'.join(f'  "{field}": {placeholder(field)}' for field in SKELETON_FIELDS) + '\n}'
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return SkeletonPool(str(tmp_path), max_age_days=30)
+
+
+def test_stored_skeleton_is_served_for_the_same_prompt(pool):
+    pool.put('Software', 'hash-a', SKELETON, {'output_tokens': 100})
+    entry = pool.get('Software', 'hash-a')
+    assert entry['skeleton'] == SKELETON
+    # Industries are keyed case-insensitively
+    assert pool.get('software', 'hash-a') is not None
+
+
+def test_changed_prompt_invalidates_the_skeleton(pool):
+    pool.put('Software', 'hash-a', SKELETON, {})
+    assert pool.get('Software', 'hash-b') is None
+
+
+def test_expired_skeleton_is_regenerated(pool, monkeypatch):
+    pool.put('Software', 'hash-a', SKELETON, {})
+    now = time.time()
+    monkeypatch.setattr(config_skeletons.time, 'time', lambda: now + 29 * 86400)
+    assert pool.get('Software', 'hash-a') is not None
+    monkeypatch.setattr(config_skeletons.time, 'time', lambda: now + 31 * 86400)
+    assert pool.get('Software', 'hash-a') is None
+
+
+def test_old_version_or_damaged_entries_are_ignored(pool, tmp_path):
+    pool.put('Software', 'hash-a', SKELETON, {})
+    path = tmp_path / 'software.json'
+    entry = json.loads(path.read_text())
+    path.write_text(json.dumps(dict(entry, version=config_skeletons.SKELETON_VERSION - 1)))
+    assert pool.get('Software', 'hash-a') is None
+    path.write_text(json.dumps(dict(entry, skeleton='{}')))
+    assert pool.get('Software', 'hash-a') is None
+    path.write_text('{not json')
+    assert pool.get('Software', 'hash-a') is None
+
+
+def test_fill_replaces_every_placeholder():
+    assert missing_placeholders(SKELETON) == []
+    filled = fill_skeleton(SKELETON, {})
+    assert '{{' not in filled
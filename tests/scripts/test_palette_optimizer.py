@@ -0,0 +1,58 @@
+"""
+Pruned palette search finds the exhaustive optimum and keeps fixed slots (palette_optimizer.py)
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+from palette_optimizer import _CandidatePool, _pair_scores, _primary_scores, optimize_palette  # noqa: E402
+
+SOURCES = ('logo-palette', 'logo-dominant', 'industry', 'harmony')
+
+
+def random_candidates(count, seed):
+    rng = random.Random(seed)
+    return [('#%02x%02x%02x' % tuple(rng.randrange(256) for _ in range(3)), rng.choice(SOURCES))
+            for _ in range(count)]
+
+
+def exhaustive_best(candidates):
+    pool = _CandidatePool(candidates)
+    every = np.arange(len(pool.colors))
+    primary_scores = _primary_scores(pool, every)
+    return max(primary_scores[p] + _pair_scores(pool, p, every, every).max() for p in every)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_pruning_keeps_the_best_palette(seed):
+    candidates = random_candidates(30, seed)
+    result = optimize_palette(candidates, budget_ms=10_000)
+    assert not result['timed_out']
+    assert result['pruned_primaries'] > 0
+    assert result['score'] == pytest.approx(exhaustive_best(candidates), abs=1e-3)
+
+
+def test_fixed_slots_are_kept():
+    candidates = random_candidates(20, 4)
+    result = optimize_palette(candidates, fixed={'primary': '#1D4ED8', 'accent': '#f59e0b'}, budget_ms=10_000)
+    assert result['primary'] == '#1d4ed8'
+    assert result['accent'] == '#f59e0b'
+    assert result['sources']['primary'] == result['sources']['accent'] == 'user'
+    assert result['secondary'] not in ('#1d4ed8', '#f59e0b')
+
+
+def test_slots_never_repeat_a_color():
+    # Two near-identical candidates may not fill two slots
+    result = optimize_palette([('#1d4ed8', 'logo-palette'), ('#1e4fd9', 'logo-palette'), ('#f59e0b', 'industry')])
+    assert result is None
+
+
+def test_too_few_candidates():
+    assert optimize_palette([('#1d4ed8', 'logo-palette'), ('#f59e0b', 'industry')]) is None
+
+
+def test_exhausted_budget_returns_nothing():
+    # The caller then falls back to the unoptimized palette
+    assert optimize_palette(random_candidates(30, 5), budget_ms=0) is None
@@ -0,0 +1,56 @@
+"""
+Only the active prompt mode is built unless a comparison is asked for (generate-theme.py)
+"""
+
+import pytest
+
+BUSINESS = {
+    'client_name': 'acme', 'business_name': 'Acme', 'industry': 'Technology',
+    'services': 'Consulting, Support', 'contact_email': 'hello@acme.example',
+}
+
+
+@pytest.fixture
+def color_calls(generator, monkeypatch):
+    calls = []
+    resolve = generator.get_user_colors_with_priority
+
+    def counted(business_data, quiet=False):
+        calls.append(quiet)
+        return resolve(business_data, quiet=quiet)
+
+    monkeypatch.setattr(generator, 'get_user_colors_with_priority', counted)
+    return calls
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_only_the_active_mode_is_built(generate_theme, generator, color_calls, compact):
+    generator.compact_prompts = compact
+    generator.build_prompts('base_config', generate_theme.build_business_data(BUSINESS))
+    report = generator.prompt_report['base_config']
+    mode = 'compact' if compact else 'verbose'
+    assert report['mode'] == mode
+    assert list(report['estimated_input_tokens']) == [mode]
+    assert 'estimated_compact_saving_pct' not in report
+    assert color_calls == [False]
+
+
+def test_comparison_builds_both_modes(generate_theme, generator, color_calls):
+    generator.compare_prompts = True
+    system, user = generator.build_prompts('base_config', generate_theme.build_business_data(BUSINESS))
+    report = generator.prompt_report['base_config']
+    estimates = report['estimated_input_tokens']
+    assert set(estimates) == {'verbose', 'compact'}
+    assert estimates['verbose'] == -(-len(system + user) // generate_theme.CHARS_PER_TOKEN)
+    assert report['estimate'] == f'chars/{generate_theme.CHARS_PER_TOKEN}'
+    assert report['estimated_compact_saving_pct'] > 0
+    # Only the active mode's color resolution is logged
+    assert color_calls == [False, True]
+
+
+def test_quiet_color_resolution_prints_nothing(generate_theme, generator, capsys):
+    business_data = generate_theme.build_business_data(dict(BUSINESS, primary_color='#1d4ed8'))
+    loud = generator.get_user_colors_with_priority(business_data)
+    assert 'Using user-specified primary color' in capsys.readouterr().out
+    assert generator.get_user_colors_with_priority(business_data, quiet=True) == loud
+    assert capsys.readouterr().out == ''
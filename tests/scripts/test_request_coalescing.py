@@ -0,0 +1,110 @@
+"""
+Singleflight error isolation and cancellation (request_coalescing.py)
+"""
+
+import asyncio
+
+import pytest
+
+from request_coalescing import RequestCoalescer
+
+
+class LeaderDeadline(Exception):
+    pass
+
+
+def counted_call(calls, result='response', error=None, delay=0.05):
+    async def call():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return call
+
+
+def test_identical_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def run():
+        return await asyncio.gather(*(coalescer.run('key', counted_call(calls)) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert [result for result, _ in results] == ['response'] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert len(calls) == 1
+
+
+def test_shared_error_reaches_every_waiter():
+    coalescer = RequestCoalescer(private_errors=(LeaderDeadline,))
+    calls = []
+
+    async def run():
+        leader = asyncio.create_task(coalescer.run('key', counted_call(calls, error=ValueError('bad request'))))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    leader, waiter = asyncio.run(run())
+    assert isinstance(leader, ValueError) and waiter is leader
+    assert len(calls) == 1
+
+
+def test_private_leader_error_does_not_fail_waiters():
+    coalescer = RequestCoalescer(private_errors=(LeaderDeadline,))
+    calls = []
+
+    async def run():
+        leader = asyncio.create_task(coalescer.run('key', counted_call(calls, error=LeaderDeadline())))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(coalescer.run('key', counted_call(calls))) for _ in range(2)]
+        results = await asyncio.gather(leader, *waiters, return_exceptions=True)
+        return results[0], results[1:]
+
+    leader, waiters = asyncio.run(run())
+    assert isinstance(leader, LeaderDeadline)
+    assert [result for result, _ in waiters] == ['response', 'response']
+    # One waiter re-issued the call and the other shared it
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_leaves_the_call_running():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def run():
+        leader = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        await asyncio.sleep(0)
+        impatient = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        patient = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await leader, await patient
+
+    (leader_result, _), (patient_result, shared) = asyncio.run(run())
+    assert leader_result == patient_result == 'response'
+    assert shared
+    assert len(calls) == 1
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def run():
+        leader = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(coalescer.run('key', counted_call(calls)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    result, shared = asyncio.run(run())
+    assert result == 'response' and not shared
+    assert len(calls) == 2
+    assert not coalescer._inflight
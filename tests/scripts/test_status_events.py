@@ -0,0 +1,74 @@
+"""
+Status webhook events (status_events.py)
+"""
+
+import asyncio
+
+from status_events import BATCH_SCHEMA, StatusReporter
+
+
+class FakeResponse:
+    status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.posted = []
+
+    def post(self, url, json):
+        self.posted.append(json)
+        return FakeResponse()
+
+
+def test_progress_events_coalesce_but_validation_results_do_not():
+    reporter = StatusReporter('http://receiver.test/status').for_client('acme')
+    reporter.emit('api_attempt', 'base_config', attempt=1)
+    reporter.emit('api_attempt', 'base_config', attempt=2)
+    reporter.emit('config_validated', 'validate', 'Config failed JavaScript validation', valid=False)
+    reporter.emit('config_validated', 'validate', 'Config is valid JavaScript', valid=True)
+
+    events = reporter._take_batch()
+    attempts = [event for event in events if event['status'] == 'api_attempt']
+    validations = [event['valid'] for event in events if event['status'] == 'config_validated']
+    assert len(attempts) == 1 and attempts[0]['attempt'] == 2 and attempts[0]['count'] == 2
+    assert validations == [False, True]
+
+
+def test_events_are_posted_one_per_request_in_the_single_event_shape():
+    reporter = StatusReporter('http://receiver.test/status').for_client('acme')
+    reporter.emit('files_written', 'write', 'Wrote 2 file(s)', files=['a', 'b'])
+    session = FakeSession()
+
+    asyncio.run(reporter._post(session, reporter._take_batch()))
+
+    assert len(session.posted) == 1
+    payload = session.posted[0]
+    assert {'status', 'client_name', 'message', 'timestamp'} <= payload.keys()
+    assert payload['status'] == 'files_written' and payload['client_name'] == 'acme'
+
+
+def test_batches_carry_a_schema_version():
+    reporter = StatusReporter('http://receiver.test/status', batch=True).for_client('acme')
+    reporter.emit('stage_started', 'merge')
+    reporter.emit('stage_started', 'theme_css')
+    session = FakeSession()
+
+    asyncio.run(reporter._post(session, reporter._take_batch()))
+
+    assert session.posted == [{'schema': BATCH_SCHEMA, 'events': session.posted[0]['events'], 'dropped': 0}]
+    assert [event['stage'] for event in session.posted[0]['events']] == ['merge', 'theme_css']
+
+
+def test_buffer_drops_oldest_beyond_its_bound():
+    reporter = StatusReporter('http://receiver.test/status', max_buffered=3).for_client('acme')
+    for i in range(5):
+        reporter.emit('stage_started', f'stage{i}')
+
+    assert [event['stage'] for event in reporter._take_batch()] == ['stage2', 'stage3', 'stage4']
+    assert reporter.stats['dropped'] == 2
@@ -0,0 +1,52 @@
+"""
+Contrast fixes reach the WCAG target without reordering the scale (theme_accessibility.py)
+"""
+
+import pytest
+
+from theme_accessibility import (
+    CONTRAST_LEVELS, DARK_SHADES, LIGHT_SHADES, TEXT_SHADE, WHITE,
+    _bisect_lightness, contrast_ratio, enforce_scale_contrast, relative_luminance,
+)
+
+SHADE_ORDER = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+
+# A pale yellow brand scale: every dark shade is too light for white text
+PALE_SCALE = {
+    '50': '#fffef0', '100': '#fffbd6', '200': '#fff6ad', '300': '#ffef80', '400': '#ffe74d',
+    '500': '#ffdf1a', '600': '#f0cc00', '700': '#d9b800', '800': '#c2a400', '900': '#ab9000',
+    '950': '#948000',
+}
+
+
+def ratio(a, b):
+    return contrast_ratio(relative_luminance(a), relative_luminance(b))
+
+
+@pytest.mark.parametrize('level', ['AA', 'AAA'])
+def test_fixed_scale_reaches_target_and_stays_monotonic(level):
+    target = CONTRAST_LEVELS[level]
+    adjusted, report = enforce_scale_contrast(PALE_SCALE, level)
+
+    for shade in DARK_SHADES:
+        assert ratio(adjusted[shade], WHITE) >= target
+    for shade in LIGHT_SHADES:
+        assert ratio(adjusted[shade], adjusted[TEXT_SHADE]) >= target
+    luminances = [relative_luminance(adjusted[shade]) for shade in SHADE_ORDER]
+    assert luminances == sorted(luminances, reverse=True)
+    # The brand color itself is reported, never moved
+    assert adjusted['500'] == PALE_SCALE['500']
+    assert any('adjusted_to' in entry for entry in report)
+
+
+def test_bisection_stops_just_past_the_target():
+    fixed = _bisect_lightness('#f0cc00', WHITE, 4.5, darken=True)
+    assert 4.5 <= ratio(fixed, WHITE) < 4.6
+
+
+def test_passing_shades_are_left_alone():
+    scale = dict(PALE_SCALE, **{shade: '#1e293b' for shade in DARK_SHADES})
+    scale.update({shade: '#ffffff' for shade in LIGHT_SHADES})
+    adjusted, report = enforce_scale_contrast(scale, 'AA')
+    assert adjusted == scale
+    assert not any('adjusted_to' in entry for entry in report)
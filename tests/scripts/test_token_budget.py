@@ -0,0 +1,51 @@
+"""
+Output token budgets derived from past runs (token_budget.py)
+"""
+
+import json
+
+from token_budget import HEADROOM, MIN_BUDGET, MIN_SAMPLES, MAX_SAMPLES, TokenBudget, percentile
+
+
+def test_percentile_interpolates_between_samples():
+    assert percentile([40, 10, 30, 20], 0.5) == 25
+    assert percentile([10, 20, 30, 40, 50], 0.95) == 48
+    assert percentile([7], 0.95) == 7
+
+
+def test_default_budget_until_enough_samples(tmp_path):
+    budget = TokenBudget(str(tmp_path / 'usage.json'), default_budget=4000)
+    for _ in range(MIN_SAMPLES - 1):
+        budget.record('content', 1000)
+    assert budget.budget_for('content') == 4000
+    budget.record('content', 1000)
+    assert budget.budget_for('content') == round(1000 * HEADROOM)
+
+
+def test_budget_is_capped_and_floored(tmp_path):
+    budget = TokenBudget(str(tmp_path / 'usage.json'), default_budget=4000)
+    for _ in range(MIN_SAMPLES):
+        budget.record('config', 3900)
+        budget.record('fill', 10)
+    assert budget.budget_for('config') == 4000
+    assert budget.budget_for('config', cap=2000) == 2000
+    assert budget.budget_for('fill') == MIN_BUDGET
+
+
+def test_history_rolls_off_and_survives_a_reload(tmp_path):
+    path = tmp_path / 'usage.json'
+    budget = TokenBudget(str(path))
+    for tokens in range(MAX_SAMPLES + 50):
+        budget.record('content', tokens)
+    budget.save()
+    reloaded = TokenBudget(str(path))
+    assert reloaded.history['content'] == list(range(50, MAX_SAMPLES + 50))
+    assert reloaded.distribution('content')['max'] == MAX_SAMPLES + 49
+
+
+def test_unreadable_history_starts_empty(tmp_path):
+    path = tmp_path / 'usage.json'
+    path.write_text('[1, 2')
+    assert TokenBudget(str(path)).history == {}
+    path.write_text(json.dumps([1, 2]))
+    assert TokenBudget(str(path)).history == {}
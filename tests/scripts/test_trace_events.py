@@ -0,0 +1,34 @@
+"""
+Trace tracks for concurrent stages (trace_events.py)
+"""
+
+import asyncio
+
+from trace_events import Tracer
+
+
+def test_concurrent_stages_get_their_own_tracks():
+    tracer = Tracer().for_client('acme')
+
+    async def stage(name, delay):
+        with tracer.track(name), tracer.span(name):
+            with tracer.span('messages.create', 'api'):
+                await asyncio.sleep(delay)
+
+    async def run():
+        content = asyncio.create_task(stage('custom_content', 0.05))
+        with tracer.span('base_config'):
+            await asyncio.sleep(0.03)
+        await content
+
+    asyncio.run(run())
+
+    spans = {}
+    for event in tracer.events:
+        spans.setdefault(event['tid'], []).append((event['ts'], event['ts'] + event['dur']))
+    assert len(spans) == 2
+    for track in spans.values():
+        # Spans on one track either nest or don't touch
+        for start, end in track:
+            for other_start, other_end in track:
+                assert not (start < other_start < end < other_end)
@@ -0,0 +1,32 @@
+"""
+JavaScript config validation stays off the event loop (generate-theme.py)
+"""
+
+import asyncio
+import time
+
+
+def test_config_check_does_not_block_the_event_loop(generator, monkeypatch):
+    def slow_node_check(config_content):
+        time.sleep(0.3)
+        return True
+
+    monkeypatch.setattr(generator, 'validate_javascript_config', slow_node_check)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def run():
+        ticking = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        valid = await generator.check_javascript_config('export const clientConfig = {};')
+        await ticking
+        return valid, start
+
+    valid, start = asyncio.run(run())
+    assert valid
+    # The other task kept running while node --check was in progress
+    assert len([tick for tick in ticks if tick - start < 0.3]) >= 3
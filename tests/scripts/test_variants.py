@@ -0,0 +1,56 @@
+"""
+Variant configs (generate-theme.py --variants)
+"""
+
+BASE_CONFIG = '''export const clientConfig = {
+  business: {
+    name: "Acme",
+    tagline: "Base tagline",
+  },
+  branding: {
+    colors: {
+      primary: "#2563eb",
+      secondary: "#64748b",
+      accent: "#f59e0b",
+    },
+  },
+  content: {
+    hero: {
+      headline: "Base headline",
+      subheadline: "Base subheadline",
+      cta: "Get Started",
+      secondaryCta: "View Our Work",
+    },
+  },
+};
+'''
+
+COLORS = {'primary': '#111111', 'secondary': '#222222', 'accent': '#333333'}
+
+
+def test_variant_keeps_base_secondary_cta(generator):
+    variant = {'headline': 'New headline', 'subheadline': 'New subheadline', 'cta': 'Book a call', 'tagline': 'New tagline'}
+    config = generator.apply_variant(BASE_CONFIG, variant, COLORS)
+
+    assert 'headline: "New headline"' in config
+    assert 'subheadline: "New subheadline"' in config
+    assert 'cta: "Book a call"' in config
+    assert 'secondaryCta: "View Our Work"' in config
+    assert 'tagline: "New tagline"' in config
+    assert 'primary: "#111111"' in config
+
+
+def test_variant_without_cta_keeps_base_cta(generator):
+    config = generator.apply_variant(BASE_CONFIG, {'headline': 'New headline', 'subheadline': 'Sub'}, COLORS)
+
+    assert 'cta: "Get Started"' in config
+    assert 'secondaryCta: "View Our Work"' in config
+
+
+def test_hero_merge_only_replaces_supplied_fields(generator):
+    config = generator.merge_content_section(BASE_CONFIG, 'hero', {'headline': 'Only headline'})
+
+    assert 'headline: "Only headline"' in config
+    assert 'subheadline: "Base subheadline"' in config
+    assert 'cta: "Get Started"' in config
+    assert 'secondaryCta: "View Our Work"' in config